@@ -0,0 +1,109 @@
+# scripts/bench_chain_writes.py
+"""Compare per-update transactions with write-behind batching on a local dev chain.
+
+Usage (ganache or hardhat node on :8545, contract compiled with
+'cd src && truffle compile'):
+    python scripts/bench_chain_writes.py --switches 100 --updates 2000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.controller.chain_encoding import encode_id
+from src.controller.contract_artifact import load_artifact
+from src.dashboard.chain import ChainWriteBehind
+
+def deploy(w3, artifact_path, account):
+    artifact = load_artifact(artifact_path)
+    factory = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    tx_hash = factory.constructor().transact({'from': account})
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    return w3.eth.contract(address=receipt['contractAddress'], abi=artifact['abi'])
+
+def register_switches(w3, contract, account, switch_ids):
+    hashes = [
+        contract.functions.registerSwitch(encode_id(switch_id), 2, 48).transact({'from': account})
+        for switch_id in switch_ids
+    ]
+    for tx_hash in hashes:
+        w3.eth.wait_for_transaction_receipt(tx_hash)
+
+def bench_per_update(w3, contract, account, updates):
+    started = time.perf_counter()
+    hashes = [
+        contract.functions.updateMetrics(encode_id(switch_id), load, latency).transact({'from': account})
+        for switch_id, load, latency in updates
+    ]
+    gas = sum(w3.eth.wait_for_transaction_receipt(h)['gasUsed'] for h in hashes)
+    elapsed = time.perf_counter() - started
+    return {
+        'updates': len(updates),
+        'transactions': len(hashes),
+        'seconds': elapsed,
+        'updates_per_second': len(updates) / elapsed,
+        'gas_used': gas,
+        'gas_per_update': gas / len(updates)
+    }
+
+def bench_write_behind(w3, contract, account, updates, window, max_batch):
+    writer = ChainWriteBehind(w3, contract, account, window=window, max_batch=max_batch)
+    started = time.perf_counter()
+    writer.start()
+    for switch_id, load, latency in updates:
+        writer.update_metrics(switch_id, load, latency)
+    writer.stop()
+    elapsed = time.perf_counter() - started
+    report = writer.report()
+    report.update({
+        'updates': len(updates),
+        'seconds': elapsed,
+        'updates_per_second': len(updates) / elapsed,
+        # Gas per accepted update, counting coalesced updates as free
+        'gas_per_update': report['gas_used'] / len(updates)
+    })
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rpc', default='http://localhost:8545')
+    parser.add_argument('--artifact', default='src/build/contracts/EnhancedNetworkManager.json')
+    parser.add_argument('--switches', type=int, default=21)
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--window', type=float, default=1.0)
+    parser.add_argument('--max-batch', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc))
+    account = w3.eth.accounts[0]
+    rng = random.Random(args.seed)
+    switch_ids = [f'a{i}' for i in range(1, args.switches + 1)]
+    updates = [
+        (rng.choice(switch_ids), rng.randint(0, 100), rng.randint(1, 20))
+        for _ in range(args.updates)
+    ]
+
+    results = {}
+    for name in ('per_update', 'write_behind'):
+        # A fresh contract per mode so storage starts out equally cold
+        contract = deploy(w3, args.artifact, account)
+        register_switches(w3, contract, account, switch_ids)
+        if name == 'per_update':
+            results[name] = bench_per_update(w3, contract, account, updates)
+        else:
+            results[name] = bench_write_behind(w3, contract, account, updates, args.window, args.max_batch)
+
+    report = json.dumps({'parameters': vars(args), 'results': results}, indent=2)
+    print(report)
+    if args.output:
+        Path(args.output).write_text(report)
+
+if __name__ == '__main__':
+    main()
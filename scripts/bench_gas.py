@@ -0,0 +1,76 @@
+# scripts/bench_gas.py
+"""Measure gas per registerSwitch / updateLink / setRedundantPath / updateMetrics.
+
+Compile the contract first (cd src && truffle compile); an artifact built
+from any other source is refused. To compare layouts, pass an artifact of
+the previous string-keyed contract too, such as the committed one:
+    python scripts/bench_gas.py --baseline-artifact build/contracts/EnhancedNetworkManager.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.controller.chain_encoding import encode_id, encode_path
+from src.controller.contract_artifact import CONTRACT_SOURCE, load_artifact
+
+PRIMARY_PATH = ['a1', 'd1', 'c1', 'd2', 'a3']
+BACKUP_PATH = ['a1', 'd2', 'c2', 'd3', 'a3']
+
+def encode_argument(abi_type, value):
+    """Encode an ID, ID list or number for either contract layout"""
+    if abi_type == 'bytes32':
+        return encode_id(value)
+    if abi_type == 'bytes32[]':
+        return encode_path(value)
+    if abi_type == 'string' and isinstance(value, list):
+        return ','.join(value)
+    return value
+
+def call(contract, account, w3, name, *values):
+    function_abi = next(f for f in contract.abi if f.get('name') == name and f['type'] == 'function')
+    args = [encode_argument(i['type'], v) for i, v in zip(function_abi['inputs'], values)]
+    tx_hash = getattr(contract.functions, name)(*args).transact({'from': account})
+    return w3.eth.wait_for_transaction_receipt(tx_hash)['gasUsed']
+
+def measure(w3, account, artifact_path, repeats, source_path=CONTRACT_SOURCE):
+    artifact = load_artifact(artifact_path, source_path)
+    factory = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact({'from': account}))
+    contract = w3.eth.contract(address=receipt['contractAddress'], abi=artifact['abi'])
+
+    gas = {'registerSwitch': [], 'updateLink': [], 'setRedundantPath': [], 'updateMetrics': []}
+    for i in range(repeats):
+        switch_id = f'openflow:{i + 1}'
+        gas['registerSwitch'].append(call(contract, account, w3, 'registerSwitch', switch_id, 2, 48))
+        gas['updateLink'].append(call(contract, account, w3, 'updateLink', switch_id, f'openflow:{i + 2}', 100, 3, 0))
+        gas['setRedundantPath'].append(
+            call(contract, account, w3, 'setRedundantPath', f'10.0.0.{i + 1}', '10.0.1.1', PRIMARY_PATH, BACKUP_PATH)
+        )
+        gas['updateMetrics'].append(call(contract, account, w3, 'updateMetrics', switch_id, 42, 3))
+    return {name: sum(values) / len(values) for name, values in gas.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rpc', default='http://localhost:8545')
+    parser.add_argument('--artifact', default='src/build/contracts/EnhancedNetworkManager.json')
+    parser.add_argument('--baseline-artifact')
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    w3 = Web3(Web3.HTTPProvider(args.rpc))
+    account = w3.eth.accounts[0]
+    report = {'compact': measure(w3, account, args.artifact, args.repeats)}
+    if args.baseline_artifact:
+        report['baseline'] = measure(w3, account, args.baseline_artifact, args.repeats, source_path=None)
+        report['saving_percent'] = {
+            name: 100 * (1 - report['compact'][name] / report['baseline'][name])
+            for name in report['compact']
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
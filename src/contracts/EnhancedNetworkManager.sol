@@ -4,144 +4,233 @@ pragma solidity ^0.8.0;
 contract EnhancedNetworkManager {
     enum SwitchType { CORE, DISTRIBUTION, ACCESS }
     enum LinkState { ACTIVE, DEGRADED, FAILED }
-    
-    struct Switch {
-        string switchId;
+
+    // IDs are UTF-8 strings of at most 32 bytes, left-aligned and zero-padded
+    // into a bytes32 (see src/controller/chain_encoding.py). Struct fields are
+    // narrowed so each struct packs into as few storage slots as possible.
+
+    struct Switch {              // 1 slot
         SwitchType switchType;
         bool isActive;
-        uint256 totalPorts;
-        uint256 usedPorts;
-    }
-    
-    struct Link {
-        string sourceId;
-        string destId;
-        uint256 bandwidth;
-        uint256 currentLoad;
-        uint256 latency;
+        uint16 totalPorts;
+        uint16 usedPorts;
+    }
+
+    struct Link {                // 3 slots
+        bytes32 sourceId;
+        bytes32 destId;
+        uint32 bandwidth;
+        uint32 currentLoad;
+        uint32 latency;
         LinkState state;
-        uint256 lastUpdated;
+        uint64 lastUpdated;
     }
-    
+
+    struct SwitchLoad {          // 1 slot
+        uint32 currentLoad;
+        uint32 linkLatency;
+        uint64 lastUpdated;
+    }
+
+    struct SwitchMetrics {
+        bytes32 switchId;
+        uint32 currentLoad;
+        uint32 linkLatency;
+        bool isActive;
+        uint64 lastUpdated;
+    }
+
     struct PathRedundancy {
-        string primaryPath;    // Comma-separated switch IDs
-        string secondaryPath;  // Backup path
+        bytes32[] primaryPath;   // Switch IDs in hop order
+        bytes32[] secondaryPath; // Backup path
         bool isPrimaryActive;
-        uint256 lastFailover;
+        uint64 lastFailover;
     }
-    
+
     // State variables
-    mapping(string => Switch) public switches;
+    mapping(bytes32 => Switch) public switches;
+    mapping(bytes32 => SwitchLoad) public switchLoads;
     mapping(bytes32 => Link) public links;
-    mapping(bytes32 => PathRedundancy) public redundantPaths;
+    mapping(bytes32 => PathRedundancy) internal redundantPaths;
     address public owner;
-    
+
     // Events
-    event SwitchStatusChanged(string switchId, bool isActive);
-    event LinkStateChanged(string sourceId, string destId, LinkState state);
+    event SwitchStatusChanged(bytes32 switchId, bool isActive);
+    event LinkStateChanged(bytes32 sourceId, bytes32 destId, LinkState state);
     event PathFailover(bytes32 pathId, bool isPrimaryActive);
-    event MetricsUpdated(string switchId, uint256 load, uint256 timestamp);
+    event MetricsUpdated(bytes32 switchId, uint256 load, uint256 timestamp);
 
     constructor() {
         owner = msg.sender;
         require(owner != address(0), "Invalid owner address");
     }
-    
+
+    function pairId(bytes32 sourceId, bytes32 destId) public pure returns (bytes32) {
+        return keccak256(abi.encodePacked(sourceId, destId));
+    }
+
     // Switch management
     function registerSwitch(
-    string memory switchId,
-    SwitchType switchType,
-    uint256 totalPorts
+        bytes32 switchId,
+        SwitchType switchType,
+        uint16 totalPorts
     ) public {
-        require(bytes(switchId).length > 0, "Switch ID cannot be empty");
+        require(switchId != bytes32(0), "Switch ID cannot be empty");
         require(totalPorts > 0, "Total ports must be greater than 0");
         require(uint8(switchType) <= uint8(SwitchType.ACCESS), "Invalid switch type");
-    
+
         switches[switchId] = Switch(
-            switchId,
             switchType,
             true,
             totalPorts,
             0
         );
+
+        emit SwitchStatusChanged(switchId, true);
     }
-    
+
     // Link management
     function updateLink(
-        string memory sourceId,
-        string memory destId,
-        uint256 bandwidth,
-        uint256 latency,
+        bytes32 sourceId,
+        bytes32 destId,
+        uint32 bandwidth,
+        uint32 latency,
         LinkState state
     ) public {
-        bytes32 linkId = keccak256(abi.encodePacked(sourceId, destId));
-        links[linkId] = Link(
+        _updateLink(sourceId, destId, bandwidth, latency, state);
+    }
+
+    // Bulk variant of updateLink; all arrays must have the same length
+    function updateLinkBatch(
+        bytes32[] calldata sourceIds,
+        bytes32[] calldata destIds,
+        uint32[] calldata bandwidths,
+        uint32[] calldata latencies,
+        LinkState[] calldata states
+    ) public {
+        uint256 count = sourceIds.length;
+        require(
+            destIds.length == count && bandwidths.length == count &&
+            latencies.length == count && states.length == count,
+            "Array length mismatch"
+        );
+        for (uint256 i = 0; i < count; i++) {
+            _updateLink(sourceIds[i], destIds[i], bandwidths[i], latencies[i], states[i]);
+        }
+    }
+
+    function _updateLink(
+        bytes32 sourceId,
+        bytes32 destId,
+        uint32 bandwidth,
+        uint32 latency,
+        LinkState state
+    ) internal {
+        links[pairId(sourceId, destId)] = Link(
             sourceId,
             destId,
             bandwidth,
             0,
             latency,
             state,
-            block.timestamp
+            uint64(block.timestamp)
         );
-        
+
         emit LinkStateChanged(sourceId, destId, state);
     }
-    
+
     // Path redundancy management
     function setRedundantPath(
-        string memory sourceId,
-        string memory destId,
-        string memory primaryPath,
-        string memory secondaryPath
+        bytes32 sourceId,
+        bytes32 destId,
+        bytes32[] calldata primaryPath,
+        bytes32[] calldata secondaryPath
     ) public {
-        bytes32 pathId = keccak256(abi.encodePacked(sourceId, destId));
-        redundantPaths[pathId] = PathRedundancy(
-            primaryPath,
-            secondaryPath,
-            true,
-            0
-        );
+        PathRedundancy storage path = redundantPaths[pairId(sourceId, destId)];
+        path.primaryPath = primaryPath;
+        path.secondaryPath = secondaryPath;
+        path.isPrimaryActive = true;
+        path.lastFailover = 0;
     }
-    
-    function triggerFailover(string memory sourceId, string memory destId) public {
-        bytes32 pathId = keccak256(abi.encodePacked(sourceId, destId));
+
+    function triggerFailover(bytes32 sourceId, bytes32 destId) public {
+        bytes32 pathId = pairId(sourceId, destId);
         PathRedundancy storage path = redundantPaths[pathId];
         path.isPrimaryActive = !path.isPrimaryActive;
-        path.lastFailover = block.timestamp;
-        
+        path.lastFailover = uint64(block.timestamp);
+
         emit PathFailover(pathId, path.isPrimaryActive);
     }
-    
+
     // Metrics and monitoring
     function updateMetrics(
-        string memory switchId,
-        uint256 currentLoad,
-        uint256 linkLatency
+        bytes32 switchId,
+        uint32 currentLoad,
+        uint32 linkLatency
+    ) public {
+        require(_updateMetrics(switchId, currentLoad, linkLatency), "Switch is not active");
+    }
+
+    // Bulk variant of updateMetrics; inactive switches are skipped instead of
+    // reverting the whole batch
+    function updateMetricsBatch(
+        bytes32[] calldata switchIds,
+        uint32[] calldata loads,
+        uint32[] calldata latencies
     ) public {
-        Switch storage switch_ = switches[switchId];
-        require(switch_.isActive, "Switch is not active");
-        
-        // Update link metrics
-        bytes32 linkId = keccak256(abi.encodePacked(switchId));
-        Link storage link = links[linkId];
-        link.currentLoad = currentLoad;
-        link.latency = linkLatency;
-        link.lastUpdated = block.timestamp;
-        
+        uint256 count = switchIds.length;
+        require(loads.length == count && latencies.length == count, "Array length mismatch");
+        for (uint256 i = 0; i < count; i++) {
+            _updateMetrics(switchIds[i], loads[i], latencies[i]);
+        }
+    }
+
+    function _updateMetrics(
+        bytes32 switchId,
+        uint32 currentLoad,
+        uint32 linkLatency
+    ) internal returns (bool) {
+        if (!switches[switchId].isActive) {
+            return false;
+        }
+
+        // Single-slot write
+        switchLoads[switchId] = SwitchLoad(currentLoad, linkLatency, uint64(block.timestamp));
+
         emit MetricsUpdated(switchId, currentLoad, block.timestamp);
+        return true;
     }
-    
+
     // Getters for network state
-    function getLinkStatus(string memory sourceId, string memory destId) 
+    function getLinkStatus(bytes32 sourceId, bytes32 destId)
         public view returns (Link memory) {
-        bytes32 linkId = keccak256(abi.encodePacked(sourceId, destId));
-        return links[linkId];
+        return links[pairId(sourceId, destId)];
+    }
+
+    function getMetrics(bytes32 switchId)
+        public view returns (SwitchMetrics memory) {
+        SwitchLoad storage load = switchLoads[switchId];
+        return SwitchMetrics(
+            switchId,
+            load.currentLoad,
+            load.linkLatency,
+            switches[switchId].isActive,
+            load.lastUpdated
+        );
     }
-    
-    function getRedundantPath(string memory sourceId, string memory destId) 
+
+    // Aggregate getter so a poller can read many switches in one eth_call
+    function getMetricsBatch(bytes32[] calldata switchIds)
+        public view returns (SwitchMetrics[] memory) {
+        SwitchMetrics[] memory result = new SwitchMetrics[](switchIds.length);
+        for (uint256 i = 0; i < switchIds.length; i++) {
+            result[i] = getMetrics(switchIds[i]);
+        }
+        return result;
+    }
+
+    function getRedundantPath(bytes32 sourceId, bytes32 destId)
         public view returns (PathRedundancy memory) {
-        bytes32 pathId = keccak256(abi.encodePacked(sourceId, destId));
-        return redundantPaths[pathId];
+        return redundantPaths[pairId(sourceId, destId)];
     }
-}
\ No newline at end of file
+}
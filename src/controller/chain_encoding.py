@@ -0,0 +1,23 @@
+from typing import Iterable, List
+
+ID_SIZE = 32
+
+def encode_id(identifier: str) -> bytes:
+    """Encode a switch/link/host ID as the contract's left-aligned bytes32."""
+    raw = identifier.encode("utf-8")
+    if not raw:
+        raise ValueError("ID cannot be empty")
+    if len(raw) > ID_SIZE or b"\x00" in raw:
+        raise ValueError(f"ID {identifier!r} does not fit in bytes32")
+    return raw.ljust(ID_SIZE, b"\x00")
+
+def decode_id(value: bytes) -> str:
+    """Inverse of encode_id."""
+    return bytes(value).rstrip(b"\x00").decode("utf-8")
+
+def encode_path(path: Iterable[str]) -> List[bytes]:
+    """Encode a hop list (or any list of IDs) as bytes32[]."""
+    return [encode_id(node_id) for node_id in path]
+
+def decode_path(values: Iterable[bytes]) -> List[str]:
+    return [decode_id(value) for value in values]
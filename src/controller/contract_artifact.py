@@ -0,0 +1,22 @@
+from pathlib import Path
+from typing import Dict, Optional
+import json
+
+CONTRACT_SOURCE = Path(__file__).resolve().parents[1] / "contracts" / "EnhancedNetworkManager.sol"
+
+def load_artifact(path: str, source_path: Optional[Path] = CONTRACT_SOURCE) -> Dict:
+    """Read a truffle artifact, refusing one compiled from a different contract source.
+
+    The ABI and bytecode in an artifact only match each other, and the
+    contract, if they come from the same compile; truffle embeds the source
+    it compiled, so compare that with source_path (None skips the check,
+    e.g. for an older contract kept for comparison).
+    """
+    with open(path) as f:
+        artifact = json.load(f)
+    if source_path is not None and Path(source_path).exists():
+        compiled = artifact.get("source", "").replace("\r\n", "\n").strip()
+        if compiled != Path(source_path).read_text().replace("\r\n", "\n").strip():
+            raise ValueError(f"{path} was not compiled from {source_path}; "
+                             "run 'truffle compile' (see src/truffle-config.js) and use its artifact")
+    return artifact
@@ -1,16 +1,48 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import threading
 import time
 from enum import Enum
+from src.controller.topology_model import TopologyChange, TopologyModel
+from src.controller.path_computation import PathComputer, RedundantPath
+from src.controller.flow_table import FlowChange, FlowOp, FlowTable
+from src.controller.instrumentation import MetricKind, instruments
+
+# (switch id, flow id) -> flow config
+FlowConfigs = Dict[Tuple[str, str], Optional[Dict]]
+
+instruments.describe("restconf_request_seconds", MetricKind.HISTOGRAM, "RESTCONF call latency by method and endpoint")
+instruments.describe("restconf_errors_total", MetricKind.COUNTER, "RESTCONF calls that failed or returned an error status")
+instruments.describe("topology_cache_total", MetricKind.COUNTER, "get_topology calls answered from the cache (hit) or by ODL (miss)")
+instruments.describe("flow_changes_total", MetricKind.COUNTER, "Flow adds, modifies and deletes pushed to switches, by tier and result")
 
 class SwitchType(Enum):
     CORE = "core"
     DISTRIBUTION = "distribution"
     ACCESS = "access"
 
+class InstallMode(Enum):
+    SEQUENTIAL = "sequential"
+    BATCH = "batch"
+    CONCURRENT = "concurrent"
+
 class EnhancedOpenDaylightController:
-    def __init__(self, host: str = "localhost", port: int = 8181):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8181,
+        install_mode: InstallMode = InstallMode.SEQUENTIAL,
+        max_concurrency: int = 8,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.2
+    ):
         self.base_url = f"http://{host}:{port}/restconf"
         self.auth = ("admin", "admin")
         self.headers = {
@@ -18,19 +50,143 @@ class EnhancedOpenDaylightController:
             "Accept": "application/json"
         }
         self.topology_cache = {}
+        self.topology = TopologyModel()
+        self.last_topology_changes: List[TopologyChange] = []
+        self.paths = PathComputer(self.topology, default_bandwidth=self.tier_bandwidth)
+        self.failover = None  # set by FailoverManager
+        self.flow_table = FlowTable()
         self.last_cache_update = 0
         self.cache_timeout = 30  # seconds
+        # The dashboard poll and the failover watcher both refresh; one at a time
+        self._topology_lock = threading.Lock()
+        self.install_mode = install_mode
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self.timeout = (connect_timeout, read_timeout)
+        self.request_count = 0
+        self._stats_lock = threading.Lock()
+        # Every concurrent worker needs its own pooled connection
+        self.session = self._create_session(
+            max(pool_size, max_concurrency), max_retries, backoff_factor
+        )
+
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Create a keep-alive session with a bounded connection pool and retries."""
+        # PUT, DELETE and replace-only YANG-PATCH are idempotent, so they are safe to retry
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "PUT", "DELETE", "PATCH"]),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,  # a single controller host
+            pool_maxsize=pool_size,
+            max_retries=retry,
+            pool_block=True
+        )
+        session = requests.Session()
+        session.auth = self.auth
+        session.headers.update(self.headers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @staticmethod
+    def _endpoint(url: str) -> str:
+        """The kind of RESTCONF resource a URL addresses, for instrumentation."""
+        if "network-topology" in url:
+            return "topology"
+        if url.endswith("node-connector-statistics"):
+            return "port_statistics"
+        if "/flow/" in url:
+            return "flow"
+        if url.endswith("table/0"):
+            return "flow_table"
+        if url.endswith("opendaylight-inventory:nodes"):
+            return "flow_batch"
+        return "other"
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Issue a RESTCONF call through the pooled session."""
+        kwargs.setdefault("timeout", self.timeout)
+        with self._stats_lock:
+            self.request_count += 1
+        endpoint = self._endpoint(url)
+        with instruments.timer("restconf_request_seconds", method=method, endpoint=endpoint):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                instruments.inc("restconf_errors_total", method=method, endpoint=endpoint, status=type(e).__name__)
+                raise
+        # A missing flow or table is an answer, not an error
+        if response.status_code >= 400 and response.status_code != 404:
+            instruments.inc("restconf_errors_total", method=method, endpoint=endpoint, status=response.status_code)
+        return response
+
+    def get_connection_stats(self) -> Dict:
+        """Report connection pool usage, including how many requests reused a connection."""
+        new_connections = 0
+        pooled_requests = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                new_connections += pool.num_connections
+                pooled_requests += pool.num_requests
+        return {
+            "requests": self.request_count,
+            "connections_opened": new_connections,
+            "connections_reused": max(pooled_requests - new_connections, 0),
+            "reuse_ratio": (
+                (pooled_requests - new_connections) / pooled_requests
+                if pooled_requests else 0.0
+            )
+        }
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool used for concurrent flow programming."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="odl-flow"
+            )
+        return self._executor
+
+    def close(self):
+        """Release pooled connections and worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.session.close()
 
     def get_topology(self, force_refresh: bool = False) -> Dict:
         """Fetch network topology with caching."""
         current_time = time.time()
         if force_refresh or (current_time - self.last_cache_update) > self.cache_timeout:
+            instruments.inc("topology_cache_total", result="miss")
             url = f"{self.base_url}/operational/network-topology:network-topology"
-            response = requests.get(url, auth=self.auth, headers=self.headers)
-            self.topology_cache = response.json()
-            self.last_cache_update = current_time
+            with self._topology_lock:
+                requested_at = time.monotonic()
+                response = self._request("GET", url)
+                self.topology_cache = response.json()
+                self.last_topology_changes = self.topology.apply_snapshot(self.topology_cache, requested_at)
+                self.last_cache_update = current_time
+        else:
+            instruments.inc("topology_cache_total", result="hit")
         return self.topology_cache
 
+    def refresh_topology(self) -> List[TopologyChange]:
+        """Re-read the operational topology and return only what changed."""
+        self.get_topology(force_refresh=True)
+        return self.last_topology_changes
+
     def get_switch_type(self, switch_id: str) -> SwitchType:
         """Determine switch type based on ID prefix."""
         if switch_id.startswith('c'):
@@ -40,35 +196,204 @@ class EnhancedOpenDaylightController:
         else:
             return SwitchType.ACCESS
 
-    def install_layer_specific_flow(self, switch_id: str, flow_config: Dict) -> bool:
-        """Install flow rules with layer-specific considerations."""
+    def _flow_url(self, switch_id: str, flow_id: str) -> str:
+        return f"{self.base_url}/config/opendaylight-inventory:nodes/node/{switch_id}/flow-node-inventory:table/0/flow/{flow_id}"
+
+    def _apply_layer_settings(self, switch_id: str, flow_config: Dict) -> Dict:
+        """Adjust flow rules based on switch layer.
+
+        Flows without a priority get the layer default; a computed priority
+        (see _generate_enhanced_flow_configs) is kept.
+        """
         switch_type = self.get_switch_type(switch_id)
-        
-        # Modify flow rules based on switch layer
+
         if switch_type == SwitchType.CORE:
-            flow_config["priority"] = 100  # Highest priority for core
+            flow_config.setdefault("priority", 100)  # Highest priority for core
             flow_config["idle-timeout"] = 0  # Permanent flows
         elif switch_type == SwitchType.DISTRIBUTION:
-            flow_config["priority"] = 50
+            flow_config.setdefault("priority", 50)
             flow_config["idle-timeout"] = 300  # 5 minutes
         else:  # ACCESS
-            flow_config["priority"] = 10
+            flow_config.setdefault("priority", 10)
             flow_config["idle-timeout"] = 60  # 1 minute
+        return flow_config
+
+    def tier_bandwidth(self, source: str, target: str) -> float:
+        """Nominal link bandwidth in Mbps between two tiers, as built by EnhancedTopology."""
+        if source.startswith("host:") or target.startswith("host:"):
+            return 10
+        tiers = {self.get_switch_type(source), self.get_switch_type(target)}
+        if tiers == {SwitchType.CORE}:
+            return 100
+        if SwitchType.CORE in tiers:
+            return 50
+        return 25
+
+    def compute_redundant_path(self, source: str, destination: str) -> Optional[RedundantPath]:
+        """Shortest path and link-disjoint backup between two switches."""
+        self.get_topology()
+        return self.paths.redundant_path(source, destination)
 
-        url = f"{self.base_url}/config/opendaylight-inventory:nodes/node/{switch_id}/flow-node-inventory:table/0/flow/{flow_config['id']}"
-        response = requests.put(url, auth=self.auth, headers=self.headers, json=flow_config)
+    def precompute_paths(self) -> int:
+        """Cache redundant paths between every pair of access switches."""
+        self.get_topology()
+        access = [s for s in self.topology.switch_ids() if self.get_switch_type(s) == SwitchType.ACCESS]
+        return self.paths.precompute(access)
+
+    def install_layer_specific_flow(self, switch_id: str, flow_config: Dict) -> bool:
+        """Install flow rules with layer-specific considerations."""
+        self._apply_layer_settings(switch_id, flow_config)
+        response = self._request("PUT", self._flow_url(switch_id, flow_config["id"]), json=flow_config)
         return response.status_code == 200
 
+    def delete_flow(self, switch_id: str, flow_id: str) -> bool:
+        """Remove a flow from the config datastore; a missing flow counts as removed."""
+        response = self._request("DELETE", self._flow_url(switch_id, flow_id))
+        return response.status_code in (200, 204, 404)
+
+    def install_flows_batch(self, flows: List[Tuple[str, Dict]], previous: Optional[FlowConfigs] = None) -> bool:
+        """Install flows for many switches in one RESTCONF transaction.
+
+        The flows are sent as a single YANG-PATCH against the inventory, which
+        ODL applies in one datastore transaction, so either every flow lands or
+        none does. Controllers without YANG-PATCH support fall back to per-flow
+        PUTs that are rolled back if any of them fails (see _roll_back).
+        """
+        if not flows:
+            return True
+
+        edits = []
+        for i, (switch_id, flow_config) in enumerate(flows):
+            self._apply_layer_settings(switch_id, flow_config)
+            edits.append({
+                "edit-id": str(i),
+                "operation": "replace",
+                "target": f"/node/{switch_id}/flow-node-inventory:table/0/flow/{flow_config['id']}",
+                "value": {"flow-node-inventory:flow": [flow_config]}
+            })
+        patch = {
+            "ietf-yang-patch:yang-patch": {
+                "patch-id": f"flows-{int(time.time() * 1000)}",
+                "edit": edits
+            }
+        }
+
+        url = f"{self.base_url}/config/opendaylight-inventory:nodes"
+        response = self._request(
+            "PATCH", url, json=patch,
+            headers={"Content-Type": "application/yang.patch+json"}
+        )
+        if response.status_code in (405, 415, 501):
+            return self._install_flows_with_rollback(flows, previous)
+        if response.status_code not in (200, 204):
+            return False
+        if response.status_code == 200 and response.content:
+            status = response.json().get("ietf-yang-patch:yang-patch-status", {})
+            return "ok" in status or "ok" in status.get("global-status", {})
+        return True
+
+    def install_flows_concurrent(self, flows: List[Tuple[str, Dict]], previous: Optional[FlowConfigs] = None) -> bool:
+        """Install flows on all switches in parallel, all or nothing.
+
+        At most max_concurrency PUTs are in flight. If any install fails, the
+        ones that did succeed are rolled back (see _roll_back), also in parallel.
+        """
+        if not flows:
+            return True
+
+        def install(switch_id: str, flow_config: Dict) -> bool:
+            try:
+                return self.install_layer_specific_flow(switch_id, flow_config)
+            except requests.RequestException:
+                return False
+
+        futures = [
+            (switch_id, flow_config["id"], self.executor.submit(install, switch_id, flow_config))
+            for switch_id, flow_config in flows
+        ]
+        installed = [(switch_id, flow_id) for switch_id, flow_id, future in futures if future.result()]
+        if len(installed) == len(flows):
+            return True
+        self._roll_back(installed, previous or {})
+        return False
+
+    def _roll_back(self, written: List[Tuple[str, str]], previous: FlowConfigs):
+        """Undo flow writes: flows that replaced an installed one get its config
+        back, flows that were new are deleted."""
+        def undo(switch_id: str, flow_id: str) -> bool:
+            if (switch_id, flow_id) not in previous:
+                return self.delete_flow(switch_id, flow_id)
+            config = previous[(switch_id, flow_id)]
+            if config is None:
+                return False  # replaced a flow we know nothing about; better kept than deleted
+            return self.install_layer_specific_flow(switch_id, dict(config))
+
+        futures = [self.executor.submit(undo, switch_id, flow_id) for switch_id, flow_id in written]
+        for future in futures:
+            try:
+                future.result()
+            except requests.RequestException:
+                pass
+
+    def _install_flows(self, flows: List[Tuple[str, Dict]], previous: Optional[FlowConfigs] = None) -> bool:
+        """Install a group of flows using the configured multi-flow install mode.
+
+        previous maps (switch id, flow id) to the installed config a flow
+        replaces, which is what a failed group restores.
+        """
+        if self.install_mode == InstallMode.CONCURRENT:
+            return self.install_flows_concurrent(flows, previous)
+        return self.install_flows_batch(flows, previous)
+
+    def _install_flows_with_rollback(self, flows: List[Tuple[str, Dict]], previous: Optional[FlowConfigs] = None) -> bool:
+        """Install flows one by one, rolling back the ones already written on failure."""
+        installed = []
+        for switch_id, flow_config in flows:
+            if not self.install_layer_specific_flow(switch_id, flow_config):
+                self._roll_back(installed, previous or {})
+                return False
+            installed.append((switch_id, flow_config["id"]))
+        return True
+
     def setup_redundant_path(
         self, 
         source: str, 
         destination: str, 
-        primary_path: List[str], 
-        backup_path: List[str]
+        primary_path: Optional[List[str]] = None,
+        backup_path: Optional[List[str]] = None,
+        source_switch: Optional[str] = None,
+        destination_switch: Optional[str] = None
     ) -> Tuple[bool, bool]:
-        """Configure both primary and backup paths."""
-        primary_success = self.update_route(source, destination, primary_path, is_primary=True)
-        backup_success = self.update_route(source, destination, backup_path, is_primary=False)
+        """Configure both primary and backup paths.
+
+        Paths that are not given are computed between source_switch and
+        destination_switch (defaulting to source and destination).
+        """
+        if primary_path is None or backup_path is None:
+            computed = self.compute_redundant_path(
+                source_switch or source, destination_switch or destination
+            )
+            if computed is None or (backup_path is None and computed.backup is None):
+                return False, False
+            primary_path = primary_path or computed.primary.nodes
+            backup_path = backup_path or computed.backup.nodes
+
+        if self.install_mode != InstallMode.SEQUENTIAL:
+            changes = self.flow_table.set_route(
+                (source, destination, True),
+                self._generate_enhanced_flow_configs(source, destination, primary_path, True)
+            )
+            changes += self.flow_table.set_route(
+                (source, destination, False),
+                self._generate_enhanced_flow_configs(source, destination, backup_path, False)
+            )
+            primary_success = backup_success = self._apply_flow_changes(changes)
+        else:
+            primary_success = self.update_route(source, destination, primary_path, is_primary=True)
+            backup_success = self.update_route(source, destination, backup_path, is_primary=False)
+
+        if self.failover is not None and primary_success and backup_success:
+            self.failover.register_route(source, destination, primary_path, backup_path)
         return primary_success, backup_success
 
     def update_route(
@@ -78,18 +403,152 @@ class EnhancedOpenDaylightController:
         path: List[str], 
         is_primary: bool = True
     ) -> bool:
-        """Update routing with support for primary/backup paths."""
+        """Update routing with support for primary/backup paths.
+
+        Only flows that differ from what is installed are pushed, and flows
+        of the route's previous path that are no longer used are removed.
+        """
         flow_configs = self._generate_enhanced_flow_configs(
             source, destination, path, is_primary
         )
-        
+        changes = self.flow_table.set_route((source, destination, is_primary), flow_configs)
+        return self._apply_flow_changes(changes)
+
+    def remove_route(
+        self,
+        source: str,
+        destination: str,
+        path: List[str],
+        is_primary: bool = True
+    ) -> bool:
+        """Delete the flows installed for a route, in parallel across switches."""
+        flows = self.flow_table.release_route((source, destination, is_primary))
+        flow_ids = set(self.route_flow_ids(source, destination, path, is_primary))
+        flow_ids.update((switch_id, flow_config["id"]) for switch_id, flow_config in flows.items())
+        return self._apply_flow_changes([
+            FlowChange(FlowOp.DELETE, switch_id, flow_id, None) for switch_id, flow_id in flow_ids
+        ])
+
+    def _count_flow_change(self, change: FlowChange, ok: bool):
+        instruments.inc(
+            "flow_changes_total", op=change.op.value,
+            tier=self.get_switch_type(change.switch_id).value, result="ok" if ok else "failed"
+        )
+
+    def _apply_flow_changes(self, changes: List[FlowChange]) -> bool:
+        """Push flow table changes: adds and modifies first, then deletes.
+
+        Installs use the configured install mode. Deletes only run once the
+        new flows are in place (make before break) and go out in parallel.
+        """
+        installs = [change for change in changes if change.op != FlowOp.DELETE]
+        deletes = [change for change in changes if change.op == FlowOp.DELETE]
+
+        if installs:
+            if self.install_mode == InstallMode.SEQUENTIAL:
+                for change in installs:
+                    installed = self.install_layer_specific_flow(change.switch_id, change.config)
+                    self._count_flow_change(change, installed)
+                    if not installed:
+                        # A failed PUT leaves a modified flow as it was
+                        if change.op == FlowOp.ADD:
+                            self.flow_table.mark_deleted(change.switch_id, change.flow_id)
+                        return False
+                    self.flow_table.mark_installed(change.switch_id, change.config)
+            elif self._install_flows(
+                [(change.switch_id, change.config) for change in installs],
+                {
+                    (change.switch_id, change.flow_id): self.flow_table.installed_config(change.switch_id, change.flow_id)
+                    for change in installs if change.op == FlowOp.MODIFY
+                }
+            ):
+                for change in installs:
+                    self._count_flow_change(change, True)
+                    self.flow_table.mark_installed(change.switch_id, change.config)
+            else:
+                # Failed groups are rolled back: modified flows get their old
+                # config back, so they stay installed with it, and added ones
+                # are removed. Either way the next attempt writes them again
+                for change in installs:
+                    self._count_flow_change(change, False)
+                    if change.op == FlowOp.ADD:
+                        self.flow_table.mark_deleted(change.switch_id, change.flow_id)
+                return False
+
+        futures = [
+            (change, self.executor.submit(self.delete_flow, change.switch_id, change.flow_id))
+            for change in deletes
+        ]
         success = True
-        for node_id, flow_config in flow_configs.items():
-            if not self.install_layer_specific_flow(node_id, flow_config):
+        for change, future in futures:
+            try:
+                removed = future.result()
+            except requests.RequestException:
+                removed = False
+            self._count_flow_change(change, removed)
+            if removed:
+                self.flow_table.mark_deleted(change.switch_id, change.flow_id)
+            else:
                 success = False
-                break
         return success
 
+    def _read_switch_flows(self, switch_id: str) -> Optional[List[Dict]]:
+        """Flows a switch reports in table 0; None if it could not be read."""
+        url = f"{self.base_url}/operational/opendaylight-inventory:nodes/node/{switch_id}/flow-node-inventory:table/0"
+        response = self._request("GET", url)
+        if response.status_code == 404:
+            return []
+        if response.status_code != 200:
+            return None
+        tables = response.json().get("flow-node-inventory:table", [])
+        return [flow for table in tables for flow in table.get("flow", [])]
+
+    def reconcile_flows(self, switch_ids: Optional[List[str]] = None) -> Dict:
+        """Compare the desired flow table with the switches' operational flows
+        and push only the differences, including deletes of stale managed flows."""
+        if switch_ids is None:
+            switch_ids = sorted(set(self.topology.switch_ids()) | self.flow_table.switch_ids())
+        reads = {
+            switch_id: self.executor.submit(self._read_switch_flows, switch_id)
+            for switch_id in switch_ids
+        }
+        changes = []
+        unreadable = 0
+        for switch_id, future in reads.items():
+            try:
+                flows = future.result()
+            except requests.RequestException as e:
+                print(f"Error reading flows of {switch_id}: {e}")
+                flows = None
+            if flows is None:
+                unreadable += 1
+                continue
+            self.flow_table.sync_switch(switch_id, flows)
+            changes += self.flow_table.diff(switch_id)
+
+        success = self._apply_flow_changes(changes)
+        return {
+            "switches": len(switch_ids),
+            "unreadable": unreadable,
+            "added": sum(1 for change in changes if change.op == FlowOp.ADD),
+            "modified": sum(1 for change in changes if change.op == FlowOp.MODIFY),
+            "deleted": sum(1 for change in changes if change.op == FlowOp.DELETE),
+            "success": success
+        }
+
+    def route_flow_ids(
+        self,
+        source: str,
+        destination: str,
+        path: List[str],
+        is_primary: bool = True
+    ) -> List[Tuple[str, str]]:
+        """(switch id, flow id) of every flow a route installs."""
+        flow_configs = self._generate_enhanced_flow_configs(
+            source, destination, path, is_primary
+        )
+        return [(node_id, flow_config["id"]) for node_id, flow_config in flow_configs.items()]
+
     def _generate_enhanced_flow_configs(
         self, 
         source: str, 
@@ -136,12 +595,13 @@ class EnhancedOpenDaylightController:
                         }]
                     }
                 }
+                self._apply_layer_settings(node_id, configs[node_id])
         return configs
 
     def monitor_link_metrics(self, link_id: str) -> Dict:
         """Monitor link performance metrics."""
         url = f"{self.base_url}/operational/opendaylight-inventory:nodes/node/{link_id}/node-connector-statistics"
-        response = requests.get(url, auth=self.auth, headers=self.headers)
+        response = self._request("GET", url)
         if response.status_code == 200:
             stats = response.json()
             return {
@@ -0,0 +1,270 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from collections import deque
+import queue
+import threading
+import time
+from src.controller.topology_model import ChangeType, TopologyChange
+
+RouteKey = Tuple[str, str]
+Hop = Tuple[str, str]
+
+class FailoverManager:
+    """Local failover from primary to pre-installed backup paths.
+
+    Backup flows installed by setup_redundant_path already sit at a lower
+    priority, so failing over only means deleting the primary flows of the
+    routes that cross a failed link. A reverse index from hop (directed node
+    pair) to route keys keeps that lookup proportional to the routes
+    actually affected. Link failures and recoveries arrive as change events
+    of the shared topology model and are handed to a dedicated failover
+    thread. A watcher thread refreshes the model whenever nobody else (the
+    dashboard poll) has within poll_interval seconds, so detection takes at
+    most poll_interval plus one topology read. Failover time is measured
+    from the last time the link was seen up (the model's changed_after) to
+    the primary flows being removed, so it includes the detection delay.
+    Once every hop of a failed-over primary is back, its flows are
+    reinstalled and the route returns to it.
+
+    Blockchain bookkeeping (triggerFailover) is slow and must not delay the
+    data plane, so on_failover callbacks run on a separate worker thread
+    after the flows have been switched.
+    """
+
+    def __init__(
+        self,
+        controller,
+        on_failover: Optional[Callable[[str, str], None]] = None,
+        poll_interval: float = 0.5
+    ):
+        self.controller = controller
+        self.on_failover = on_failover
+        self.poll_interval = poll_interval
+        self.routes: Dict[RouteKey, Dict] = {}
+        self._hop_routes: Dict[Hop, Set[RouteKey]] = {}
+        self._lock = threading.RLock()
+        self._events: "queue.Queue[Tuple[ChangeType, Hop, float]]" = queue.Queue()
+        self._notifications: "queue.Queue[RouteKey]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.failover_times: deque = deque(maxlen=1000)
+        self.restorations = 0
+        controller.failover = self
+        controller.topology.subscribe(self._on_topology_change)
+
+    @staticmethod
+    def _path_hops(path: List[str]) -> Set[Hop]:
+        return set(zip(path, path[1:]))
+
+    def register_route(self, source: str, destination: str, primary_path: List[str], backup_path: List[str]):
+        """Track a redundant route so its primary can be failed over."""
+        key = (source, destination)
+        with self._lock:
+            self.unregister_route(source, destination)
+            self.routes[key] = {
+                "primary_path": list(primary_path),
+                "backup_path": list(backup_path),
+                "primary_active": True,
+                "last_failover": None
+            }
+            for hop in self._path_hops(primary_path):
+                self._hop_routes.setdefault(hop, set()).add(key)
+
+    def unregister_route(self, source: str, destination: str):
+        key = (source, destination)
+        with self._lock:
+            route = self.routes.pop(key, None)
+            if route is None:
+                return
+            for hop in self._path_hops(route["primary_path"]):
+                keys = self._hop_routes.get(hop)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._hop_routes[hop]
+
+    def active_routes(self) -> Dict[RouteKey, Dict]:
+        """Copy of the routes whose primary path is in use."""
+        with self._lock:
+            return {key: dict(route) for key, route in self.routes.items() if route["primary_active"]}
+
+    def routes_for_hop(self, source: str, target: str) -> Set[RouteKey]:
+        with self._lock:
+            return set(self._hop_routes.get((source, target), ()))
+
+    def handle_link_failure(self, source: str, target: str, down_since: Optional[float] = None) -> List[RouteKey]:
+        """Fail over every route whose active primary crosses the failed hop.
+
+        down_since is the time.monotonic() the link went down (or was last
+        seen up); failover time is counted from there, defaulting to now.
+        """
+        started = down_since if down_since is not None else time.monotonic()
+        with self._lock:
+            affected = [
+                (key, self.routes[key]["primary_path"])
+                for key in self.routes_for_hop(source, target)
+                if self.routes[key]["primary_active"]
+            ]
+            for key, _ in affected:
+                self.routes[key]["primary_active"] = False
+
+        # Flatten every flow of every affected route into one parallel fan-out.
+        # The flows leave the controller's desired flow table first, so a
+        # reconcile cannot put them back on the failed link.
+        executor = self.controller.executor
+        flow_table = self.controller.flow_table
+        removals = []
+        for key, path in affected:
+            released = flow_table.release_route((key[0], key[1], True))
+            flow_ids = set(self.controller.route_flow_ids(key[0], key[1], path, True))
+            flow_ids.update((switch_id, flow["id"]) for switch_id, flow in released.items())
+            removals.append((key, released, [
+                (switch_id, flow_id, executor.submit(self.controller.delete_flow, switch_id, flow_id))
+                for switch_id, flow_id in flow_ids
+            ]))
+
+        failed_over = []
+        for key, released, futures in removals:
+            removed = True
+            for switch_id, flow_id, future in futures:
+                try:
+                    deleted = future.result()
+                except Exception as e:
+                    print(f"Error failing over route {key}: {e}")
+                    deleted = False
+                if deleted:
+                    flow_table.mark_deleted(switch_id, flow_id)
+                else:
+                    removed = False
+            if not removed and released:
+                # Keep wanting the primary flows; the ones already deleted are
+                # reinstalled by the next reconcile
+                flow_table.set_route((key[0], key[1], True), released)
+            with self._lock:
+                route = self.routes.get(key)
+                if route is None:
+                    continue
+                if removed:
+                    route["last_failover"] = time.time()
+                    failed_over.append(key)
+                else:
+                    # The primary flows are still installed, so the route has not moved
+                    route["primary_active"] = True
+
+        for key in failed_over:
+            self._notifications.put(key)
+        if affected:
+            self.failover_times.append(time.monotonic() - started)
+        return failed_over
+
+    def handle_link_recovery(self, source: str, target: str) -> List[RouteKey]:
+        """Move failed-over routes crossing the hop back once their whole primary is up."""
+        topology = self.controller.topology
+        with self._lock:
+            candidates = [
+                (key, self.routes[key]["primary_path"])
+                for key in self.routes_for_hop(source, target)
+                if not self.routes[key]["primary_active"]
+            ]
+
+        restored = []
+        for key, path in candidates:
+            if not all(topology.links_between(*hop) for hop in zip(path, path[1:])):
+                continue
+            # The primary flows outrank the backup ones, so installing them
+            # is all it takes to move the traffic back
+            if not self.controller.update_route(key[0], key[1], path, is_primary=True):
+                continue
+            with self._lock:
+                route = self.routes.get(key)
+                if route is not None and route["primary_path"] == path:
+                    route["primary_active"] = True
+                    self.restorations += 1
+                    restored.append(key)
+        return restored
+
+    def _on_topology_change(self, changes: List[TopologyChange]):
+        topology = self.controller.topology
+        down_since = topology.changed_after if topology.changed_after is not None else time.monotonic()
+        for change in changes:
+            if change.change_type not in (ChangeType.LINK_REMOVED, ChangeType.LINK_ADDED):
+                continue
+            hop = (change.data["source"], change.data["target"])
+            if hop not in self._hop_routes:
+                continue
+            if change.change_type == ChangeType.LINK_REMOVED and topology.links_between(*hop):
+                # A parallel link in the same direction keeps the hop usable
+                continue
+            self._events.put((change.change_type, hop, down_since))
+
+    def _failover_worker(self):
+        while not self._stop.is_set():
+            try:
+                change_type, hop, down_since = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                if change_type == ChangeType.LINK_REMOVED:
+                    self.handle_link_failure(hop[0], hop[1], down_since)
+                else:
+                    self.handle_link_recovery(hop[0], hop[1])
+            except Exception as e:
+                print(f"Error handling {change_type.value} of link {hop}: {e}")
+
+    def _watch(self):
+        topology = self.controller.topology
+        while not self._stop.is_set():
+            observed_at = topology.observed_at
+            due = 0.0 if observed_at is None else observed_at + self.poll_interval - time.monotonic()
+            if due > 0:
+                # Someone else refreshed recently enough
+                self._stop.wait(due)
+                continue
+            try:
+                self.controller.refresh_topology()
+            except Exception as e:
+                print(f"Error refreshing topology for failover: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def _notify(self):
+        while not self._stop.is_set():
+            try:
+                source, destination = self._notifications.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self.on_failover is None:
+                continue
+            try:
+                self.on_failover(source, destination)
+            except Exception as e:
+                print(f"Error recording failover {source} -> {destination}: {e}")
+
+    def start(self):
+        """Start the link watcher, the failover worker and the asynchronous notifier."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for target in (self._watch, self._failover_worker, self._notify):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def stats(self) -> Dict:
+        times = sorted(self.failover_times)
+        with self._lock:
+            routes = len(self.routes)
+            failed_over = sum(1 for r in self.routes.values() if not r["primary_active"])
+        return {
+            "routes": routes,
+            "failed_over": failed_over,
+            "failovers": len(times),
+            "restorations": self.restorations,
+            "last_failover_ms": self.failover_times[-1] * 1000 if times else None,
+            "max_failover_ms": times[-1] * 1000 if times else None,
+            "pending_notifications": self._notifications.qsize()
+        }
@@ -0,0 +1,164 @@
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+from enum import Enum
+import hashlib
+import json
+import threading
+
+# Fields we program; everything else in an operational flow (statistics,
+# cookies, flow names ...) is added by the switch or ODL and ignored
+DIGEST_FIELDS = ("id", "table_id", "priority", "match", "instructions", "idle-timeout", "hard-timeout")
+
+def flow_digest(flow_config: Dict, fields: Iterable[str] = DIGEST_FIELDS) -> str:
+    """Content hash of the programmed fields of a flow (limited to `fields`)."""
+    fields = set(fields)
+    content = {name: flow_config[name] for name in DIGEST_FIELDS if name in flow_config and name in fields}
+    return hashlib.sha1(
+        json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    ).hexdigest()
+
+class FlowOp(Enum):
+    ADD = "add"
+    MODIFY = "modify"
+    DELETE = "delete"
+
+class FlowChange(NamedTuple):
+    op: FlowOp
+    switch_id: str
+    flow_id: str
+    config: Optional[Dict]
+
+class FlowTable:
+    """Desired-state flow table: what each switch should hold, keyed by flow id.
+
+    Desired flows are stored with a content digest next to the digest of
+    what is known to be installed (from our own successful installs, or
+    from reading the switch with sync_switch). Only entries whose digests
+    differ turn into changes, so re-programming an unchanged route costs
+    nothing. Flows are owned by routes: when a route is programmed again,
+    flows of its previous version that are no longer wanted become deletes.
+    Flows whose id starts with managed_prefix and that nothing wants any
+    more (e.g. left behind by an earlier run) are deleted by diff().
+    """
+
+    def __init__(self, managed_prefix: str = "flow_"):
+        self.managed_prefix = managed_prefix
+        self.desired: Dict[str, Dict[str, Tuple[str, Dict]]] = {}
+        self.installed: Dict[str, Dict[str, str]] = {}
+        # The programmed fields of installed flows, to restore them on rollback
+        self._installed_configs: Dict[str, Dict[str, Dict]] = {}
+        self._routes: Dict[Hashable, Set[Tuple[str, str]]] = {}
+        self._lock = threading.RLock()
+        self.unchanged = 0
+
+    def _change(self, switch_id: str, flow_id: str) -> Optional[FlowChange]:
+        desired = self.desired.get(switch_id, {}).get(flow_id)
+        installed = self.installed.get(switch_id, {}).get(flow_id)
+        if desired is None:
+            if installed is None:
+                return None
+            return FlowChange(FlowOp.DELETE, switch_id, flow_id, None)
+        if installed is None:
+            return FlowChange(FlowOp.ADD, switch_id, flow_id, desired[1])
+        if installed != desired[0]:
+            return FlowChange(FlowOp.MODIFY, switch_id, flow_id, desired[1])
+        self.unchanged += 1
+        return None
+
+    def _drop_desired(self, switch_id: str, flow_id: str):
+        flows = self.desired.get(switch_id)
+        if flows is not None:
+            flows.pop(flow_id, None)
+            if not flows:
+                del self.desired[switch_id]
+
+    def set_route(self, key: Hashable, flows: Dict[str, Dict]) -> List[FlowChange]:
+        """Make `flows` (switch id -> flow config) the flows of a route.
+
+        Returns the changes still needed on the switches: adds and modifies
+        for flows that are not installed as configured, and deletes for
+        flows the route had before but no longer uses.
+        """
+        with self._lock:
+            wanted = set()
+            for switch_id, flow_config in flows.items():
+                self.desired.setdefault(switch_id, {})[flow_config["id"]] = (flow_digest(flow_config), flow_config)
+                wanted.add((switch_id, flow_config["id"]))
+            stale = self._routes.get(key, set()) - wanted
+            for switch_id, flow_id in stale:
+                self._drop_desired(switch_id, flow_id)
+            self._routes[key] = wanted
+
+            # Sorted so requests go out in the same order on every run
+            changes = [change for change in (self._change(*ids) for ids in sorted(wanted)) if change]
+            # A stale flow may exist even if we never saw it installed
+            changes += [FlowChange(FlowOp.DELETE, switch_id, flow_id, None) for switch_id, flow_id in stale]
+            return changes
+
+    def release_route(self, key: Hashable) -> Dict[str, Dict]:
+        """Stop wanting a route's flows; returns them (switch id -> flow config) for removal."""
+        with self._lock:
+            released = {}
+            for switch_id, flow_id in self._routes.pop(key, set()):
+                desired = self.desired.get(switch_id, {}).get(flow_id)
+                if desired is not None:
+                    released[switch_id] = desired[1]
+                self._drop_desired(switch_id, flow_id)
+            return released
+
+    def has_route(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._routes
+
+    def diff(self, switch_id: str) -> List[FlowChange]:
+        """Changes that bring one switch in line with the desired flows."""
+        with self._lock:
+            flow_ids = set(self.desired.get(switch_id, {})) | set(self.installed.get(switch_id, {}))
+            return [change for change in (self._change(switch_id, flow_id) for flow_id in flow_ids) if change]
+
+    def sync_switch(self, switch_id: str, flows: Iterable[Dict]):
+        """Replace what we believe is installed on a switch with what it reports."""
+        with self._lock:
+            desired = self.desired.get(switch_id, {})
+            installed, configs = {}, {}
+            for flow in flows:
+                flow_id = flow.get("id", "")
+                if not str(flow_id).startswith(self.managed_prefix):
+                    continue
+                # ODL reports fields we leave at their defaults (table_id,
+                # hard-timeout ...), so compare only the fields we program
+                wanted = desired.get(flow_id)
+                installed[flow_id] = flow_digest(flow, wanted[1] if wanted else DIGEST_FIELDS)
+                configs[flow_id] = {name: flow[name] for name in DIGEST_FIELDS if name in flow}
+            self.installed[switch_id] = installed
+            self._installed_configs[switch_id] = configs
+
+    def mark_installed(self, switch_id: str, flow_config: Dict):
+        with self._lock:
+            self.installed.setdefault(switch_id, {})[flow_config["id"]] = flow_digest(flow_config)
+            self._installed_configs.setdefault(switch_id, {})[flow_config["id"]] = flow_config
+
+    def mark_deleted(self, switch_id: str, flow_id: str):
+        """The flow is gone from the switch (also used when its state is unknown)."""
+        with self._lock:
+            for table in (self.installed, self._installed_configs):
+                flows = table.get(switch_id)
+                if flows is not None:
+                    flows.pop(flow_id, None)
+
+    def installed_config(self, switch_id: str, flow_id: str) -> Optional[Dict]:
+        """The config a flow is known to be installed with, if any."""
+        with self._lock:
+            return self._installed_configs.get(switch_id, {}).get(flow_id)
+
+    def switch_ids(self) -> Set[str]:
+        with self._lock:
+            return set(self.desired) | set(self.installed)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "routes": len(self._routes),
+                "desired_flows": sum(len(flows) for flows in self.desired.values()),
+                "installed_flows": sum(len(flows) for flows in self.installed.values()),
+                "unchanged_skipped": self.unchanged
+            }
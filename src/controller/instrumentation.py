@@ -0,0 +1,159 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+from enum import Enum
+import math
+import threading
+import time
+
+class MetricKind(Enum):
+    COUNTER = "counter"
+    GAUGE = "gauge"
+    HISTOGRAM = "histogram"
+
+# Seconds; from a fast RESTCONF call up to a whole poll cycle
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Instrumentation:
+    """Counters, gauges and latency histograms, rendered in the Prometheus text format.
+
+    Metrics are created on first use and can be described up front to set
+    their help text (and histogram buckets). Every sample is identified by
+    its label values. Observers registered with add_observer see every
+    histogram observation as it happens (name, labels, seconds), which is
+    the hook for profilers and tracers; it costs nothing while none is set.
+    """
+
+    def __init__(self):
+        self._kinds: Dict[str, MetricKind] = {}
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        # name -> labels -> [count per bucket (+Inf last), sum]
+        self._histograms: Dict[str, Dict[LabelKey, List]] = {}
+        self._observers: List[Callable[[str, Dict[str, str], float], None]] = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: MetricKind, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        with self._lock:
+            self._register(name, kind)
+            self._help[name] = help
+            if kind == MetricKind.HISTOGRAM:
+                self._buckets[name] = tuple(sorted(buckets))
+
+    def _register(self, name: str, kind: MetricKind):
+        registered = self._kinds.setdefault(name, kind)
+        if registered != kind:
+            raise ValueError(f"Metric {name} is a {registered.value}, not a {kind.value}")
+
+    @staticmethod
+    def _key(labels: Dict) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._register(name, MetricKind.COUNTER)
+            values = self._values.setdefault(name, {})
+            values[key] = values.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._register(name, MetricKind.GAUGE)
+            self._values.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._register(name, MetricKind.HISTOGRAM)
+            buckets = self._buckets.setdefault(name, DEFAULT_BUCKETS)
+            entry = self._histograms.setdefault(name, {}).get(key)
+            if entry is None:
+                entry = self._histograms[name][key] = [[0] * (len(buckets) + 1), 0.0]
+            index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+            entry[0][index] += 1
+            entry[1] += value
+            observers = self._observers
+        for observer in observers:
+            try:
+                observer(name, labels, value)
+            except Exception as e:
+                print(f"Error in instrumentation observer: {e}")
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[Dict]:
+        """Time a block into a histogram; labels added to the yielded dict are recorded too."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def add_observer(self, observer: Callable[[str, Dict[str, str], float], None]):
+        with self._lock:
+            self._observers = self._observers + [observer]
+
+    def remove_observer(self, observer: Callable[[str, Dict[str, str], float], None]):
+        with self._lock:
+            self._observers = [o for o in self._observers if o is not observer]
+
+    def value(self, name: str, **labels) -> Optional[float]:
+        """Current value of a counter or gauge, or the observation count of a histogram."""
+        key = self._key(labels)
+        with self._lock:
+            if name in self._histograms:
+                entry = self._histograms[name].get(key)
+                return sum(entry[0]) if entry is not None else None
+            return self._values.get(name, {}).get(key)
+
+    def total(self, name: str, **labels) -> float:
+        """Sum of a counter over every label set that includes `labels`."""
+        wanted = set(self._key(labels))
+        with self._lock:
+            return sum(v for key, v in self._values.get(name, {}).items() if wanted <= set(key))
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ""
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._kinds):
+                kind = self._kinds[name]
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind.value}")
+                if kind != MetricKind.HISTOGRAM:
+                    for key, value in sorted(self._values.get(name, {}).items()):
+                        lines.append(f"{name}{self._format_labels(key)} {self._format_value(value)}")
+                    continue
+                bounds = self._buckets.get(name, DEFAULT_BUCKETS) + (math.inf,)
+                for key, (counts, total) in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(bounds, counts):
+                        cumulative += count
+                        le = (("le", self._format_value(bound)),)
+                        lines.append(f"{name}_bucket{self._format_labels(key, le)} {cumulative}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {self._format_value(total)}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+# Shared by the controller and the dashboard so /metrics sees everything
+instruments = Instrumentation()
@@ -0,0 +1,314 @@
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+import heapq
+import threading
+from src.controller.topology_model import ChangeType, TopologyChange, TopologyModel
+
+REFERENCE_BANDWIDTH = 1000  # Mbps, OSPF-style cost reference
+
+class Path(NamedTuple):
+    cost: float
+    nodes: List[str]
+    links: List[str]
+
+class RedundantPath(NamedTuple):
+    primary: Path
+    backup: Optional[Path]
+
+class PathComputer:
+    """Shortest, k-shortest and link-disjoint path computation over a TopologyModel.
+
+    Link cost is REFERENCE_BANDWIDTH / bandwidth plus the link latency in ms,
+    using the bandwidth/latency attributes stored on the model and falling
+    back to default_bandwidth(source, target) for links without attributes.
+
+    Redundant path results are cached per (source, destination). A reverse
+    index from link id to cached pairs lets link removals and cost increases
+    invalidate only the pairs that used the link. A link that is added or
+    gets cheaper only drops the pairs it could give a cheaper primary or
+    backup (see _invalidate_shortcuts).
+
+    Searches read the model's dictionaries under topology.lock, which is
+    taken before the computer's own lock (subscribers run under it too).
+    """
+
+    def __init__(
+        self,
+        topology: TopologyModel,
+        default_bandwidth: Optional[Callable[[str, str], float]] = None,
+        default_latency: float = 1.0
+    ):
+        self.topology = topology
+        self.default_bandwidth = default_bandwidth or (lambda source, target: REFERENCE_BANDWIDTH)
+        self.default_latency = default_latency
+        self._cache: Dict[Tuple[str, str], Optional[RedundantPath]] = {}
+        self._link_index: Dict[str, Set[Tuple[str, str]]] = {}
+        self._link_costs: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        topology.subscribe(self._on_topology_change)
+
+    def link_cost(self, link_id: str) -> float:
+        cost = self._link_costs.get(link_id)
+        if cost is None:
+            link = self.topology.links.get(link_id)
+            if link is None:
+                return float("inf")
+            bandwidth = self.topology.link_attribute(
+                link_id, "bandwidth", self.default_bandwidth(link["source"], link["target"])
+            )
+            latency = self.topology.link_attribute(link_id, "latency", self.default_latency)
+            cost = REFERENCE_BANDWIDTH / max(bandwidth, 1e-9) + latency
+            self._link_costs[link_id] = cost
+        return cost
+
+    def shortest_path(
+        self,
+        source: str,
+        destination: str,
+        excluded_links: FrozenSet[str] = frozenset(),
+        excluded_nodes: FrozenSet[str] = frozenset()
+    ) -> Optional[Path]:
+        """Dijkstra over the adjacency index, skipping excluded links and nodes."""
+        with self.topology.lock:
+            if source not in self.topology.adjacency or source in excluded_nodes:
+                return None
+            distances = {source: 0.0}
+            previous: Dict[str, Tuple[str, str]] = {}
+            heap = [(0.0, source)]
+            while heap:
+                distance, node = heapq.heappop(heap)
+                if node == destination:
+                    break
+                if distance > distances.get(node, float("inf")):
+                    continue
+                for neighbour, link_ids in self.topology.adjacency.get(node, {}).items():
+                    if neighbour in excluded_nodes:
+                        continue
+                    usable = [l for l in link_ids if l not in excluded_links]
+                    if not usable:
+                        continue
+                    link_id = min(usable, key=self.link_cost)
+                    candidate = distance + self.link_cost(link_id)
+                    if candidate < distances.get(neighbour, float("inf")):
+                        distances[neighbour] = candidate
+                        previous[neighbour] = (node, link_id)
+                        heapq.heappush(heap, (candidate, neighbour))
+
+            if destination not in distances:
+                return None
+            nodes = [destination]
+            links = []
+            while nodes[-1] != source:
+                node, link_id = previous[nodes[-1]]
+                nodes.append(node)
+                links.append(link_id)
+            nodes.reverse()
+            links.reverse()
+            return Path(distances[destination], nodes, links)
+
+    def k_shortest_paths(self, source: str, destination: str, k: int) -> List[Path]:
+        """Yen's algorithm for the k loop-free shortest paths."""
+        with self.topology.lock:
+            return self._k_shortest_paths(source, destination, k)
+
+    def _k_shortest_paths(self, source: str, destination: str, k: int) -> List[Path]:
+        first = self.shortest_path(source, destination)
+        if first is None:
+            return []
+        paths = [first]
+        candidates: List[Tuple[float, int, Path]] = []
+        seen = {tuple(first.nodes)}
+        counter = 0
+        while len(paths) < k:
+            last = paths[-1]
+            for i in range(len(last.nodes) - 1):
+                spur_node = last.nodes[i]
+                root_nodes = last.nodes[:i + 1]
+                root_links = last.links[:i]
+                excluded_links = {
+                    p.links[i] for p in paths
+                    if len(p.links) > i and p.nodes[:i + 1] == root_nodes
+                }
+                spur = self.shortest_path(
+                    spur_node, destination,
+                    excluded_links=frozenset(excluded_links),
+                    excluded_nodes=frozenset(root_nodes[:-1])
+                )
+                if spur is None:
+                    continue
+                nodes = root_nodes[:-1] + spur.nodes
+                if tuple(nodes) in seen:
+                    continue
+                seen.add(tuple(nodes))
+                links = root_links + spur.links
+                cost = sum(self.link_cost(l) for l in links)
+                counter += 1
+                heapq.heappush(candidates, (cost, counter, Path(cost, nodes, links)))
+            if not candidates:
+                break
+            paths.append(heapq.heappop(candidates)[2])
+        return paths
+
+    def _links_between_pairs(self, path: Path) -> FrozenSet[str]:
+        """All links, in both directions, between consecutive nodes of a path."""
+        excluded = set()
+        for a, b in zip(path.nodes, path.nodes[1:]):
+            excluded |= self.topology.links_between(a, b)
+            excluded |= self.topology.links_between(b, a)
+        return frozenset(excluded)
+
+    def disjoint_backup(self, primary: Path) -> Optional[Path]:
+        """Shortest path that shares no link with the primary path."""
+        return self.shortest_path(
+            primary.nodes[0], primary.nodes[-1],
+            excluded_links=self._links_between_pairs(primary)
+        )
+
+    def _compute_redundant(self, source: str, destination: str, k: int = 4) -> Optional[RedundantPath]:
+        primary = self.shortest_path(source, destination)
+        if primary is None:
+            return None
+        backup = self.disjoint_backup(primary)
+        if backup is None and len(primary.nodes) > 2:
+            # The shortest path can trap the backup; try the next best primaries
+            for candidate in self._k_shortest_paths(source, destination, k)[1:]:
+                backup = self.disjoint_backup(candidate)
+                if backup is not None:
+                    primary = candidate
+                    break
+        return RedundantPath(primary, backup)
+
+    def redundant_path(self, source: str, destination: str) -> Optional[RedundantPath]:
+        """Cached primary path plus link-disjoint backup between two nodes."""
+        key = (source, destination)
+        with self.topology.lock, self._lock:
+            if key in self._cache:
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+            result = self._compute_redundant(source, destination)
+            self._store(key, result)
+            return result
+
+    def precompute(self, endpoints: Iterable[str]) -> int:
+        """Fill the cache for every ordered pair of endpoints; returns pairs computed."""
+        endpoints = list(endpoints)
+        computed = 0
+        for source in endpoints:
+            for destination in endpoints:
+                # Locked per pair so topology updates are not held up for the whole run
+                with self.topology.lock, self._lock:
+                    if source == destination or (source, destination) in self._cache:
+                        continue
+                    self._store((source, destination), self._compute_redundant(source, destination))
+                    computed += 1
+        return computed
+
+    def _store(self, key: Tuple[str, str], result: Optional[RedundantPath]):
+        self._cache[key] = result
+        if result is None:
+            return
+        for path in (result.primary, result.backup):
+            if path is None:
+                continue
+            for link_id in path.links:
+                self._link_index.setdefault(link_id, set()).add(key)
+
+    def _forget(self, key: Tuple[str, str]):
+        """Drop a cached pair and its entries in the link index."""
+        result = self._cache.pop(key, None)
+        if result is None:
+            return
+        for path in (result.primary, result.backup):
+            if path is None:
+                continue
+            for link_id in path.links:
+                keys = self._link_index.get(link_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._link_index[link_id]
+
+    def invalidate_link(self, link_id: str):
+        """Drop cached pairs whose primary or backup path uses a link."""
+        with self._lock:
+            for key in self._link_index.pop(link_id, ()):
+                self._forget(key)
+
+    def _distances_from(self, source: str) -> Dict[str, float]:
+        """Shortest path cost from a node to every node it reaches."""
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue
+            for neighbour, link_ids in self.topology.adjacency.get(node, {}).items():
+                candidate = distance + min(self.link_cost(l) for l in link_ids)
+                if candidate < distances.get(neighbour, float("inf")):
+                    distances[neighbour] = candidate
+                    heapq.heappush(heap, (candidate, neighbour))
+        return distances
+
+    def _invalidate_shortcuts(self, link_id: str, distances: Dict[str, Dict[str, float]]):
+        """Drop cached pairs that a new or cheaper link could improve.
+
+        A path through the link costs at least dist(source, link source) +
+        link cost + dist(link target, destination). Pairs whose primary and
+        backup are no dearer than that keep their entry, unless the primary
+        is not the shortest path (the backup fallback picked another one, and
+        the link may give the shortest a backup). distances memoises the
+        single-source costs across the changes of one update.
+        """
+        link = self.topology.links.get(link_id)
+        if link is None or not self._cache:
+            return
+
+        def costs_from(node: str) -> Dict[str, float]:
+            if node not in distances:
+                distances[node] = self._distances_from(node)
+            return distances[node]
+
+        inf = float("inf")
+        link_cost = self.link_cost(link_id)
+        from_target = costs_from(link["target"])
+        for key, result in list(self._cache.items()):
+            source, destination = key
+            from_source = costs_from(source)
+            bound = from_source.get(link["source"], inf) + link_cost + from_target.get(destination, inf)
+            if bound == inf:
+                continue
+            if (result is None or result.backup is None
+                    or bound < max(result.primary.cost, result.backup.cost) - 1e-9
+                    or from_source.get(destination, inf) < result.primary.cost - 1e-9):
+                self._forget(key)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._link_index.clear()
+
+    def _on_topology_change(self, changes: List[TopologyChange]):
+        link_changes = (ChangeType.LINK_ADDED, ChangeType.LINK_UPDATED, ChangeType.LINK_REMOVED)
+        with self._lock:
+            # Forget every changed cost first so distances see the whole update
+            old_costs = {
+                change.item_id: self._link_costs.pop(change.item_id, None)
+                for change in changes if change.change_type in link_changes
+            }
+            distances: Dict[str, Dict[str, float]] = {}
+            for change in changes:
+                if change.change_type == ChangeType.LINK_REMOVED:
+                    self.invalidate_link(change.item_id)
+                elif change.change_type == ChangeType.LINK_UPDATED:
+                    old_cost = old_costs[change.item_id]
+                    self.invalidate_link(change.item_id)
+                    if old_cost is None or self.link_cost(change.item_id) < old_cost:
+                        self._invalidate_shortcuts(change.item_id, distances)
+                elif change.change_type == ChangeType.LINK_ADDED:
+                    self._invalidate_shortcuts(change.item_id, distances)
+                elif change.change_type == ChangeType.NODE_REMOVED:
+                    # Links of a removed node are reported separately
+                    for key in [key for key in self._cache if change.item_id in key]:
+                        self._forget(key)
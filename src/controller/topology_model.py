@@ -0,0 +1,245 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+from enum import Enum
+import threading
+import time
+
+class ChangeType(Enum):
+    NODE_ADDED = "node_added"
+    NODE_UPDATED = "node_updated"
+    NODE_REMOVED = "node_removed"
+    LINK_ADDED = "link_added"
+    LINK_UPDATED = "link_updated"
+    LINK_REMOVED = "link_removed"
+
+class TopologyChange(NamedTuple):
+    change_type: ChangeType
+    item_id: str
+    data: Dict
+
+class TopologyModel:
+    """Indexed in-memory view of the operational network topology.
+
+    Nodes and links are kept in dictionaries keyed by their ODL ids, with an
+    adjacency index of node -> neighbour -> link ids. The model is updated by
+    diffing successive network-topology snapshots (or by feeding individual
+    add/remove calls from a data-change notification stream), and every
+    update produces a list of TopologyChange events that are also delivered
+    to subscribers.
+
+    observed_at is the time.monotonic() at which the network looked like
+    the model, and changed_after the earliest time the changes being
+    delivered can have happened: the previous snapshot for snapshot diffs,
+    the moment of the call for individual adds and removes.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict] = {}
+        self.links: Dict[str, Dict] = {}
+        self.adjacency: Dict[str, Dict[str, Set[str]]] = {}
+        self._node_links: Dict[str, Set[str]] = {}
+        self.link_attributes: Dict[str, Dict] = {}
+        self.version = 0
+        self.observed_at: Optional[float] = None
+        self.changed_after: Optional[float] = None
+        self._listeners: List[Callable[[List[TopologyChange]], None]] = []
+        self._lock = threading.RLock()
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Held while the model changes and while subscribers run; hold it to read a consistent view."""
+        return self._lock
+
+    def _observe(self, observed_at: float):
+        self.changed_after = observed_at if self.observed_at is None else self.observed_at
+        self.observed_at = observed_at
+
+    def subscribe(self, callback: Callable[[List[TopologyChange]], None]):
+        """Register a callback that receives the change list of every update."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[TopologyChange]], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    @staticmethod
+    def _parse_node(node: Dict) -> Dict:
+        return {
+            "id": node["node-id"],
+            "ports": sorted(tp["tp-id"] for tp in node.get("termination-point", []))
+        }
+
+    @staticmethod
+    def _parse_link(link: Dict) -> Dict:
+        source = link.get("source", {})
+        destination = link.get("destination", {})
+        return {
+            "id": link["link-id"],
+            "source": source.get("source-node"),
+            "target": destination.get("dest-node"),
+            "source_tp": source.get("source-tp"),
+            "target_tp": destination.get("dest-tp")
+        }
+
+    def apply_snapshot(self, document: Dict, observed_at: Optional[float] = None) -> List[TopologyChange]:
+        """Diff a full network-topology document against the model and apply it.
+
+        observed_at (time.monotonic()) defaults to now; pass the time the
+        document was requested when it is known.
+        """
+        new_nodes = {}
+        new_links = {}
+        for topology in document.get("network-topology", {}).get("topology", []):
+            for node in topology.get("node", []):
+                parsed = self._parse_node(node)
+                new_nodes[parsed["id"]] = parsed
+            for link in topology.get("link", []):
+                parsed = self._parse_link(link)
+                new_links[parsed["id"]] = parsed
+
+        with self._lock:
+            self._observe(time.monotonic() if observed_at is None else observed_at)
+            changes = []
+            # Links go first on removal so adjacency never points at a missing node
+            for link_id in [l for l in self.links if l not in new_links]:
+                changes.append(self._remove_link(link_id))
+            for node_id in [n for n in self.nodes if n not in new_nodes]:
+                changes.append(self._remove_node(node_id))
+            for node_id, node in new_nodes.items():
+                change = self._put_node(node)
+                if change:
+                    changes.append(change)
+            for link_id, link in new_links.items():
+                change = self._put_link(link)
+                if change:
+                    changes.append(change)
+            return self._commit(changes)
+
+    def add_node(self, node: Dict) -> List[TopologyChange]:
+        """Apply a single node add/update, e.g. from a data-change notification."""
+        with self._lock:
+            self.changed_after = time.monotonic()
+            change = self._put_node(self._parse_node(node))
+            return self._commit([change] if change else [])
+
+    def remove_node(self, node_id: str) -> List[TopologyChange]:
+        with self._lock:
+            self.changed_after = time.monotonic()
+            if node_id not in self.nodes:
+                return []
+            changes = [self._remove_link(l) for l in self.links_of(node_id)]
+            changes.append(self._remove_node(node_id))
+            return self._commit(changes)
+
+    def add_link(self, link: Dict) -> List[TopologyChange]:
+        """Apply a single link add/update, e.g. from a data-change notification."""
+        with self._lock:
+            self.changed_after = time.monotonic()
+            change = self._put_link(self._parse_link(link))
+            return self._commit([change] if change else [])
+
+    def remove_link(self, link_id: str) -> List[TopologyChange]:
+        with self._lock:
+            self.changed_after = time.monotonic()
+            if link_id not in self.links:
+                return []
+            return self._commit([self._remove_link(link_id)])
+
+    def set_link_attributes(self, link_id: str, **attributes) -> List[TopologyChange]:
+        """Attach attributes such as bandwidth or latency to a link.
+
+        Attributes live beside the parsed link so they survive snapshot diffs.
+        """
+        with self._lock:
+            current = self.link_attributes.get(link_id, {})
+            updated = {**current, **attributes}
+            if updated == current:
+                return []
+            self.link_attributes[link_id] = updated
+            if link_id not in self.links:
+                return []
+            return self._commit([TopologyChange(ChangeType.LINK_UPDATED, link_id, self.links[link_id])])
+
+    def link_attribute(self, link_id: str, name: str, default=None):
+        return self.link_attributes.get(link_id, {}).get(name, default)
+
+    def _commit(self, changes: List[TopologyChange]) -> List[TopologyChange]:
+        if changes:
+            self.version += 1
+            for callback in list(self._listeners):
+                callback(changes)
+        return changes
+
+    def _put_node(self, node: Dict) -> Optional[TopologyChange]:
+        node_id = node["id"]
+        existing = self.nodes.get(node_id)
+        if existing == node:
+            return None
+        self.nodes[node_id] = node
+        self.adjacency.setdefault(node_id, {})
+        change_type = ChangeType.NODE_ADDED if existing is None else ChangeType.NODE_UPDATED
+        return TopologyChange(change_type, node_id, node)
+
+    def _remove_node(self, node_id: str) -> TopologyChange:
+        node = self.nodes.pop(node_id)
+        self.adjacency.pop(node_id, None)
+        return TopologyChange(ChangeType.NODE_REMOVED, node_id, node)
+
+    def _put_link(self, link: Dict) -> Optional[TopologyChange]:
+        link_id = link["id"]
+        existing = self.links.get(link_id)
+        if existing == link:
+            return None
+        if existing is not None:
+            self._unindex_link(existing)
+        self.links[link_id] = link
+        self.adjacency.setdefault(link["source"], {}).setdefault(link["target"], set()).add(link_id)
+        self._node_links.setdefault(link["source"], set()).add(link_id)
+        self._node_links.setdefault(link["target"], set()).add(link_id)
+        change_type = ChangeType.LINK_ADDED if existing is None else ChangeType.LINK_UPDATED
+        return TopologyChange(change_type, link_id, link)
+
+    def _remove_link(self, link_id: str) -> TopologyChange:
+        link = self.links.pop(link_id)
+        self._unindex_link(link)
+        return TopologyChange(ChangeType.LINK_REMOVED, link_id, link)
+
+    def _unindex_link(self, link: Dict):
+        for node_id in (link["source"], link["target"]):
+            node_links = self._node_links.get(node_id)
+            if node_links is not None:
+                node_links.discard(link["id"])
+                if not node_links:
+                    del self._node_links[node_id]
+        neighbours = self.adjacency.get(link["source"], {})
+        link_ids = neighbours.get(link["target"])
+        if link_ids is not None:
+            link_ids.discard(link["id"])
+            if not link_ids:
+                del neighbours[link["target"]]
+
+    def neighbors(self, node_id: str) -> Iterable[str]:
+        return self.adjacency.get(node_id, {}).keys()
+
+    def links_between(self, source: str, target: str) -> Set[str]:
+        return set(self.adjacency.get(source, {}).get(target, ()))
+
+    def links_of(self, node_id: str) -> List[str]:
+        """Ids of all links that start or end at a node."""
+        return list(self._node_links.get(node_id, ()))
+
+    def switch_ids(self) -> List[str]:
+        """Ids of switch nodes; hosts learned by the host tracker are skipped."""
+        return [node_id for node_id in self.nodes if not node_id.startswith("host:")]
+
+    def to_dict(self) -> Dict:
+        """Simplified node/link view used by the dashboard."""
+        with self._lock:
+            return {
+                "nodes": [{"id": node_id, "ports": len(node["ports"])} for node_id, node in self.nodes.items()],
+                "links": [
+                    {"id": link["id"], "source": link["source"], "target": link["target"]}
+                    for link in self.links.values()
+                ],
+                "switches": self.switch_ids(),
+                "version": self.version
+            }
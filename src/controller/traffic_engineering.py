@@ -0,0 +1,229 @@
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from collections import deque
+import threading
+import time
+
+RouteKey = Tuple[str, str]
+Hop = Tuple[str, str]
+
+class Move(NamedTuple):
+    route: RouteKey
+    primary_path: List[str]
+    backup_path: List[str]
+    bottleneck: float  # projected utilisation (%) of the busiest hop on the new primary
+
+class TrafficEngineer:
+    """Load-aware rerouting of redundant routes away from congested links.
+
+    Link utilisation (percent of capacity, per directed hop) is fed in with
+    observe() and smoothed with an EWMA. Each cycle only looks at hops above
+    high_water and, through a hop -> routes index, at the routes whose
+    active primary crosses them, so the work follows congestion rather than
+    the number of routes.
+
+    Candidates for a route are its backup path (the primary and backup then
+    swap roles, which keeps them disjoint) and the near-equal-cost paths
+    (within `stretch` of the best) that stay disjoint from the backup. In
+    the 3-tier topology these are the paths through the second
+    distribution uplink. Each candidate is scored with a congestion-aware
+    weight, cost / (1 - utilisation), against utilisations projected from
+    the moves made so far in the cycle. A route's share of a hot hop is
+    estimated as the hop's load split evenly over its routes.
+
+    Damping: a hop becomes hot above high_water and is relieved until it is
+    projected at low_water; a route only moves if its new bottleneck stays
+    below low_water, a moved route is held for hold_time seconds, and at
+    most max_moves routes move per cycle.
+    """
+
+    def __init__(
+        self,
+        controller,
+        failover,
+        interval: float = 10.0,
+        alpha: float = 0.5,
+        high_water: float = 80.0,
+        low_water: float = 60.0,
+        hold_time: float = 60.0,
+        max_moves: int = 100,
+        k: int = 4,
+        stretch: float = 0.25
+    ):
+        if low_water >= high_water:
+            raise ValueError("low_water must be below high_water")
+        self.controller = controller
+        self.failover = failover
+        self.interval = interval
+        self.alpha = alpha
+        self.high_water = high_water
+        self.low_water = low_water
+        self.hold_time = hold_time
+        self.max_moves = max_moves
+        self.k = k
+        self.stretch = stretch
+        self.utilization: Dict[Hop, float] = {}
+        self._hop_routes: Dict[Hop, Set[RouteKey]] = {}
+        self._indexed: Dict[RouteKey, Tuple[str, ...]] = {}
+        self._candidates: Dict[Tuple[str, str], Tuple[int, List[List[str]]]] = {}
+        self._moved_at: Dict[RouteKey, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.moves: deque = deque(maxlen=1000)
+        self.cycle_times: deque = deque(maxlen=100)
+
+    @staticmethod
+    def _hops(path: List[str]) -> List[Hop]:
+        return list(zip(path, path[1:]))
+
+    def observe(self, utilization: Dict[Hop, float]):
+        """Fold a utilisation sample (percent per directed hop) into the EWMA."""
+        with self._lock:
+            for hop, value in utilization.items():
+                previous = self.utilization.get(hop)
+                self.utilization[hop] = value if previous is None else (
+                    self.alpha * value + (1 - self.alpha) * previous
+                )
+
+    def _sync_routes(self) -> Dict[RouteKey, Dict]:
+        """Bring the hop -> routes index in line with the failover manager's routes."""
+        routes = self.failover.active_routes()
+        for key in [key for key in self._indexed if key not in routes]:
+            self._unindex(key)
+        for key, route in routes.items():
+            path = tuple(route["primary_path"])
+            if self._indexed.get(key) != path:
+                self._unindex(key)
+                self._indexed[key] = path
+                for hop in self._hops(route["primary_path"]):
+                    self._hop_routes.setdefault(hop, set()).add(key)
+        return routes
+
+    def _unindex(self, key: RouteKey):
+        path = self._indexed.pop(key, None)
+        if path is None:
+            return
+        for hop in self._hops(list(path)):
+            keys = self._hop_routes.get(hop)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._hop_routes[hop]
+
+    def _equal_cost_paths(self, source: str, destination: str) -> List[List[str]]:
+        """Paths within `stretch` of the best, cached per topology version."""
+        version = self.controller.topology.version
+        cached = self._candidates.get((source, destination))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        paths = self.controller.paths.k_shortest_paths(source, destination, self.k)
+        best = paths[0].cost if paths else 0
+        result = [p.nodes for p in paths if p.cost <= best * (1 + self.stretch)]
+        self._candidates[(source, destination)] = (version, result)
+        return result
+
+    def _hop_cost(self, hop: Hop, projected: Dict[Hop, float]) -> float:
+        links = self.controller.topology.links_between(*hop)
+        base = min((self.controller.paths.link_cost(link_id) for link_id in links), default=1.0)
+        headroom = max(1 - projected.get(hop, 0.0) / 100, 0.05)
+        return base / headroom
+
+    def _best_move(self, key: RouteKey, route: Dict, share: float, projected: Dict[Hop, float]) -> Optional[Move]:
+        primary = route["primary_path"]
+        backup = route["backup_path"]
+        backup_hops = {frozenset(hop) for hop in self._hops(backup)}
+        candidates = [(backup, primary)]
+        for path in self._equal_cost_paths(primary[0], primary[-1]):
+            if path != primary and not backup_hops & {frozenset(hop) for hop in self._hops(path)}:
+                candidates.append((path, backup))
+
+        best = None
+        for new_primary, new_backup in candidates:
+            hops = self._hops(new_primary)
+            if not hops:
+                continue
+            bottleneck = max(projected.get(hop, 0.0) for hop in hops) + share
+            if bottleneck >= self.low_water:
+                continue
+            score = sum(self._hop_cost(hop, projected) for hop in hops)
+            if best is None or score < best[0]:
+                best = (score, Move(key, list(new_primary), list(new_backup), bottleneck))
+        return best[1] if best else None
+
+    def plan(self, now: Optional[float] = None) -> List[Move]:
+        """Choose the routes to move off hot hops, without programming anything."""
+        now = time.time() if now is None else now
+        routes = self._sync_routes()
+        with self._lock:
+            projected = dict(self.utilization)
+        hot = sorted(
+            (hop for hop, value in projected.items() if value > self.high_water and hop in self._hop_routes),
+            key=lambda hop: projected[hop],
+            reverse=True
+        )
+
+        moves: List[Move] = []
+        moved: Set[RouteKey] = set()
+        for hop in hot:
+            keys = sorted(self._hop_routes.get(hop, ()))
+            share = projected[hop] / len(keys)
+            for key in keys:
+                if projected[hop] <= self.low_water or len(moves) >= self.max_moves:
+                    break
+                if key in moved or now - self._moved_at.get(key, float("-inf")) < self.hold_time:
+                    continue
+                move = self._best_move(key, routes[key], share, projected)
+                if move is None:
+                    continue
+                for old_hop in self._hops(routes[key]["primary_path"]):
+                    projected[old_hop] = max(projected.get(old_hop, 0.0) - share, 0.0)
+                for new_hop in self._hops(move.primary_path):
+                    projected[new_hop] = projected.get(new_hop, 0.0) + share
+                moves.append(move)
+                moved.add(key)
+        return moves
+
+    def run_cycle(self) -> List[Move]:
+        """Plan and program one round of moves; returns the moves that succeeded."""
+        started = time.perf_counter()
+        applied = []
+        for move in self.plan():
+            source, destination = move.route
+            primary_ok, backup_ok = self.controller.setup_redundant_path(
+                source, destination, move.primary_path, move.backup_path
+            )
+            if primary_ok and backup_ok:
+                self._moved_at[move.route] = time.time()
+                self.moves.append((time.time(), move))
+                applied.append(move)
+        self.cycle_times.append(time.perf_counter() - started)
+        return applied
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_cycle()
+            except Exception as e:
+                print(f"Error in traffic engineering cycle: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hot = sum(1 for value in self.utilization.values() if value > self.high_water)
+        return {
+            "tracked_routes": len(self._indexed),
+            "hot_links": hot,
+            "moves": len(self.moves),
+            "last_cycle_ms": self.cycle_times[-1] * 1000 if self.cycle_times else None
+        }
@@ -0,0 +1,139 @@
+# src/dashboard/alerts.py
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, NamedTuple, Optional, Set
+from src.controller.enhanced_sdn_controller import SwitchType
+from src.dashboard.metrics_store import MetricsTransaction
+
+class AlertLevel(Enum):
+    WARNING = "warning"
+    CRITICAL = "critical"
+
+class LoadThreshold(NamedTuple):
+    """Raise a load alert above `high`; once raised, clear it only below `low`"""
+    high: float
+    low: float
+
+# Core links aggregate the most traffic, so they get the tightest limits
+DEFAULT_LOAD_THRESHOLDS = {
+    SwitchType.CORE: LoadThreshold(70, 60),
+    SwitchType.DISTRIBUTION: LoadThreshold(80, 70),
+    SwitchType.ACCESS: LoadThreshold(90, 80)
+}
+
+class AlertEngine:
+    """Derives the active alerts from switch and link metrics, incrementally.
+
+    Registered as a MetricsStore commit hook, it only evaluates the switches
+    and links a transaction touched and writes the outcome to the `alerts`
+    section of the same version, so the cost follows the rate of change and
+    readers get the active set without scanning the network.
+
+    Every condition has a stable id (switch:<id>:down, switch:<id>:load,
+    link:<id>:status). While a condition holds its alert is kept with its
+    original first_seen and only last_seen and the details are refreshed;
+    when it clears the alert is deleted. Load alerts use per-layer
+    thresholds with hysteresis so a switch hovering around the limit does
+    not flap.
+    """
+
+    def __init__(
+        self,
+        thresholds: Optional[Dict[SwitchType, LoadThreshold]] = None,
+        section: str = 'alerts',
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.thresholds = dict(DEFAULT_LOAD_THRESHOLDS)
+        for layer, threshold in (thresholds or {}).items():
+            self.set_threshold(layer, *threshold)
+        self.section = section
+        self.clock = clock
+        self.raised = 0
+        self.cleared = 0
+
+    def set_threshold(self, layer: SwitchType, high: float, low: float):
+        if low > high:
+            raise ValueError(f"Clear level {low} is above raise level {high} for {layer.value}")
+        self.thresholds[layer] = LoadThreshold(high, low)
+
+    def evaluate(self, tx: MetricsTransaction, touched: Dict[str, Set[str]]):
+        """Commit hook: re-evaluate the rules for the touched switches and links"""
+        switches = touched.get('switches', ())
+        links = touched.get('links', ())
+        if not switches and not links:
+            return
+        now = self.clock().isoformat()
+        for switch_id in switches:
+            self._evaluate_switch(tx, switch_id, now)
+        for link_id in links:
+            self._evaluate_link(tx, link_id, now)
+
+    def _evaluate_switch(self, tx: MetricsTransaction, switch_id: str, now: str):
+        down_id = f"switch:{switch_id}:down"
+        load_id = f"switch:{switch_id}:load"
+        metrics = tx.get('switches', switch_id)
+        if metrics is None:
+            self._clear(tx, down_id)
+            self._clear(tx, load_id)
+            return
+
+        status = metrics.get('status')
+        # None: first seen through an event, status not known yet
+        if status is not None and not status:
+            self._raise(tx, down_id, AlertLevel.CRITICAL, f"Switch {switch_id} is down", now)
+            # A down switch reports no meaningful load
+            self._clear(tx, load_id)
+            return
+        self._clear(tx, down_id)
+
+        try:
+            layer = SwitchType(metrics.get('type'))
+        except ValueError:
+            layer = SwitchType.ACCESS
+        threshold = self.thresholds[layer]
+        load = metrics['load']
+        active = tx.get(self.section, load_id) is not None
+        if load > threshold.high or (active and load >= threshold.low):
+            self._raise(
+                tx, load_id, AlertLevel.WARNING, f"High load on switch {switch_id}: {load}%", now,
+                value=load, threshold=threshold.high
+            )
+        else:
+            self._clear(tx, load_id)
+
+    def _evaluate_link(self, tx: MetricsTransaction, link_id: str, now: str):
+        alert_id = f"link:{link_id}:status"
+        metrics = tx.get('links', link_id)
+        status = metrics.get('status', 'active') if metrics is not None else 'active'
+        if status == 'active':
+            self._clear(tx, alert_id)
+            return
+        level = AlertLevel.WARNING if status == 'degraded' else AlertLevel.CRITICAL
+        self._raise(tx, alert_id, level, f"Link {link_id} is {status}", now)
+
+    def _raise(self, tx: MetricsTransaction, alert_id: str, level: AlertLevel, message: str, now: str, **details):
+        current = tx.get(self.section, alert_id)
+        if current is None:
+            self.raised += 1
+        tx.set(self.section, alert_id, {
+            'id': alert_id,
+            'level': level.value,
+            'message': message,
+            'first_seen': current['first_seen'] if current is not None else now,
+            'last_seen': now,
+            **details
+        })
+
+    def _clear(self, tx: MetricsTransaction, alert_id: str):
+        if tx.get(self.section, alert_id) is not None:
+            tx.delete(self.section, alert_id)
+            self.cleared += 1
+
+    def stats(self) -> Dict:
+        return {
+            'raised': self.raised,
+            'cleared': self.cleared,
+            'thresholds': {
+                layer.value: threshold._asdict() for layer, threshold in self.thresholds.items()
+            }
+        }
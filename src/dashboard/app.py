@@ -1,156 +1,859 @@
 # src/dashboard/app.py
-from flask import Flask, render_template, jsonify, request
-from web3 import Web3
+from flask import Blueprint, Flask, Response, render_template, jsonify, request
 import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
+import cProfile
+import io
+import os
+import pstats
+import sys
 import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
 from src.controller.enhanced_sdn_controller import EnhancedOpenDaylightController, SwitchType
+from src.controller.topology_model import ChangeType, TopologyChange
+from src.controller.failover import FailoverManager
+from src.controller.traffic_engineering import TrafficEngineer
+from src.controller.chain_encoding import decode_id, encode_id
+from src.controller.contract_artifact import load_artifact
+from src.controller.instrumentation import MetricKind, instruments
+from src.dashboard.alerts import AlertEngine
+from src.dashboard.chain import ChainMetricsReader
+from src.dashboard.config import DashboardConfig
+from src.dashboard.metrics_store import MetricsSnapshot, MetricsStore
+from src.dashboard.responses import BodyCache, compression_cache, conditional_response
+from src.dashboard.shared_state import CommandChannel, LeaderLock, SharedSnapshot, apply_sections, private_directory
+from src.dashboard.timeseries import LINK_RATE_FIELDS, LinkRates, TimeSeriesStore
 
-app = Flask(__name__)
+dashboard = Blueprint('dashboard', __name__)
 
-# Initialize Web3 and contract
-w3 = Web3(Web3.HTTPProvider('http://localhost:8545'))
-with open('build/contracts/EnhancedNetworkManager.json') as f:
-    contract_json = json.load(f)
-contract_address = '0xCFFb65E9e2688B1E7F925843e6FE4d3fF152A446'  # Deploy contract and put address here
-contract = w3.eth.contract(address=contract_address, abi=contract_json['abi'])
+class DashboardClients:
+    """Chain and ODL clients, and everything built on them, created on first use.
 
-# Initialize OpenDaylight controller
-sdn_controller = EnhancedOpenDaylightController()
+    Nothing connects to the chain or ODL, or reads the contract artifact,
+    until a poll cycle or request needs it, so importing this module and
+    forking workers is cheap and followers never build the poll-only parts.
+    """
 
-# Cache for network metrics
-metrics_cache = {
-    'switches': {},
-    'links': {},
-    'paths': {},
-    'layer_stats': {}
-}
+    def __init__(self, config: DashboardConfig):
+        self.config = config
+        self._built: Dict[str, object] = {}
+        self._lock = threading.RLock()
+
+    def configure(self, config: DashboardConfig):
+        """Use a new config; clients built with the old one are dropped."""
+        with self._lock:
+            controller = self._built.get('controller')
+            if controller is not None:
+                controller.close()
+            self._built.clear()
+            self.config = config
+
+    def _get(self, name: str, build: Callable[[], object]):
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = build()
+            return self._built[name]
+
+    def built(self, name: str) -> bool:
+        return name in self._built
+
+    def provide(self, name: str, client: object):
+        """Use an already built client (e.g. a stand-in) instead of building one."""
+        with self._lock:
+            self._built[name] = client
+
+    @property
+    def stream_slots(self) -> threading.BoundedSemaphore:
+        # Each open stream holds one of this worker's threads (or greenlets)
+        return self._get('stream_slots', lambda: threading.BoundedSemaphore(self.config.max_streams))
+
+    @property
+    def w3(self):
+        def build():
+            # Imported here so the dashboard can be imported (and tested) without web3
+            from web3 import Web3
+            return Web3(Web3.HTTPProvider(self.config.web3_url, request_kwargs={'timeout': self.config.web3_timeout}))
+        return self._get('w3', build)
+
+    @property
+    def contract(self):
+        def build():
+            contract_json = load_artifact(self.config.contract_artifact)
+            return self.w3.eth.contract(address=self.config.contract_address, abi=contract_json['abi'])
+        return self._get('contract', build)
+
+    @property
+    def controller(self) -> EnhancedOpenDaylightController:
+        def build():
+            controller = EnhancedOpenDaylightController(host=self.config.odl_host, port=self.config.odl_port)
+            # The failover watcher refreshes the topology between polls too,
+            # so listen to the model rather than to our own refresh
+            controller.topology.subscribe(drop_removed_entries)
+            return controller
+        return self._get('controller', build)
+
+    @property
+    def failover(self) -> FailoverManager:
+        return self._get('failover', lambda: FailoverManager(
+            self.controller, on_failover=record_failover, poll_interval=self.config.failover_interval
+        ))
+
+    @property
+    def traffic_engineer(self) -> TrafficEngineer:
+        # Moves routes off congested links using the utilisation measured by the poller
+        return self._get('traffic_engineer', lambda: TrafficEngineer(self.controller, self.failover))
+
+    @property
+    def poll_executor(self) -> ThreadPoolExecutor:
+        # Workers shared by the switch (chain) and link (RESTCONF) reads of a poll cycle
+        return self._get('poll_executor', lambda: ThreadPoolExecutor(max_workers=16, thread_name_prefix='metrics-poll'))
+
+    @property
+    def chain_reader(self) -> ChainMetricsReader:
+        return self._get('chain_reader', lambda: ChainMetricsReader(self.contract, self.poll_executor))
+
+    @property
+    def event_indexer(self):
+        def build():
+            from src.dashboard.events import ContractEventIndexer
+            return ContractEventIndexer(
+                self.w3,
+                self.contract,
+                handlers={
+                    'MetricsUpdated': on_metrics_updated,
+                    'SwitchStatusChanged': on_switch_status_changed,
+                    'LinkStateChanged': on_link_state_changed,
+                    'PathFailover': on_path_failover
+                },
+                resync=resync_switch_metrics,
+                checkpoint_path=os.path.join(self.config.state_dir, 'events-checkpoint.json')
+            )
+        return self._get('event_indexer', build)
+
+clients = DashboardClients(DashboardConfig())
+
+def record_failover(source: str, destination: str):
+    """Mirror a local failover on-chain; runs off the failover path"""
+    with instruments.timer('contract_call_seconds', function='triggerFailover', kind='transact'):
+        clients.contract.functions.triggerFailover(
+            encode_id(source), encode_id(destination)
+        ).transact({'from': clients.w3.eth.accounts[0]})
+
+# Cache for network metrics; readers take immutable snapshots. The alerts
+# section is derived from switches and links by the alert engine
+metrics_store = MetricsStore(('switches', 'links', 'paths', 'layer_stats', 'alerts'))
+alert_engine = AlertEngine()  # hooked into the store by the polling process only
+
+# Rate history per link (from port counters) and load history per switch
+link_rates = LinkRates()
+switch_history = TimeSeriesStore(('load',))
+
+# Switches that joined the topology and still need one initial chain read
+new_switches = set()
+LINK_STATES = ('active', 'degraded', 'failed')  # EnhancedNetworkManager.LinkState
+
+def drop_removed_entries(changes: List[TopologyChange]):
+    """Drop cache entries for switches and links that left the topology"""
+    with metrics_store.transaction() as tx:
+        for change in changes:
+            if change.change_type == ChangeType.NODE_ADDED and not change.item_id.startswith('host:'):
+                new_switches.add(change.item_id)
+            elif change.change_type == ChangeType.NODE_REMOVED:
+                new_switches.discard(change.item_id)
+                tx.delete('switches', change.item_id)
+                switch_history.remove(change.item_id)
+            elif change.change_type == ChangeType.LINK_REMOVED:
+                link = change.data
+                link_id = f"{link['source']}_{link['target']}"
+                tx.delete('links', link_id)
+                link_rates.remove(link_id)
+
+def stamp(previous: Optional[Dict], entry: Dict) -> Dict:
+    """entry with last_updated set to now, or kept from previous if nothing else changed
+
+    An unchanged entry then commits as a no-op, so it is left out of the
+    version, the deltas and the SSE events.
+    """
+    if previous and {k: v for k, v in previous.items() if k != 'last_updated'} == entry:
+        return {**entry, 'last_updated': previous.get('last_updated')}
+    return {**entry, 'last_updated': datetime.now().isoformat()}
+
+def store_switch_metrics(switch_metrics: Dict[str, Dict]):
+    """Store switch metrics read through view calls"""
+    with metrics_store.transaction() as tx:
+        for switch_id, metrics in switch_metrics.items():
+            switch_type = clients.controller.get_switch_type(switch_id)
+            switch_history.record(switch_id, metrics['lastUpdated'] or time.time(), (metrics['currentLoad'],))
+            tx.set('switches', switch_id, stamp(tx.get('switches', switch_id), {
+                'type': switch_type.value,
+                'load': metrics['currentLoad'],
+                'status': metrics['isActive']
+            }))
+
+def resync_switch_metrics():
+    """Full re-read of every known switch; used on startup and after gaps"""
+    switch_metrics = clients.chain_reader.read_switch_metrics(clients.controller.topology.switch_ids())
+    store_switch_metrics(switch_metrics)
+    # Switches that joined during the read, or whose chunk failed, still need theirs
+    new_switches.difference_update(switch_metrics)
+
+def read_new_switches():
+    """Initial chain read of switches that joined; the ones not read stay pending"""
+    try:
+        switch_metrics = clients.chain_reader.read_switch_metrics(list(new_switches))
+    except Exception as e:
+        print(f"Error reading new switches from the chain: {e}")
+        return
+    store_switch_metrics(switch_metrics)
+    # Chunks that failed or timed out are left out of the result
+    new_switches.difference_update(switch_metrics)
+
+def update_tracked_switch(event, **fields):
+    """Update the switch an event refers to, if the switch is in the topology
+
+    A switch first seen through an event has an unknown status (None) until
+    a status event or the next chain read says otherwise.
+    """
+    switch_id = decode_id(event['args']['switchId'])
+    if switch_id not in clients.controller.topology.nodes:
+        return
+    with metrics_store.transaction() as tx:
+        if tx.get('switches', switch_id) is None:
+            tx.set('switches', switch_id, {
+                'type': clients.controller.get_switch_type(switch_id).value,
+                'load': 0,
+                'status': None,
+                'last_updated': None
+            })
+        tx.merge('switches', switch_id, **fields)
+
+def on_metrics_updated(event):
+    switch_id = decode_id(event['args']['switchId'])
+    if switch_id in clients.controller.topology.nodes:
+        switch_history.record(switch_id, event['args']['timestamp'], (event['args']['load'],))
+    update_tracked_switch(
+        event,
+        load=event['args']['load'],
+        last_updated=datetime.fromtimestamp(event['args']['timestamp']).isoformat()
+    )
+
+def on_switch_status_changed(event):
+    update_tracked_switch(event, status=event['args']['isActive'])
+
+def on_link_state_changed(event):
+    link_id = f"{decode_id(event['args']['sourceId'])}_{decode_id(event['args']['destId'])}"
+    with metrics_store.transaction() as tx:
+        tx.merge('links', link_id, status=LINK_STATES[event['args']['state']])
+
+def on_path_failover(event):
+    with metrics_store.transaction() as tx:
+        tx.set('paths', event['args']['pathId'].hex(), {
+            'primary_active': event['args']['isPrimaryActive'],
+            'block': event['blockNumber']
+        })
+
+def refresh_metrics():
+    """Run one poll cycle: topology, switch metrics from the chain and link counters"""
+    # One transaction per cycle, so readers see a single new version
+    with metrics_store.transaction() as tx:
+        topology = clients.controller.topology
+        clients.controller.refresh_topology()
+        links = list(topology.links.values())
+        link_endpoints = {f"{link['source']}_{link['target']}": (link['source'], link['target']) for link in links}
+
+        # Start the link reads first so they overlap with the chain reads
+        link_futures = {
+            clients.poll_executor.submit(clients.controller.monitor_link_metrics, f"{link['source']}_{link['target']}"):
+                f"{link['source']}_{link['target']}"
+            for link in links
+        }
+
+        # Switch metrics follow contract events (see follow_contract_events);
+        # only switches that just joined the topology are read through view calls
+        if new_switches:
+            read_new_switches()
+
+        # Update link metrics; links that do not answer in time keep their last value
+        utilization = {}
+        done, not_done = wait(link_futures, timeout=clients.config.link_read_timeout)
+        for future in not_done:
+            future.cancel()
+        samples = {}
+        for future in done:
+            try:
+                link_metrics = future.result()
+            except Exception as e:
+                print(f"Error reading link {link_futures[future]}: {e}")
+                continue
+            samples[link_futures[future]] = (link_metrics.get('timestamp', time.time()), link_metrics)
+        # Rates for every link that answered, computed in one batch
+        sample_rates = link_rates.update_many(samples)
+        for link_id, (_, link_metrics) in samples.items():
+            previous = tx.get('links', link_id, {})
+            rates = sample_rates[link_id]
+            if rates is None:
+                # First sample or counter reset: no rate yet, keep the last one
+                rates = {field: previous.get(field, 0) for field in LINK_RATE_FIELDS}
+            source, target = link_endpoints[link_id]
+            bandwidth = rates['tx_bps'] / 1e6  # Mbit/s, the unit of tier_bandwidth
+            utilization[(source, target)] = 100 * bandwidth / clients.controller.tier_bandwidth(source, target)
+            tx.set('links', link_id, stamp(previous, {
+                'bandwidth': round(bandwidth, 3),
+                'utilization': round(utilization[(source, target)], 2),
+                # Rates are kept in the entry so follower processes can record history
+                **{field: rates[field] for field in LINK_RATE_FIELDS},
+                'latency': link_metrics.get('latency', 0),
+                # Link state is owned by LinkStateChanged events
+                'status': link_metrics.get('status', previous.get('status', 'active'))
+            }))
+
+        clients.traffic_engineer.observe(utilization)
+
+        # Update layer statistics
+        for layer in SwitchType:
+            layer_stats = clients.controller.get_layer_statistics(layer)
+            tx.set('layer_stats', layer.value, layer_stats)
+
+instruments.describe('poll_cycle_seconds', MetricKind.HISTOGRAM, 'Duration of the metrics and contract event poll loops')
+instruments.describe('poll_errors_total', MetricKind.COUNTER, 'Poll cycles that raised an error')
+instruments.describe('http_request_seconds', MetricKind.HISTOGRAM, 'Dashboard request latency by endpoint (until the response starts)')
+instruments.describe('cache_hit_ratio', MetricKind.GAUGE, 'Hit ratio of the topology, path and response body caches')
+
+# Profiling hook: POST /api/profile arms cProfile for the next metrics poll cycle
+profile_requested = threading.Event()
+last_profile = {'report': None, 'finished': None}
+
+def profiled_refresh_metrics(limit: int = 40):
+    """Run one poll cycle under cProfile and keep the report for /api/profile"""
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(refresh_metrics)
+    finally:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        last_profile.update(report=out.getvalue(), finished=datetime.now().isoformat())
 
 def update_metrics_cache():
     """Background task to update metrics cache"""
     while True:
+        started = time.monotonic()
         try:
-            # Update switch metrics
-            topology = sdn_controller.get_topology(force_refresh=True)
-            for switch_id in topology.get('switches', []):
-                switch_type = sdn_controller.get_switch_type(switch_id)
-                metrics = contract.functions.getMetrics(switch_id).call()
-                metrics_cache['switches'][switch_id] = {
-                    'type': switch_type.value,
-                    'load': metrics['currentLoad'],
-                    'status': metrics['isActive'],
-                    'last_updated': datetime.now().isoformat()
-                }
-
-            # Update link metrics
-            for link in topology.get('links', []):
-                link_id = f"{link['source']}_{link['target']}"
-                link_metrics = sdn_controller.monitor_link_metrics(link_id)
-                metrics_cache['links'][link_id] = {
-                    'bandwidth': link_metrics.get('bytes_transmitted', 0),
-                    'latency': link_metrics.get('latency', 0),
-                    'status': link_metrics.get('status', 'active'),
-                    'last_updated': datetime.now().isoformat()
-                }
-
-            # Update layer statistics
-            for layer in SwitchType:
-                layer_stats = sdn_controller.get_layer_statistics(layer)
-                metrics_cache['layer_stats'][layer.value] = layer_stats
-
+            with instruments.timer('poll_cycle_seconds', loop='metrics'):
+                if profile_requested.is_set():
+                    profile_requested.clear()
+                    profiled_refresh_metrics()
+                else:
+                    refresh_metrics()
         except Exception as e:
+            instruments.inc('poll_errors_total', loop='metrics', error=type(e).__name__)
             print(f"Error updating metrics: {e}")
         
-        time.sleep(5)  # Update every 5 seconds
+        time.sleep(max(0, clients.config.poll_interval - (time.monotonic() - started)))
+
+def follow_contract_events():
+    """Background task applying contract events as soon as they are confirmed"""
+    while True:
+        started = time.monotonic()
+        try:
+            with instruments.timer('poll_cycle_seconds', loop='events'):
+                clients.event_indexer.poll()
+        except Exception as e:
+            instruments.inc('poll_errors_total', loop='events', error=type(e).__name__)
+            print(f"Error polling contract events: {e}")
+
+        time.sleep(max(0, clients.config.event_poll_interval - (time.monotonic() - started)))
+
+def state_path(name: str) -> str:
+    return os.path.join(clients.config.state_dir, name)
+
+# Background work. One process per state_dir (the leader) polls ODL and the
+# chain and publishes its state to files there; every other process (e.g.
+# the other gunicorn workers) follows those files instead of polling, and
+# forwards operations that need the poller's state through command_channel
+background_role: Optional[str] = None  # None until started, then 'leader' or 'follower'
+background_lock = threading.Lock()
+leader_lock: Optional[LeaderLock] = None
+command_channel: Optional[CommandChannel] = None
+
+def publish_snapshots():
+    """Leader task: publish the metrics store and the topology for the followers"""
+    metrics = SharedSnapshot(state_path('metrics.json'))
+    topology = SharedSnapshot(state_path('topology.json'))
+    metrics_version = topology_version = -1
+    while True:
+        snapshot = metrics_store.wait_for_change(metrics_version, timeout=clients.config.poll_interval)
+        started = time.monotonic()
+        try:
+            header = {'epoch': INSTANCE_EPOCH, 'pid': os.getpid(), 'written_at': time.time()}
+            # Topology first, so a follower never sees links it has no nodes for
+            version, document = clients.controller.topology.version, clients.controller.topology_cache
+            if version != topology_version and document:
+                topology.publish(dict(header, version=version), json.dumps(document).encode())
+                topology_version = version
+            if snapshot.version != metrics_version:
+                metrics.publish(dict(header, version=snapshot.version), snapshot.json)
+                metrics_version = snapshot.version
+        except Exception as e:
+            instruments.inc('poll_errors_total', loop='publish', error=type(e).__name__)
+            print(f"Error publishing shared state: {e}")
 
-# Start metrics update thread
-metrics_thread = threading.Thread(target=update_metrics_cache, daemon=True)
-metrics_thread.start()
+        # Changes arriving faster than snapshot_interval are published together
+        time.sleep(max(0, clients.config.snapshot_interval - (time.monotonic() - started)))
 
-@app.route('/')
+def apply_leader_state(metrics: SharedSnapshot, topology: SharedSnapshot):
+    """Bring this process's topology model, metrics and history up to the leader's"""
+    document = topology.read_if_changed()
+    if document is not None:
+        clients.controller.topology.apply_snapshot(document['data'])
+    state = metrics.read_if_changed()
+    if state is None:
+        return
+    now = time.time()
+    with metrics_store.transaction() as tx:
+        changed = apply_sections(tx, state['data'])
+        for switch_id in changed.get('switches', ()):
+            switch = tx.get('switches', switch_id)
+            if switch is None:
+                switch_history.remove(switch_id)
+            else:
+                switch_history.record(switch_id, now, (switch['load'],))
+        for link_id in changed.get('links', ()):
+            link = tx.get('links', link_id)
+            if link is None:
+                link_rates.series.remove(link_id)
+            else:
+                link_rates.series.record(link_id, now, [link.get(field, 0) for field in LINK_RATE_FIELDS])
+
+def follow_leader():
+    """Follower task: mirror the leader's published state and take over when it exits"""
+    metrics = SharedSnapshot(state_path('metrics.json'))
+    topology = SharedSnapshot(state_path('topology.json'))
+    while True:
+        started = time.monotonic()
+        try:
+            with instruments.timer('poll_cycle_seconds', loop='follow'):
+                apply_leader_state(metrics, topology)
+        except Exception as e:
+            instruments.inc('poll_errors_total', loop='follow', error=type(e).__name__)
+            print(f"Error following the leader: {e}")
+
+        if clients.config.role == 'auto' and leader_lock.try_acquire():
+            print(f"Process {os.getpid()} took over polling")
+            start_leader()
+            return
+        time.sleep(max(0, clients.config.snapshot_interval - (time.monotonic() - started)))
+
+def start_leader():
+    global background_role
+    background_role = 'leader'
+    metrics_store.add_commit_hook(alert_engine.evaluate)
+    threading.Thread(target=update_metrics_cache, daemon=True, name='metrics-poll').start()
+    threading.Thread(target=follow_contract_events, daemon=True, name='contract-events').start()
+    clients.failover.start()
+    clients.traffic_engineer.start()
+    if leader_lock.held:
+        threading.Thread(target=publish_snapshots, daemon=True, name='publish-state').start()
+        command_channel.serve(LEADER_COMMANDS)
+
+def start_background():
+    """Start this process's background work once: poll as the leader, or follow it"""
+    global background_role, leader_lock, command_channel
+    with background_lock:
+        if background_role is not None:
+            return
+        private_directory(clients.config.state_dir)
+        leader_lock = LeaderLock(state_path('leader.lock'))
+        command_channel = CommandChannel(state_path('leader.sock'), state_path('leader.key'))
+        role = clients.config.role
+        if role == 'follower' or (role == 'auto' and not leader_lock.try_acquire()):
+            background_role = 'follower'
+            threading.Thread(target=follow_leader, daemon=True, name='follow-leader').start()
+            return
+        if role == 'leader' and not leader_lock.try_acquire():
+            print(f"Warning: another process holds {leader_lock.path}; polling without publishing")
+        start_leader()
+
+class LeaderUnavailable(Exception):
+    """The leader process could not be reached"""
+
+def traffic_engineering_stats() -> Dict:
+    stats = clients.traffic_engineer.stats()
+    stats['recent_moves'] = [
+        {'time': moved_at, 'source': move.route[0], 'destination': move.route[1],
+         'primary_path': move.primary_path, 'bottleneck': move.bottleneck}
+        for moved_at, move in list(clients.traffic_engineer.moves)[-20:]
+    ]
+    return stats
+
+# Operations that need the poller's controller state (flow table, failover
+# and TE bookkeeping), so followers run them in the leader
+LEADER_COMMANDS: Dict[str, Callable] = {
+    'setup_redundant_path': lambda *args: clients.controller.setup_redundant_path(*args),
+    'reconcile_flows': lambda switch_ids: clients.controller.reconcile_flows(switch_ids),
+    'flow_table_stats': lambda: clients.controller.flow_table.stats(),
+    'traffic_engineering_stats': traffic_engineering_stats,
+    'failover_stats': lambda: clients.failover.stats(),
+    'arm_profile': lambda: profile_requested.set(),
+    'last_profile': lambda: dict(last_profile)
+}
+
+def leader_call(name: str, *args):
+    """Run a leader operation here if this process polls, else in the leader"""
+    if background_role != 'follower':
+        return LEADER_COMMANDS[name](*args)
+    try:
+        return command_channel.call(name, *args)
+    except (OSError, TimeoutError) as e:
+        raise LeaderUnavailable(f"{name}: {e}") from e
+
+@dashboard.errorhandler(LeaderUnavailable)
+def leader_unavailable(e):
+    return jsonify({'error': f'Leader process unavailable ({e})'}), 503
+
+@dashboard.before_app_request
+def ensure_background():
+    if background_role is None and clients.config.start_background:
+        start_background()
+
+@dashboard.before_app_request
+def start_request_timer():
+    request.environ['dashboard.started'] = time.perf_counter()
+
+@dashboard.after_app_request
+def record_request_latency(response):
+    started = request.environ.get('dashboard.started')
+    if started is not None:
+        instruments.observe(
+            'http_request_seconds', time.perf_counter() - started,
+            endpoint=request.url_rule.rule if request.url_rule else 'unmatched',
+            method=request.method, status=response.status_code
+        )
+    return response
+
+@dashboard.route('/')
 def index():
     """Render main dashboard page"""
     return render_template('src/templates/index.html')
 
-@app.route('/api/topology')
-def get_topology():
-    """Get current network topology"""
-    topology = sdn_controller.get_topology()
-    return jsonify({
-        'nodes': topology.get('nodes', []),
+# Identifies this process in ETags and delta cursors, since store and
+# topology versions start again from 0 when the dashboard restarts
+INSTANCE_EPOCH = uuid.uuid4().hex[:8]
+
+def new_instance_epoch():
+    # Forked workers keep their own store versions, so they need their own epoch
+    global INSTANCE_EPOCH
+    INSTANCE_EPOCH = uuid.uuid4().hex[:8]
+
+os.register_at_fork(after_in_child=new_instance_epoch)
+
+def requested_since() -> Optional[int]:
+    """Version a delta request starts from, or None for a plain full response"""
+    since = request.args.get('since', type=int)
+    if since is None:
+        return None
+    if request.args.get('epoch', INSTANCE_EPOCH) != INSTANCE_EPOCH:
+        return -1  # cursor from another instance; -1 always yields a full delta
+    return since
+
+# Encoded metric and alert deltas keyed by (kind, since, version); polling
+# and streaming clients at the same version share one body
+delta_cache = BodyCache(max_entries=256)
+
+def metrics_delta_body(snapshot: MetricsSnapshot, since: int) -> bytes:
+    def build() -> bytes:
+        delta = metrics_store.delta(snapshot, since)
+        delta['epoch'] = INSTANCE_EPOCH
+        return json.dumps(delta).encode()
+    return delta_cache.get(('metrics', since, snapshot.version), build)
+
+def alerts_delta_body(snapshot: MetricsSnapshot, since: int) -> bytes:
+    def build() -> bytes:
+        delta = alerts_delta(snapshot, since)
+        delta['epoch'] = INSTANCE_EPOCH
+        return json.dumps(delta).encode()
+    return delta_cache.get(('alerts', since, snapshot.version), build)
+
+# Serialized /api/topology body for one topology model version
+topology_cache = (None, b'')
+
+def topology_body() -> Tuple[int, bytes]:
+    """Encode the topology once per model version"""
+    global topology_cache
+    version, body = topology_cache
+    if version == clients.controller.topology.version:
+        return version, body
+    topology = clients.controller.topology.to_dict()
+    nodes = topology.get('nodes', [])
+    layers = {'core': [], 'distribution': [], 'access': []}
+    prefixes = {'c': 'core', 'd': 'distribution', 'a': 'access'}
+    for node in nodes:
+        layer = prefixes.get(node['id'][:1])
+        if layer:
+            layers[layer].append(node)
+    body = json.dumps({
+        'nodes': nodes,
         'links': topology.get('links', []),
-        'layers': {
-            'core': [n for n in topology.get('nodes', []) if n['id'].startswith('c')],
-            'distribution': [n for n in topology.get('nodes', []) if n['id'].startswith('d')],
-            'access': [n for n in topology.get('nodes', []) if n['id'].startswith('a')]
-        }
-    })
+        'layers': layers
+    }).encode()
+    topology_cache = (topology['version'], body)
+    return topology_cache
+
+@dashboard.route('/api/topology')
+def get_topology():
+    """Get current network topology; the poller keeps the model fresh"""
+    version, body = topology_body()
+    return conditional_response(f"{INSTANCE_EPOCH}-t{version}", body)
 
-@app.route('/api/metrics')
+@dashboard.route('/api/metrics')
 def get_metrics():
-    """Get current network metrics"""
-    return jsonify(metrics_cache)
+    """Get current network metrics; ?since=<version> returns only the changes"""
+    snapshot = metrics_store.snapshot()
+    since = requested_since()
+    if since is None:
+        return conditional_response(f"{INSTANCE_EPOCH}-m{snapshot.version}", snapshot.json)
+    return conditional_response(
+        f"{INSTANCE_EPOCH}-m{snapshot.version}-{since}",
+        lambda: metrics_delta_body(snapshot, since)
+    )
 
-@app.route('/api/layer/<layer>')
+@dashboard.route('/api/layer/<layer>')
 def get_layer_metrics(layer):
     """Get metrics for specific network layer"""
-    return jsonify(metrics_cache['layer_stats'].get(layer, {}))
+    return jsonify(metrics_store.snapshot().data['layer_stats'].get(layer, {}))
 
-@app.route('/api/switch/<switch_id>')
+@dashboard.route('/api/switch/<switch_id>')
 def get_switch_metrics(switch_id):
     """Get metrics for specific switch"""
-    return jsonify(metrics_cache['switches'].get(switch_id, {}))
+    return jsonify(metrics_store.snapshot().data['switches'].get(switch_id, {}))
 
-@app.route('/api/link/<source>/<target>')
+@dashboard.route('/api/link/<source>/<target>')
 def get_link_metrics(source, target):
     """Get metrics for specific link"""
     link_id = f"{source}_{target}"
-    return jsonify(metrics_cache['links'].get(link_id, {}))
+    return jsonify(metrics_store.snapshot().data['links'].get(link_id, {}))
+
+def history_response(series: TimeSeriesStore, series_id: str):
+    """History of one series; ?resolution=<seconds>&since=<unix time> pick the tier and window"""
+    history = series.history(
+        series_id,
+        resolution=request.args.get('resolution', type=int),
+        since=request.args.get('since', type=float)
+    )
+    if history is None:
+        return jsonify({'error': f'No history for {series_id}'}), 404
+    return jsonify({'id': series_id, **history})
 
-@app.route('/api/path/redundant', methods=['POST'])
+@dashboard.route('/api/link/<source>/<target>/history')
+def get_link_history(source, target):
+    """Get rate history (bits and packets per second) for a link"""
+    return history_response(link_rates.series, f"{source}_{target}")
+
+@dashboard.route('/api/switch/<switch_id>/history')
+def get_switch_history(switch_id):
+    """Get load history for a switch"""
+    return history_response(switch_history, switch_id)
+
+@dashboard.route('/api/path/redundant', methods=['POST'])
 def configure_redundant_path():
-    """Configure redundant path between two points"""
+    """Configure redundant path between two points; paths are computed when omitted"""
     data = request.json
-    success = sdn_controller.setup_redundant_path(
+    success = leader_call(
+        'setup_redundant_path',
         data['source'],
         data['destination'],
-        data['primary_path'],
-        data['backup_path']
+        data.get('primary_path'),
+        data.get('backup_path'),
+        data.get('source_switch'),
+        data.get('destination_switch')
     )
     return jsonify({'success': success})
 
-@app.route('/api/alerts')
+@dashboard.route('/api/path/redundant/bulk', methods=['POST'])
+def configure_redundant_paths():
+    """Provision computed redundant paths for many source/destination pairs"""
+    results = []
+    for pair in request.json.get('pairs', []):
+        success = leader_call(
+            'setup_redundant_path',
+            pair['source'],
+            pair['destination'],
+            pair.get('primary_path'),
+            pair.get('backup_path'),
+            pair.get('source_switch'),
+            pair.get('destination_switch')
+        )
+        results.append({
+            'source': pair['source'],
+            'destination': pair['destination'],
+            'success': success
+        })
+    return jsonify({'results': results})
+
+@dashboard.route('/api/flows')
+def get_flow_table_stats():
+    """Get desired/installed flow counts of the controller's flow table"""
+    return jsonify(leader_call('flow_table_stats'))
+
+@dashboard.route('/api/flows/reconcile', methods=['POST'])
+def reconcile_flows():
+    """Sync the flow table with the switches and push only the differences"""
+    switch_ids = (request.get_json(silent=True) or {}).get('switches')
+    return jsonify(leader_call('reconcile_flows', switch_ids))
+
+@dashboard.route('/api/traffic-engineering')
+def get_traffic_engineering_stats():
+    """Get load-aware rerouting state and the most recent moves"""
+    return jsonify(leader_call('traffic_engineering_stats'))
+
+@dashboard.route('/api/failover')
+def get_failover_stats():
+    """Get failover manager state and failover timings"""
+    return jsonify(leader_call('failover_stats'))
+
+def alerts_delta(snapshot: MetricsSnapshot, since: int) -> Dict:
+    """Alerts raised or updated since a version, and ids of alerts that cleared"""
+    delta = metrics_store.delta(snapshot, since, sections=('alerts',))
+    if delta['full']:
+        return {'version': snapshot.version, 'since': since, 'full': True, 'alerts': delta['data']['alerts']}
+    return {
+        'version': snapshot.version,
+        'since': since,
+        'full': False,
+        'alerts': delta['changes'].get('alerts', {}),
+        'resolved': delta['removed'].get('alerts', [])
+    }
+
+@dashboard.route('/api/alerts')
 def get_alerts():
-    """Get network alerts and warnings"""
-    alerts = []
-    
-    # Check switch status
-    for switch_id, metrics in metrics_cache['switches'].items():
-        if not metrics['status']:
-            alerts.append({
-                'level': 'critical',
-                'message': f'Switch {switch_id} is down',
-                'timestamp': datetime.now().isoformat()
-            })
-        elif metrics['load'] > 80:
-            alerts.append({
-                'level': 'warning',
-                'message': f'High load on switch {switch_id}: {metrics["load"]}%',
-                'timestamp': datetime.now().isoformat()
-            })
+    """Get network alerts and warnings; ?since=<version> returns only the changes"""
+    snapshot = metrics_store.snapshot()
+    since = requested_since()
+    if since is None:
+        return conditional_response(
+            f"{INSTANCE_EPOCH}-a{snapshot.version}",
+            lambda: json.dumps(list(snapshot.data['alerts'].values())).encode()
+        )
+    return conditional_response(
+        f"{INSTANCE_EPOCH}-a{snapshot.version}-{since}",
+        lambda: alerts_delta_body(snapshot, since)
+    )
 
-    # Check link status
-    for link_id, metrics in metrics_cache['links'].items():
-        if metrics['status'] != 'active':
-            alerts.append({
-                'level': 'critical',
-                'message': f'Link {link_id} is {metrics["status"]}',
-                'timestamp': datetime.now().isoformat()
-            })
+STREAM_HEARTBEAT = 15  # seconds between keepalive comments on an idle stream
+STREAM_MIN_INTERVAL = 0.25  # seconds; changes arriving faster are sent together
+
+def serves_concurrently(environ: Dict) -> bool:
+    """Whether the worker can hold a stream open and still answer other requests"""
+    if environ.get('wsgi.multithread'):
+        return True
+    # gevent workers report one thread but run every request in its own greenlet
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+def stream_updates(since: int):
+    """Server-Sent Events carrying the metrics deltas (alerts included) after `since`.
+
+    The WSGI server pulls the next event only once the previous one was
+    written, so nothing queues up for a slow client: when it catches up it
+    gets a single event covering every version it missed (a full state if
+    it fell out of the store's history). Bodies come from delta_cache, so
+    clients at the same version cost one encoding, not one each.
+    """
+    last = since
+    last_sent = 0.0
+    while True:
+        snapshot = metrics_store.wait_for_change(last, timeout=STREAM_HEARTBEAT)
+        if snapshot.version <= last:
+            yield b': keepalive\n\n'
+            continue
+        pause = STREAM_MIN_INTERVAL - (time.monotonic() - last_sent)
+        if pause > 0:
+            time.sleep(pause)
+            snapshot = metrics_store.snapshot()
+
+        event_id = f"id: {INSTANCE_EPOCH}-{snapshot.version}\n".encode()
+        yield (
+            event_id + b'event: metrics\ndata: ' + metrics_delta_body(snapshot, last) + b'\n\n'
+        )
+        last = snapshot.version
+        last_sent = time.monotonic()
+
+@dashboard.route('/api/stream')
+def stream():
+    """Push metric and alert deltas as Server-Sent Events"""
+    # A stream never ends, so on a sync worker it would take the worker
+    # for good. Clients fall back to polling the delta endpoints.
+    if not serves_concurrently(request.environ):
+        return Response('Streams need a threaded or gevent worker', status=503, headers={'Retry-After': '300'})
+    slots = clients.stream_slots
+    if not slots.acquire(blocking=False):
+        return Response('Too many streams', status=503, headers={'Retry-After': '30'})
+
+    since = requested_since()
+    if since is None:
+        # EventSource resends the last event id ("<epoch>-<version>") on reconnect
+        epoch, _, version = request.headers.get('Last-Event-ID', '').partition('-')
+        since = int(version) if epoch == INSTANCE_EPOCH and version.isdigit() else -1
+
+    response = Response(stream_updates(since), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # keep reverse proxies from buffering events
+    response.call_on_close(slots.release)
+    return response
+
+def hit_ratio(hits: float, misses: float) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+@dashboard.route('/metrics')
+def prometheus_metrics():
+    """Counters and latency histograms in the Prometheus text format"""
+    ratios = {
+        'topology': hit_ratio(
+            instruments.total('topology_cache_total', result='hit'),
+            instruments.total('topology_cache_total', result='miss')
+        ),
+        'paths': hit_ratio(clients.controller.paths.cache_hits, clients.controller.paths.cache_misses),
+        'compression': hit_ratio(compression_cache.hits, compression_cache.misses),
+        'delta': hit_ratio(delta_cache.hits, delta_cache.misses)
+    }
+    for cache, ratio in ratios.items():
+        instruments.set('cache_hit_ratio', ratio, cache=cache)
+    return Response(instruments.render(), mimetype='text/plain; version=0.0.4')
+
+@dashboard.route('/api/profile', methods=['GET', 'POST'])
+def poll_profile():
+    """POST profiles the next metrics poll cycle; GET returns the last profile report"""
+    if request.method == 'POST':
+        leader_call('arm_profile')
+        return jsonify({'armed': True, 'poll_interval': clients.config.poll_interval}), 202
+    profile = leader_call('last_profile')
+    if profile['report'] is None:
+        return jsonify({'error': 'No profile yet; POST to /api/profile first'}), 404
+    return Response(profile['report'], mimetype='text/plain', headers={'X-Profiled-At': profile['finished']})
+
+def create_app(config: Optional[DashboardConfig] = None) -> Flask:
+    """Build the dashboard app; config defaults to the SDN_* environment.
 
-    return jsonify(alerts)
+    Nothing connects or starts until the first request (or an explicit
+    start_background()), so a server can import this, or fork workers
+    after create_app, safely. /api/stream keeps a request open per
+    client, so use a worker class that serves requests concurrently, e.g.
+    gunicorn -k gthread --threads 256 'src.dashboard.app:create_app()' (or
+    -k gevent); sync workers answer streams with 503 and clients poll
+    instead. SDN_MAX_STREAMS caps the streams each worker holds open; keep
+    it below --threads so plain requests still find a thread.
+    """
+    config = config or DashboardConfig.from_env()
+    # Fail at startup, not on the first request, if the state directory is not ours
+    private_directory(config.state_dir)
+    clients.configure(config)
+    app = Flask(__name__)
+    app.register_blueprint(dashboard)
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    # The background starts with the first request, so only the reloader's
+    # serving child polls
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,321 @@
+# src/dashboard/chain.py
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence
+import threading
+import time
+from src.controller.chain_encoding import decode_id, encode_id, encode_path
+from src.controller.instrumentation import MetricKind, instruments
+
+instruments.describe('contract_call_seconds', MetricKind.HISTOGRAM, 'Contract call, transaction and log query latency by function')
+instruments.describe('contract_errors_total', MetricKind.COUNTER, 'Contract calls and transactions that failed or timed out')
+
+# Field order of EnhancedNetworkManager.SwitchMetrics
+SWITCH_METRICS_FIELDS = ('switchId', 'currentLoad', 'linkLatency', 'isActive', 'lastUpdated')
+
+def decode_struct(value, fields: Sequence[str]) -> Dict:
+    """Turn a struct returned by web3 (tuple or mapping) into a dict"""
+    if isinstance(value, dict):
+        return dict(value)
+    if hasattr(value, '_asdict'):
+        return value._asdict()
+    return dict(zip(fields, value))
+
+class ChainMetricsReader:
+    """Batched, concurrent reads of switch metrics from EnhancedNetworkManager.
+
+    Switch ids are split into chunks of chunk_size and each chunk is read
+    with one getMetricsBatch eth_call. Chunks are fanned out on the given
+    executor and the whole read is bounded by timeout seconds; chunks that
+    do not answer in time are reported in `failed_chunks` and simply left
+    out, so one slow RPC cannot stall the poll cycle.
+    """
+
+    def __init__(self, contract, executor: ThreadPoolExecutor, chunk_size: int = 100, timeout: float = 2.0):
+        self.contract = contract
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.failed_chunks = 0
+        self.last_read_duration = 0.0
+
+    def _read_chunk(self, switch_ids: List[str]) -> Dict[str, Dict]:
+        with instruments.timer('contract_call_seconds', function='getMetricsBatch', kind='call'):
+            results = self.contract.functions.getMetricsBatch(encode_path(switch_ids)).call()
+        metrics = {}
+        for switch_id, entry in zip(switch_ids, results):
+            metrics[switch_id] = decode_struct(entry, SWITCH_METRICS_FIELDS)
+            metrics[switch_id]['switchId'] = decode_id(metrics[switch_id]['switchId'])
+        return metrics
+
+    def read_switch_metrics(self, switch_ids: Sequence[str]) -> Dict[str, Dict]:
+        """Read metrics for all switches; returns only the ones that answered"""
+        started = time.perf_counter()
+        switch_ids = list(switch_ids)
+        futures = [
+            self.executor.submit(self._read_chunk, switch_ids[i:i + self.chunk_size])
+            for i in range(0, len(switch_ids), self.chunk_size)
+        ]
+        done, not_done = wait(futures, timeout=self.timeout)
+
+        metrics = {}
+        for future in done:
+            try:
+                metrics.update(future.result())
+            except Exception as e:
+                self.failed_chunks += 1
+                instruments.inc('contract_errors_total', function='getMetricsBatch', kind='call')
+                print(f"Error reading switch metrics: {e}")
+        for future in not_done:
+            future.cancel()
+            self.failed_chunks += 1
+            instruments.inc('contract_errors_total', function='getMetricsBatch', kind='timeout')
+        self.last_read_duration = time.perf_counter() - started
+        return metrics
+
+class ChainWriteBehind:
+    """Coalescing write-behind queue for on-chain metric and link updates.
+
+    Producers call update_metrics / update_link as often as they like; within
+    each flush window only the latest value per switch or link is kept. A
+    background thread submits the pending values every `window` seconds (or
+    as soon as max_batch entries are waiting) through updateMetricsBatch and
+    updateLinkBatch, max_batch entries per transaction.
+
+    Nonces are tracked locally so consecutive batches can be sent without
+    waiting for each other; the nonce is re-read from the node after a
+    failed send. Backpressure works at two levels: at most max_in_flight
+    transactions are unconfirmed at any time, and once max_pending distinct
+    keys are waiting, updates for new keys block (up to their timeout) and
+    are then dropped. Updates to keys that are already queued never block.
+    Entries whose transaction fails to send, or whose receipt does not
+    arrive within receipt_timeout, go back on the queue unless a newer value
+    for the same key has been queued or sent since.
+    """
+
+    def __init__(
+        self,
+        w3,
+        contract,
+        account: str,
+        window: float = 2.0,
+        max_batch: int = 100,
+        max_pending: int = 10000,
+        max_in_flight: int = 4,
+        receipt_timeout: float = 60.0
+    ):
+        self.w3 = w3
+        self.contract = contract
+        self.account = account
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self.receipt_timeout = receipt_timeout
+        self._metrics: Dict[str, tuple] = {}
+        self._links: Dict[tuple, tuple] = {}
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._nonce = None
+        self._in_flight: deque = deque()
+        self._transactions = 0
+        self._last_sent: Dict = {}  # key -> number of the last transaction carrying it
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'received': 0,
+            'coalesced': 0,
+            'dropped': 0,
+            'submitted': 0,
+            'confirmed': 0,
+            'transactions': 0,
+            'failed_transactions': 0,
+            'requeued': 0,
+            'gas_used': 0
+        }
+
+    def _pending(self) -> int:
+        return len(self._metrics) + len(self._links)
+
+    def _count(self, **increments: int):
+        with self._stats_lock:
+            for name, amount in increments.items():
+                self.stats[name] += amount
+
+    def _enqueue(self, table: Dict, key, value, timeout: Optional[float]) -> bool:
+        with self._cond:
+            self._count(received=1)
+            if key in table:
+                self._count(coalesced=1)
+                table[key] = value
+                return True
+            if self._pending() >= self.max_pending:
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._pending() < self.max_pending, timeout=timeout)
+                if self._pending() >= self.max_pending:
+                    self._count(dropped=1)
+                    return False
+            table[key] = value
+            if self._pending() >= self.max_batch:
+                self._cond.notify_all()
+            return True
+
+    def update_metrics(self, switch_id: str, load: int, latency: int, timeout: Optional[float] = 1.0) -> bool:
+        """Queue a switch load/latency update; returns False if it was dropped"""
+        encode_id(switch_id)  # reject IDs the contract cannot store before queueing
+        return self._enqueue(self._metrics, switch_id, (load, latency), timeout)
+
+    def update_link(
+        self,
+        source_id: str,
+        dest_id: str,
+        bandwidth: int,
+        latency: int,
+        state: int,
+        timeout: Optional[float] = 1.0
+    ) -> bool:
+        """Queue a link update; returns False if it was dropped"""
+        encode_id(source_id)
+        encode_id(dest_id)
+        return self._enqueue(self._links, (source_id, dest_id), (bandwidth, latency, state), timeout)
+
+    def _send(self, function) -> str:
+        if self._nonce is None:
+            self._nonce = self.w3.eth.get_transaction_count(self.account, 'pending')
+        try:
+            with instruments.timer('contract_call_seconds', function=function.fn_name, kind='transact'):
+                tx_hash = function.transact({'from': self.account, 'nonce': self._nonce})
+        except Exception:
+            # Let the node tell us the right nonce on the next send
+            self._nonce = None
+            instruments.inc('contract_errors_total', function=function.fn_name, kind='transact')
+            raise
+        self._nonce += 1
+        return tx_hash
+
+    def _reap(self, keep: int):
+        """Wait for receipts until at most `keep` transactions are in flight"""
+        while len(self._in_flight) > keep:
+            number, tx_hash, table, chunk = self._in_flight.popleft()
+            # Keys sent again by a later transaction are that one's concern now
+            latest = [(key, value) for key, value in chunk if self._last_sent.get(key) == number]
+            for key, _ in latest:
+                del self._last_sent[key]
+            try:
+                receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+            except Exception as e:
+                # Maybe dropped, maybe just slow; sending the values again is harmless
+                self._count(failed_transactions=1, requeued=len(latest))
+                instruments.inc('contract_errors_total', function='batch', kind='receipt')
+                print(f"Error waiting for transaction {tx_hash.hex()}, requeueing {len(latest)} updates: {e}")
+                self._requeue(table, latest)
+                continue
+            if receipt['status'] == 1:
+                self._count(gas_used=receipt['gasUsed'], confirmed=len(chunk))
+            else:
+                self._count(gas_used=receipt['gasUsed'], failed_transactions=1)
+                instruments.inc('contract_errors_total', function='batch', kind='reverted')
+
+    def _submit(self, function, table: Dict, chunk: List[tuple]) -> bool:
+        self._reap(self.max_in_flight - 1)
+        try:
+            tx_hash = self._send(function)
+        except Exception as e:
+            self._count(failed_transactions=1)
+            print(f"Error submitting batch of {len(chunk)} updates: {e}")
+            return False
+        self._transactions += 1
+        for key, _ in chunk:
+            self._last_sent[key] = self._transactions
+        self._in_flight.append((self._transactions, tx_hash, table, chunk))
+        self._count(transactions=1, submitted=len(chunk))
+        return True
+
+    def flush(self, wait_for_receipts: bool = False) -> int:
+        """Submit everything queued so far; returns the number of entries sent"""
+        # The queues are emptied in place: transactions in flight hold on to
+        # them to requeue their entries if the receipt never comes
+        with self._cond:
+            metrics, links = dict(self._metrics), dict(self._links)
+            self._metrics.clear()
+            self._links.clear()
+            self._cond.notify_all()
+
+        sent = 0
+        with self._send_lock:
+            metric_items = list(metrics.items())
+            for i in range(0, len(metric_items), self.max_batch):
+                chunk = metric_items[i:i + self.max_batch]
+                function = self.contract.functions.updateMetricsBatch(
+                    [encode_id(key) for key, _ in chunk],
+                    [value[0] for _, value in chunk],
+                    [value[1] for _, value in chunk]
+                )
+                if self._submit(function, self._metrics, chunk):
+                    sent += len(chunk)
+                else:
+                    self._requeue(self._metrics, chunk)
+
+            link_items = list(links.items())
+            for i in range(0, len(link_items), self.max_batch):
+                chunk = link_items[i:i + self.max_batch]
+                function = self.contract.functions.updateLinkBatch(
+                    [encode_id(key[0]) for key, _ in chunk],
+                    [encode_id(key[1]) for key, _ in chunk],
+                    [value[0] for _, value in chunk],
+                    [value[1] for _, value in chunk],
+                    [value[2] for _, value in chunk]
+                )
+                if self._submit(function, self._links, chunk):
+                    sent += len(chunk)
+                else:
+                    self._requeue(self._links, chunk)
+
+            if wait_for_receipts:
+                self._reap(0)
+        return sent
+
+    def _requeue(self, table: Dict, chunk: List[tuple]):
+        """Put failed entries back unless a newer value arrived meanwhile"""
+        with self._cond:
+            for key, value in chunk:
+                table.setdefault(key, value)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stop.is_set() or self._pending() >= self.max_batch,
+                    timeout=self.window
+                )
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing chain updates: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher and write out whatever is still queued"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush(wait_for_receipts=True)
+
+    def report(self) -> Dict:
+        with self._cond:
+            pending = self._pending()
+        with self._stats_lock:
+            report = dict(self.stats)
+        report['pending'] = pending
+        report['in_flight'] = len(self._in_flight)
+        report['gas_per_update'] = report['gas_used'] / report['confirmed'] if report['confirmed'] else None
+        return report
@@ -0,0 +1,56 @@
+# src/dashboard/config.py
+from pathlib import Path
+from typing import Mapping, NamedTuple, Optional
+import os
+import tempfile
+
+# The repository root, so default paths do not depend on the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+ROLES = ('auto', 'leader', 'follower')
+
+def default_state_dir() -> str:
+    """Per-user state directory; shared_state.private_directory checks who owns it"""
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'sdn-dashboard')
+    return os.path.join(tempfile.gettempdir(), f'sdn-dashboard-{os.getuid()}')
+
+class DashboardConfig(NamedTuple):
+    """Dashboard settings; from_env() reads them from SDN_* environment variables"""
+    odl_host: str = 'localhost'
+    odl_port: int = 8181
+    web3_url: str = 'http://localhost:8545'
+    web3_timeout: float = 2.0
+    contract_address: str = '0xCFFb65E9e2688B1E7F925843e6FE4d3fF152A446'
+    # Where 'truffle compile' (run in src/) writes the artifact
+    contract_artifact: str = str(PROJECT_ROOT / 'src' / 'build' / 'contracts' / 'EnhancedNetworkManager.json')
+    poll_interval: float = 5.0        # seconds between metrics poll cycles
+    event_poll_interval: float = 1.0  # seconds between contract event polls
+    failover_interval: float = 0.5    # seconds; longest link-down detection delay between polls
+    link_read_timeout: float = 2.0    # seconds for the whole link fan-out
+    # Which process polls ODL and the chain: 'auto' elects one per state_dir
+    # (the others follow its shared snapshot), 'leader' always polls,
+    # 'follower' never does
+    role: str = 'auto'
+    state_dir: str = default_state_dir()  # must be private to the dashboard's user (mode 0700)
+    snapshot_interval: float = 0.5    # seconds; followers see changes at most this late
+    start_background: bool = True     # start the poller (or follower) with the first request
+    max_streams: int = 200            # open /api/stream responses per worker process
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> 'DashboardConfig':
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name, default in cls._field_defaults.items():
+            raw = environ.get(f"SDN_{name.upper()}")
+            if raw is None:
+                continue
+            if isinstance(default, bool):
+                values[name] = raw.strip().lower() in ('1', 'true', 'yes', 'on')
+            else:
+                values[name] = type(default)(raw)
+        config = cls(**values)
+        if config.role not in ROLES:
+            raise ValueError(f"SDN_ROLE must be one of {', '.join(ROLES)}, not {config.role}")
+        return config
@@ -0,0 +1,127 @@
+# src/dashboard/events.py
+from typing import Callable, Dict, Optional
+import json
+import os
+import tempfile
+from web3 import Web3
+from src.controller.instrumentation import instruments
+
+class ContractEventIndexer:
+    """Follows EnhancedNetworkManager logs and hands decoded events to handlers.
+
+    Only blocks at least `confirmations` deep are indexed, so ordinary reorgs
+    never reach the cache. Progress is checkpointed as (block number, block
+    hash) in checkpoint_path. A full resync (the `resync` callback, which
+    re-reads state through view calls) runs on startup when there is no
+    usable checkpoint and whenever a gap is detected: the checkpointed block
+    hash no longer matches the chain (deep reorg) or the chain is shorter
+    than the checkpoint (node reset). Between resyncs the cost per poll is
+    one eth_getLogs per max_block_range blocks plus the events themselves.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        contract,
+        handlers: Dict[str, Callable[[Dict], None]],
+        resync: Callable[[], None],
+        checkpoint_path: Optional[str] = None,
+        confirmations: int = 3,
+        max_block_range: int = 1000
+    ):
+        self.w3 = w3
+        self.contract = contract
+        self.handlers = handlers
+        self.resync_callback = resync
+        self.checkpoint_path = checkpoint_path
+        self.confirmations = confirmations
+        self.max_block_range = max_block_range
+        self.checkpoint: Optional[Dict] = self._load_checkpoint()
+        self.events_applied = 0
+        self.resyncs = 0
+        self._events_by_topic = self._build_topic_index()
+
+    def _build_topic_index(self) -> Dict[bytes, object]:
+        index = {}
+        for entry in self.contract.abi:
+            if entry.get('type') != 'event' or entry['name'] not in self.handlers:
+                continue
+            signature = f"{entry['name']}({','.join(i['type'] for i in entry['inputs'])})"
+            index[bytes(Web3.keccak(text=signature))] = getattr(self.contract.events, entry['name'])()
+        return index
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_checkpoint(self, block_number: int):
+        block = self.w3.eth.get_block(block_number)
+        self.checkpoint = {'block': block_number, 'hash': block['hash'].hex()}
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.checkpoint_path))
+        with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+            json.dump(self.checkpoint, f)
+        os.replace(f.name, self.checkpoint_path)
+
+    def _checkpoint_valid(self, head: int) -> bool:
+        if self.checkpoint is None or self.checkpoint['block'] > head:
+            return False
+        block = self.w3.eth.get_block(self.checkpoint['block'])
+        return block['hash'].hex() == self.checkpoint['hash']
+
+    def resync(self):
+        """Rebuild state from view calls and restart indexing at the confirmed head"""
+        head = self.w3.eth.block_number
+        self.resync_callback()
+        self.resyncs += 1
+        # Events between here and head are re-applied later; they carry
+        # absolute values, so applying them twice is harmless
+        self._save_checkpoint(max(head - self.confirmations, 0))
+
+    def _decode(self, log) -> Optional[Dict]:
+        event = self._events_by_topic.get(bytes(log['topics'][0])) if log['topics'] else None
+        return event.process_log(log) if event is not None else None
+
+    def poll(self) -> int:
+        """Apply all newly confirmed events; returns how many were applied"""
+        head = self.w3.eth.block_number
+        if not self._checkpoint_valid(head):
+            self.resync()
+            return 0
+
+        target = head - self.confirmations
+        applied = 0
+        start = self.checkpoint['block'] + 1
+        while start <= target:
+            end = min(start + self.max_block_range - 1, target)
+            with instruments.timer('contract_call_seconds', function='getLogs', kind='logs'):
+                logs = self.w3.eth.get_logs({
+                    'address': self.contract.address,
+                    'fromBlock': start,
+                    'toBlock': end
+                })
+            for log in sorted(logs, key=lambda l: (l['blockNumber'], l['logIndex'])):
+                event = self._decode(log)
+                if event is None:
+                    continue
+                self.handlers[event['event']](event)
+                applied += 1
+            self._save_checkpoint(end)
+            start = end + 1
+
+        self.events_applied += applied
+        return applied
+
+    def stats(self) -> Dict:
+        return {
+            'checkpoint': self.checkpoint,
+            'events_applied': self.events_applied,
+            'resyncs': self.resyncs,
+            'confirmations': self.confirmations
+        }
@@ -0,0 +1,231 @@
+# src/dashboard/metrics_store.py
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import json
+import threading
+
+_DELETED = object()
+
+class MetricsSnapshot(NamedTuple):
+    version: int
+    data: Dict
+    json: bytes
+
+class MetricsTransaction:
+    """Pending changes against a snapshot; reads see the pending writes"""
+
+    def __init__(self, base: Dict):
+        self._base = base
+        self._overlay: Dict[str, Dict] = {}
+        self.operations: List[Tuple[str, str, str, object]] = []
+
+    def get(self, section: str, key: str, default=None):
+        value = self._overlay.get(section, {}).get(key, None)
+        if value is _DELETED:
+            return default
+        if value is not None:
+            return value
+        return self._base.get(section, {}).get(key, default)
+
+    def keys(self, section: str) -> List[str]:
+        keys = set(self._base.get(section, {}))
+        for key, value in self._overlay.get(section, {}).items():
+            if value is _DELETED:
+                keys.discard(key)
+            else:
+                keys.add(key)
+        return list(keys)
+
+    def set(self, section: str, key: str, value: Dict):
+        self._overlay.setdefault(section, {})[key] = value
+        self.operations.append(('set', section, key, value))
+
+    def merge(self, section: str, key: str, **fields) -> bool:
+        """Update some fields of an existing entry; returns False if there is none"""
+        current = self.get(section, key)
+        if current is None:
+            return False
+        self._overlay.setdefault(section, {})[key] = {**current, **fields}
+        self.operations.append(('merge', section, key, fields))
+        return True
+
+    def delete(self, section: str, key: str):
+        self._overlay.setdefault(section, {})[key] = _DELETED
+        self.operations.append(('delete', section, key, None))
+
+    def touched(self) -> Dict[str, Set[str]]:
+        """Keys written so far, per section"""
+        touched: Dict[str, Set[str]] = {}
+        for _, section, key, _ in self.operations:
+            touched.setdefault(section, set()).add(key)
+        return touched
+
+class MetricsStore:
+    """Versioned, copy-on-write store for the dashboard metrics.
+
+    Readers call snapshot() and get an immutable MetricsSnapshot: the data,
+    a version number that increases on every committed change, and the data
+    already serialized to JSON. Taking a snapshot is a single attribute read,
+    so readers never block and never see a half-applied update.
+
+    Writers group changes in transaction(); changes are recorded as
+    operations and replayed onto the latest snapshot at commit, so the write
+    lock is only held while the new snapshot is built and not while the
+    caller does I/O. Only sections that changed are copied and re-encoded.
+    Transactions nest per thread: an inner transaction() joins the outer one
+    and everything commits as one version when the outer block exits.
+    Entries must be treated as read-only; writers replace them rather than
+    mutate them.
+
+    The keys touched by each of the last `history` versions are kept so
+    changes_since() can answer delta requests without scanning the data.
+
+    Commit hooks run just before a transaction commits, with the keys it
+    touched, and may add writes of their own (used to derive sections such
+    as alerts from the metrics in the same version).
+    """
+
+    def __init__(self, sections: Iterable[str], history: int = 1000):
+        data = {section: {} for section in sections}
+        self._section_json = {section: b'{}' for section in data}
+        self._snapshot = MetricsSnapshot(0, data, self._encode_document(data))
+        self._write_lock = threading.Lock()
+        self._committed = threading.Condition(self._write_lock)
+        self._local = threading.local()
+        self._changes: deque = deque(maxlen=history)
+        self._hooks: List[Callable[[MetricsTransaction, Dict[str, Set[str]]], None]] = []
+
+    def snapshot(self) -> MetricsSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> MetricsSnapshot:
+        """Block until a version newer than `version` is committed or timeout passes"""
+        with self._committed:
+            self._committed.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
+
+    def add_commit_hook(self, hook: Callable[[MetricsTransaction, Dict[str, Set[str]]], None]):
+        self._hooks.append(hook)
+
+    def _encode_document(self, data: Dict) -> bytes:
+        return b'{' + b','.join(
+            json.dumps(section).encode() + b':' + self._section_json[section]
+            for section in data
+        ) + b'}'
+
+    @contextmanager
+    def transaction(self) -> Iterator[MetricsTransaction]:
+        current: Optional[MetricsTransaction] = getattr(self._local, 'transaction', None)
+        if current is not None:
+            yield current
+            return
+
+        transaction = MetricsTransaction(self._snapshot.data)
+        self._local.transaction = transaction
+        try:
+            yield transaction
+        finally:
+            # Like direct writes to a dict, whatever was applied before an
+            # error stays applied
+            self._local.transaction = None
+            if transaction.operations:
+                touched = transaction.touched()
+                for hook in self._hooks:
+                    try:
+                        hook(transaction, touched)
+                    except Exception as e:
+                        print(f"Error in metrics commit hook: {e}")
+            self._commit(transaction)
+
+    def _commit(self, transaction: MetricsTransaction) -> int:
+        if not transaction.operations:
+            return self._snapshot.version
+        with self._write_lock:
+            snapshot = self._snapshot
+            data = dict(snapshot.data)
+            copied = set()
+            changed = set()
+            changed_keys: Dict[str, Set[str]] = {}
+            for operation, section, key, value in transaction.operations:
+                if section not in copied:
+                    data[section] = dict(data.get(section, {}))
+                    copied.add(section)
+                entries = data[section]
+                if operation == 'set':
+                    if entries.get(key) != value:
+                        entries[key] = value
+                        changed.add(section)
+                        changed_keys.setdefault(section, set()).add(key)
+                elif operation == 'merge':
+                    if key in entries:
+                        merged = {**entries[key], **value}
+                        if merged != entries[key]:
+                            entries[key] = merged
+                            changed.add(section)
+                            changed_keys.setdefault(section, set()).add(key)
+                elif key in entries:
+                    del entries[key]
+                    changed.add(section)
+                    changed_keys.setdefault(section, set()).add(key)
+
+            if not changed:
+                return snapshot.version
+            for section in changed:
+                self._section_json[section] = json.dumps(data[section]).encode()
+            self._snapshot = MetricsSnapshot(snapshot.version + 1, data, self._encode_document(data))
+            self._changes.append((self._snapshot.version, changed_keys))
+            self._committed.notify_all()
+            return self._snapshot.version
+
+    def changes_since(self, version: int, until: Optional[int] = None) -> Optional[Dict[str, Set[str]]]:
+        """Keys changed (set or deleted) after `version` up to `until`, per section.
+
+        Returns None when the history no longer reaches back that far, or the
+        version is from the future (e.g. the server restarted); callers then
+        fall back to a full response.
+        """
+        until = self._snapshot.version if until is None else until
+        if version > until:
+            return None
+        changes = list(self._changes)
+        oldest = changes[0][0] if changes else until + 1
+        if version < oldest - 1 and version != until:
+            return None
+        result: Dict[str, Set[str]] = {}
+        for change_version, keys in changes:
+            if version < change_version <= until:
+                for section, section_keys in keys.items():
+                    result.setdefault(section, set()).update(section_keys)
+        return result
+
+    def delta(self, snapshot: MetricsSnapshot, since: int, sections: Optional[Iterable[str]] = None) -> Dict:
+        """Changed entries and removed keys between `since` and a snapshot,
+        optionally limited to some sections"""
+        sections = set(snapshot.data if sections is None else sections)
+        changes = self.changes_since(since, snapshot.version)
+        if changes is None:
+            data = {section: entries for section, entries in snapshot.data.items() if section in sections}
+            return {'version': snapshot.version, 'since': since, 'full': True, 'data': data}
+        updated = {}
+        removed = {}
+        for section, keys in changes.items():
+            if section not in sections:
+                continue
+            entries = snapshot.data.get(section, {})
+            for key in keys:
+                if key in entries:
+                    updated.setdefault(section, {})[key] = entries[key]
+                else:
+                    removed.setdefault(section, []).append(key)
+        return {
+            'version': snapshot.version,
+            'since': since,
+            'full': False,
+            'changes': updated,
+            'removed': removed
+        }
@@ -0,0 +1,68 @@
+# src/dashboard/responses.py
+from collections import OrderedDict
+from flask import Response, request
+from typing import Callable, Hashable, Union
+import gzip
+import threading
+
+MIN_COMPRESS_SIZE = 1024  # bytes; smaller bodies are not worth the gzip header
+COMPRESS_LEVEL = 6
+
+class BodyCache:
+    """Small LRU of encoded response bodies.
+
+    Keys identify a data version (an ETag, or a delta's from/to versions), so
+    a body built once is served to every client asking for the same thing
+    instead of being rebuilt per request.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+        body = build()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = body
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+# Gzipped bodies keyed by ETag, so each version is compressed once
+compression_cache = BodyCache()
+
+def conditional_response(
+    etag: str,
+    body: Union[bytes, Callable[[], bytes]],
+    mimetype: str = 'application/json'
+) -> Response:
+    """Serve a JSON body with an ETag, answering 304 and gzip where the client allows.
+
+    The ETag is weak because the gzipped and plain bodies share it; callers
+    derive it from the data version, so it changes exactly when the body does.
+    `body` may be a callable so nothing is built for a 304.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        if callable(body):
+            body = body()
+        response = Response(body, mimetype=mimetype)
+        if len(body) >= MIN_COMPRESS_SIZE and 'gzip' in request.accept_encodings:
+            response.set_data(compression_cache.get(etag, lambda: gzip.compress(body, COMPRESS_LEVEL)))
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag, weak=True)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Let browsers keep the body but revalidate it on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
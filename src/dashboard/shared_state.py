@@ -0,0 +1,208 @@
+# src/dashboard/shared_state.py
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from typing import Callable, Dict, Optional, Set, Tuple
+import fcntl
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from src.dashboard.metrics_store import MetricsTransaction
+
+def private_directory(path: str) -> str:
+    """Create `path` for our user only, or check that an existing one is.
+
+    Whatever is in the state directory is trusted (the command channel
+    unpickles what it receives), so it must be a real directory owned by
+    us that no other user can write a key, socket or snapshot into.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(
+            f"State directory {path} must be a directory owned by uid {os.getuid()} with mode 0700"
+        )
+    return path
+
+class LeaderLock:
+    """Non-blocking exclusive flock on a file: one holder per path across processes.
+
+    The kernel drops the lock when the holding process exits, however it
+    exits, so a process that failed to acquire it can simply try again
+    later to take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # For whoever looks at the file; the lock itself is what counts
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+class SharedSnapshot:
+    """The poller's state, published to the other processes as one JSON file.
+
+    Every publish writes a temporary file and renames it over the old one,
+    so readers only ever see complete snapshots. Readers stat the file and
+    only parse it when its inode, size or mtime changed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._seen: Optional[Tuple[int, int, int]] = None
+        self.published = 0
+        self.loaded = 0
+
+    def publish(self, header: Dict, data_json: bytes):
+        """Write `header` plus already encoded metrics data (kept as the "data" member)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        head = json.dumps(header).encode()
+        with tempfile.NamedTemporaryFile('wb', dir=directory, delete=False) as f:
+            f.write(head[:-1] + b', "data": ' + data_json + b'}')
+        os.replace(f.name, self.path)
+        self.published += 1
+
+    def read_if_changed(self) -> Optional[Dict]:
+        """The published state if it changed since the last read, else None."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._seen:
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                state = json.loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"Error reading shared snapshot: {e}")
+            return None
+        self._seen = signature
+        self.loaded += 1
+        return state
+
+def apply_sections(tx: MetricsTransaction, data: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """Make the sections in `data` match it exactly; returns the keys that changed."""
+    changed: Dict[str, Set[str]] = {}
+    for section, entries in data.items():
+        for key in tx.keys(section):
+            if key not in entries:
+                tx.delete(section, key)
+                changed.setdefault(section, set()).add(key)
+        for key, value in entries.items():
+            if tx.get(section, key) != value:
+                tx.set(section, key, value)
+                changed.setdefault(section, set()).add(key)
+    return changed
+
+class CommandChannel:
+    """Runs named operations in the leader process on behalf of the other workers.
+
+    The leader serves a Unix socket in the state directory. Connections are
+    authenticated with a random key kept next to it in a file only the
+    dashboard's user can read. Both ends refuse to use a directory or key
+    file another user could have prepared. Each call runs on its own thread.
+    """
+
+    def __init__(self, socket_path: str, key_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.key_path = key_path
+        self.timeout = timeout
+        self._listener = None
+
+    def _authkey(self) -> bytes:
+        private_directory(os.path.dirname(os.path.abspath(self.key_path)))
+        private_directory(os.path.dirname(os.path.abspath(self.socket_path)))
+        try:
+            fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+        except FileExistsError:
+            return self._read_key()
+        key = os.urandom(32)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+        return key
+
+    def _read_key(self) -> bytes:
+        with open(os.open(self.key_path, os.O_RDONLY | os.O_NOFOLLOW), 'rb') as f:
+            info = os.fstat(f.fileno())
+            if info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o600:
+                raise PermissionError(f"Command channel key {self.key_path} must be owned by us with mode 0600")
+            # Another process may still be writing it
+            for _ in range(50):
+                key = f.read()
+                if key:
+                    return key
+                time.sleep(0.01)
+                f.seek(0)
+        raise RuntimeError(f"Empty command channel key {self.key_path}")
+
+    def serve(self, handlers: Dict[str, Callable]):
+        """Start answering calls; only the process holding the leader lock may serve."""
+        authkey = self._authkey()
+        # A socket left behind by a previous leader is stale, since we hold the lock now
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._listener = Listener(self.socket_path, family='AF_UNIX', authkey=authkey)
+        threading.Thread(target=self._accept, args=(self._listener, handlers), daemon=True).start()
+
+    def _accept(self, listener: Listener, handlers: Dict[str, Callable]):
+        while self._listener is listener:
+            try:
+                connection = listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return  # listener closed
+            threading.Thread(target=self._handle, args=(connection, handlers), daemon=True).start()
+
+    @staticmethod
+    def _handle(connection, handlers: Dict[str, Callable]):
+        with connection:
+            try:
+                name, args = connection.recv()
+                connection.send((True, handlers[name](*args)))
+            except EOFError:
+                pass
+            except Exception as e:
+                connection.send((False, f"{type(e).__name__}: {e}"))
+
+    def call(self, name: str, *args):
+        """Run an operation in the leader and return its result."""
+        with Client(self.socket_path, family='AF_UNIX', authkey=self._authkey()) as connection:
+            connection.send((name, args))
+            if not connection.poll(self.timeout):
+                raise TimeoutError(f"Leader did not answer {name} within {self.timeout}s")
+            ok, result = connection.recv()
+        if not ok:
+            raise RuntimeError(f"{name} failed in the leader: {result}")
+        return result
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
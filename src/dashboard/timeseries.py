@@ -0,0 +1,262 @@
+# src/dashboard/timeseries.py
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import math
+import threading
+
+class Tier(NamedTuple):
+    resolution: int  # seconds per bucket
+    capacity: int    # buckets kept
+
+# 5 minutes at 1 s, 1 hour at 15 s, 1 day at 5 min: 828 buckets per series
+DEFAULT_TIERS = (Tier(1, 300), Tier(15, 240), Tier(300, 288))
+
+NAN = float('nan')
+
+class TimeSeriesStore:
+    """Fixed-memory ring buffers of float samples for many series.
+
+    Every tier keeps `capacity` buckets of `resolution` seconds per series in
+    one flat array('f') (series-major, then bucket, then field), so memory
+    is max_series * sum(capacity) * len(fields) * 4 bytes and never grows
+    past that: with the default tiers and four fields that is about 13 KB
+    per series, 130 MB for 10k ports. A bucket holds the average of the
+    samples that fell into it; buckets a series skipped read as missing.
+    """
+
+    def __init__(self, fields: Sequence[str], tiers: Sequence[Tier] = DEFAULT_TIERS, max_series: int = 10000):
+        self.fields = tuple(fields)
+        self.tiers = tuple(sorted(tiers))
+        self.max_series = max_series
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._values = [array('f') for _ in self.tiers]
+        # Per series and tier: bucket currently being filled, and its running sums
+        self._bucket = [array('q') for _ in self.tiers]
+        self._sums = [array('d') for _ in self.tiers]
+        self._counts = [array('I') for _ in self.tiers]
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def memory_bytes(self) -> int:
+        arrays = self._values + self._bucket + self._sums + self._counts
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _row(self, series_id: str) -> Optional[int]:
+        row = self._rows.get(series_id)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        elif len(self._rows) < self.max_series:
+            row = len(self._rows)
+            width = len(self.fields)
+            for i, tier in enumerate(self.tiers):
+                self._values[i].extend(array('f', [NAN]) * (tier.capacity * width))
+                self._bucket[i].append(-1)
+                self._sums[i].extend(array('d', [0.0]) * width)
+                self._counts[i].append(0)
+        else:
+            return None
+        self._rows[series_id] = row
+        return row
+
+    def record(self, series_id: str, timestamp: float, values: Sequence[float]) -> bool:
+        """Add one sample (values in field order); False if the store is full"""
+        with self._lock:
+            row = self._row(series_id)
+            if row is None:
+                return False
+            self._record(row, timestamp, values)
+            return True
+
+    def record_many(self, samples: Iterable[Tuple[str, float, Sequence[float]]]) -> int:
+        """Add (series id, timestamp, values) samples under one lock; returns how many were stored"""
+        stored = 0
+        with self._lock:
+            for series_id, timestamp, values in samples:
+                row = self._row(series_id)
+                if row is not None:
+                    self._record(row, timestamp, values)
+                    stored += 1
+        return stored
+
+    def _record(self, row: int, timestamp: float, values: Sequence[float]):
+        width = len(self.fields)
+        sums_slot = row * width
+        for i, tier in enumerate(self.tiers):
+            bucket = int(timestamp // tier.resolution)
+            current = self._bucket[i][row]
+            if bucket < current:
+                continue  # late sample for a bucket already closed
+            data = self._values[i]
+            base = row * tier.capacity * width
+            sums = self._sums[i]
+            if bucket != current:
+                # Clear the buckets this series skipped so they read as missing
+                if current >= 0:
+                    for skipped in range(current + 1, min(bucket, current + tier.capacity + 1)):
+                        slot = base + (skipped % tier.capacity) * width
+                        data[slot:slot + width] = array('f', [NAN]) * width
+                self._bucket[i][row] = bucket
+                self._counts[i][row] = 0
+                sums[sums_slot:sums_slot + width] = array('d', [0.0]) * width
+            self._counts[i][row] += 1
+            count = self._counts[i][row]
+            slot = base + (bucket % tier.capacity) * width
+            for f, value in enumerate(values):
+                sums[sums_slot + f] += value
+                data[slot + f] = sums[sums_slot + f] / count
+
+    def remove(self, series_id: str):
+        width = len(self.fields)
+        with self._lock:
+            row = self._rows.pop(series_id, None)
+            if row is None:
+                return
+            for i, tier in enumerate(self.tiers):
+                size = tier.capacity * width
+                self._values[i][row * size:(row + 1) * size] = array('f', [NAN]) * size
+                self._bucket[i][row] = -1
+            self._free.append(row)
+
+    def tier_for(self, resolution: Optional[int] = None) -> int:
+        """Index of the finest tier at least as coarse as `resolution`"""
+        for i, tier in enumerate(self.tiers):
+            if resolution is None or tier.resolution >= resolution:
+                return i
+        return len(self.tiers) - 1
+
+    def history(self, series_id: str, resolution: Optional[int] = None, since: Optional[float] = None) -> Optional[Dict]:
+        """Buckets of one series, oldest first, as [timestamp, *fields] rows"""
+        width = len(self.fields)
+        i = self.tier_for(resolution)
+        tier = self.tiers[i]
+        with self._lock:
+            row = self._rows.get(series_id)
+            if row is None:
+                return None
+            last = self._bucket[i][row]
+            first = last - tier.capacity + 1
+            if since is not None:
+                first = max(first, int(since // tier.resolution))
+            base = row * tier.capacity * width
+            points = []
+            for bucket in range(max(first, 0), last + 1):
+                slot = base + (bucket % tier.capacity) * width
+                values = self._values[i][slot:slot + width]
+                if math.isnan(values[0]):
+                    continue
+                points.append([bucket * tier.resolution] + values.tolist())
+        return {'resolution': tier.resolution, 'fields': ['timestamp', *self.fields], 'points': points}
+
+# Counters from node-connector-statistics, and the rates recorded for them
+LINK_COUNTERS = ('bytes_received', 'bytes_transmitted', 'packets_received', 'packets_transmitted')
+LINK_RATE_FIELDS = ('rx_bps', 'tx_bps', 'rx_pps', 'tx_pps')
+LINK_RATE_SCALE = (8, 8, 1, 1)  # bytes become bits
+
+class LinkRates:
+    """Turns cumulative port counters into rates and records them per link.
+
+    The last counters are kept column-wise, one flat array per counter
+    indexed by the link's row, so a poll cycle's samples are turned into
+    rates one counter at a time across all links (update_many). A counter
+    that went down either wrapped (the previous value was in the upper half
+    of its range, so the delta is taken modulo 2**counter_bits) or was reset
+    by a switch or port restart, in which case the sample only becomes the
+    new baseline.
+    """
+
+    def __init__(self, series: Optional[TimeSeriesStore] = None, counter_bits: int = 64):
+        self.series = series or TimeSeriesStore(LINK_RATE_FIELDS)
+        self.modulus = 2 ** counter_bits
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._counters = [array('Q') for _ in LINK_COUNTERS]
+        self._times = array('d')
+        self.resets = 0
+        self.wraps = 0
+        self._lock = threading.Lock()
+
+    def update(self, link_id: str, timestamp: float, counters: Dict) -> Optional[Dict[str, float]]:
+        """Record a counter sample; returns the rates since the previous one, if any"""
+        return self.update_many({link_id: (timestamp, counters)})[link_id]
+
+    def _baseline(self, link_id: str, timestamp: float, values: List[int]):
+        if not self._free and len(self._rows) >= self.series.max_series:
+            return
+        row = self._free.pop() if self._free else len(self._rows)
+        if row == len(self._times):
+            for column, value in zip(self._counters, values):
+                column.append(value)
+            self._times.append(timestamp)
+        else:
+            for column, value in zip(self._counters, values):
+                column[row] = value
+            self._times[row] = timestamp
+        self._rows[link_id] = row
+
+    def update_many(self, samples: Dict[str, Tuple[float, Dict]]) -> Dict[str, Optional[Dict[str, float]]]:
+        """Record one (timestamp, counters) sample per link; returns each link's rates
+
+        Links seen for the first time, with a counter reset or without time
+        passed since their last sample get None.
+        """
+        results: Dict[str, Optional[Dict[str, float]]] = dict.fromkeys(samples)
+        links, rows, elapsed = [], [], []
+        # New counters of the links that have a previous sample, per counter
+        columns: List[List[int]] = [[] for _ in LINK_COUNTERS]
+        with self._lock:
+            for link_id, (timestamp, counters) in samples.items():
+                values = [int(counters.get(name, 0)) % self.modulus for name in LINK_COUNTERS]
+                row = self._rows.get(link_id)
+                if row is None:
+                    self._baseline(link_id, timestamp, values)
+                    continue
+                if timestamp <= self._times[row]:
+                    continue
+                links.append(link_id)
+                rows.append(row)
+                elapsed.append(timestamp - self._times[row])
+                self._times[row] = timestamp
+                for column, value in zip(columns, values):
+                    column.append(value)
+
+            # One pass per counter over every link; the new values become the baseline
+            deltas = []
+            reset = set()
+            for stored, current in zip(self._counters, columns):
+                delta = [after - stored[row] for row, after in zip(rows, current)]
+                for i in [i for i, d in enumerate(delta) if d < 0]:
+                    if stored[rows[i]] < self.modulus / 2:
+                        reset.add(i)
+                    else:
+                        self.wraps += 1
+                        delta[i] += self.modulus
+                for row, after in zip(rows, current):
+                    stored[row] = after
+                deltas.append(delta)
+            self.resets += len(reset)
+
+        rates = [
+            [d * scale / e for d, e in zip(delta, elapsed)]
+            for delta, scale in zip(deltas, LINK_RATE_SCALE)
+        ]
+        recorded = []
+        for i, link_rates in enumerate(zip(*rates)):
+            if i in reset:
+                continue
+            link_id = links[i]
+            recorded.append((link_id, samples[link_id][0], link_rates))
+            results[link_id] = dict(zip(LINK_RATE_FIELDS, link_rates))
+        self.series.record_many(recorded)
+        return results
+
+    def remove(self, link_id: str):
+        with self._lock:
+            row = self._rows.pop(link_id, None)
+            if row is not None:
+                self._free.append(row)
+        self.series.remove(link_id)
@@ -0,0 +1,213 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import datetime
+import json
+import os
+import random
+import re
+import time
+import requests
+
+PATTERNS = ("uniform", "hotspot", "all-to-all")
+
+class TrafficFlow(NamedTuple):
+    source: str       # host name
+    destination: str
+
+def traffic_matrix(
+    pattern: str,
+    hosts: Sequence[str],
+    seed: int = 0,
+    flows: int = 10,
+    hotspots: int = 1,
+    hotspot_share: float = 0.8
+) -> List[TrafficFlow]:
+    """Source/destination pairs for a traffic pattern, reproducible from `seed`.
+
+    uniform picks `flows` distinct pairs at random; hotspot sends
+    `hotspot_share` of them to a few hotspot hosts; all-to-all is every
+    ordered pair (and ignores `flows`).
+    """
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown traffic pattern {pattern}, expected one of {', '.join(PATTERNS)}")
+    hosts = list(hosts)
+    if len(hosts) < 2:
+        return []
+    if pattern == "all-to-all":
+        return [TrafficFlow(s, d) for s in hosts for d in hosts if s != d]
+
+    rng = random.Random(seed)
+    targets = rng.sample(hosts, min(hotspots, len(hosts))) if pattern == "hotspot" else hosts
+    flows = min(flows, len(hosts) * (len(hosts) - 1))
+    chosen: List[TrafficFlow] = []
+    seen = set()
+    # Bounded so a hotspot matrix with few possible pairs cannot loop forever
+    for _ in range(flows * 100):
+        if len(chosen) == flows:
+            break
+        if pattern == "hotspot" and rng.random() < hotspot_share:
+            destination = rng.choice(targets)
+        else:
+            destination = rng.choice(hosts)
+        source = rng.choice(hosts)
+        if source != destination and (source, destination) not in seen:
+            seen.add((source, destination))
+            chosen.append(TrafficFlow(source, destination))
+    return chosen
+
+def flow_command(destinations: Sequence[str], duration: int, ping_interval: float = 0.2) -> str:
+    """Shell command that runs an iperf client and a ping to every destination IP at once.
+
+    Each ping summary is folded onto one "ping <ip> ..." line and iperf
+    reports in CSV, so concurrent flows do not interleave their output.
+    Only these jobs are waited for: the host shell may also be running an
+    iperf server in the background, which never exits by itself.
+    """
+    count = max(int(duration / ping_interval), 1)
+    parts = ['pids=;']
+    for ip in destinations:
+        parts.append(
+            f'(echo "ping {ip} $(ping -q -c {count} -i {ping_interval} -w {duration + 2} {ip} | tail -n 2 | tr \'\\n\' \' \')") & pids="$pids $!";'
+        )
+        parts.append(f'(iperf -c {ip} -t {duration} -y C 2>/dev/null | tail -n 1) & pids="$pids $!";')
+    return ' '.join(parts) + ' wait $pids'
+
+def ping_sweep_command(targets: Sequence[str], timeout: int = 1, parallel: int = 4) -> str:
+    """Shell command that pings each target IP once, at most `parallel` at a time.
+
+    Prints "ok <ip>" or "fail <ip>" per target; the lines are short enough
+    to be written whole even when pings finish together.
+    """
+    return (
+        f"printf '%s\\n' {' '.join(targets)} | xargs -r -n 1 -P {max(parallel, 1)} sh -c "
+        f"'ping -c 1 -W {timeout} \"$1\" > /dev/null 2>&1 && echo \"ok $1\" || echo \"fail $1\"' _"
+    )
+
+_PING_LOSS = re.compile(r"([\d.]+)% packet loss")
+_PING_RTT = re.compile(r"= [\d.]+/([\d.]+)/([\d.]+)/[\d.]+ ms")
+
+def parse_flow_output(output: str) -> Dict[str, Dict]:
+    """Throughput, latency and loss per destination IP from flow_command output."""
+    results: Dict[str, Dict] = {}
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("ping "):
+            ip = line.split()[1]
+            entry = results.setdefault(ip, {})
+            loss = _PING_LOSS.search(line)
+            rtt = _PING_RTT.search(line)
+            entry["loss_pct"] = float(loss.group(1)) if loss else 100.0
+            entry["latency_ms"] = float(rtt.group(1)) if rtt else None
+            entry["max_latency_ms"] = float(rtt.group(2)) if rtt else None
+        else:
+            # timestamp,src_ip,src_port,dst_ip,dst_port,id,interval,bytes,bits_per_second
+            fields = line.split(",")
+            if len(fields) >= 9 and fields[8].isdigit():
+                entry = results.setdefault(fields[3], {})
+                entry["throughput_mbps"] = int(fields[8]) / 1e6
+                entry["bytes"] = int(fields[7])
+    return results
+
+def summarize(values: Sequence[float]) -> Optional[Dict[str, float]]:
+    """count, mean, p50, p95 and max of a list of measurements."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    def percentile(p: float) -> float:
+        return values[min(int(p * len(values)), len(values) - 1)]
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(0.5),
+        "p95": percentile(0.95),
+        "max": values[-1]
+    }
+
+def measure_route_installs(install: Callable[[], Tuple[bool, bool]], count: int = 1) -> Tuple[List[float], int]:
+    """Time `count` calls of a route install; returns latencies (ms) and the number that failed."""
+    latencies = []
+    failures = 0
+    for _ in range(count):
+        started = time.perf_counter()
+        primary_ok, backup_ok = install()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if not (primary_ok and backup_ok):
+            failures += 1
+    return latencies, failures
+
+def measure_failover(
+    failover,
+    route: Tuple[str, str],
+    take_down: Callable[[], None],
+    restore: Callable[[], None],
+    timeout: float = 10.0,
+    interval: float = 0.01
+) -> Optional[float]:
+    """Take a link of a route's primary down and time until the route is on its backup (ms).
+
+    take_down and restore bring the link down and back up (in Mininet with
+    configLinkStatus). Detection is left to the running failover watcher,
+    so it counts towards the time. The link is then restored and the route
+    waited for until it is back on its primary. None if the route did not
+    move within timeout.
+    """
+    def wait_until(condition) -> bool:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(interval)
+        return True
+
+    failovers = failover.stats()["failovers"]
+    started = time.monotonic()
+    take_down()
+    try:
+        moved = wait_until(lambda: failover.stats()["failovers"] > failovers and route not in failover.active_routes())
+        elapsed = (time.monotonic() - started) * 1000
+    finally:
+        restorations = failover.stats()["restorations"]
+        restore()
+    if moved and not wait_until(lambda: failover.stats()["restorations"] > restorations):
+        print(f"Route {route} did not return to its primary path within {timeout}s")
+    return elapsed if moved else None
+
+def measure_dashboard_polls(url: str, count: int = 20, interval: float = 0.5, timeout: float = 5) -> Tuple[List[float], int]:
+    """Time `count` dashboard metrics polls (ms), as the page makes them; returns latencies and errors."""
+    latencies = []
+    errors = 0
+    with requests.Session() as session:
+        for i in range(count):
+            started = time.perf_counter()
+            try:
+                response = session.get(f"{url}/api/metrics", timeout=timeout)
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+            except requests.RequestException as e:
+                print(f"Error polling dashboard: {e}")
+                errors += 1
+            if i + 1 < count:
+                time.sleep(interval)
+    return latencies, errors
+
+def save_results(results: Dict, directory: str = "benchmarks") -> str:
+    """Write one run's results as JSON; the file name sorts by time."""
+    os.makedirs(directory, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{results['pattern']}-seed{results['seed']}.json"
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+def compare_results(baseline: Dict, current: Dict) -> Dict[str, Dict[str, float]]:
+    """Relative change (current / baseline - 1) of every summarised metric both runs have."""
+    changes = {}
+    for metric, summary in current.get("summary", {}).items():
+        before = baseline.get("summary", {}).get(metric)
+        if not summary or not before:
+            continue
+        changes[metric] = {
+            stat: summary[stat] / before[stat] - 1
+            for stat in ("mean", "p50", "p95")
+            if before.get(stat)
+        }
+    return changes
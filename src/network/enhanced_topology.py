@@ -4,71 +4,51 @@ from mininet.node import RemoteController, OVSSwitch
 from mininet.cli import CLI
 from mininet.log import setLogLevel
 from mininet.link import TCLink
+from src.controller.enhanced_sdn_controller import EnhancedOpenDaylightController
+from src.controller.failover import FailoverManager
+from src.network.topology_spec import HOST_GATEWAY, TopologyParams, generate_topology
+from src.network.benchmark import (
+    PATTERNS, flow_command, measure_dashboard_polls, measure_failover, measure_route_installs,
+    parse_flow_output, ping_sweep_command, save_results, summarize, traffic_matrix
+)
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import argparse
+import os
 import random
 import time
 
 class EnhancedTopology(Topo):
-    def build(self):
-        # Create core switches (backbone of the network)
-        core_switches = []
-        for i in range(1, 4):
-            switch = self.addSwitch(f'c{i}', cls=OVSSwitch, protocols='OpenFlow13')
-            core_switches.append(switch)
-
-        # Create distribution switches (intermediate layer)
-        dist_switches = []
-        for i in range(1, 7):
-            switch = self.addSwitch(f'd{i}', cls=OVSSwitch, protocols='OpenFlow13')
-            dist_switches.append(switch)
-
-        # Create access switches (edge layer)
-        access_switches = []
-        for i in range(1, 13):
-            switch = self.addSwitch(f'a{i}', cls=OVSSwitch, protocols='OpenFlow13')
-            access_switches.append(switch)
-
-        # Create hosts (multiple hosts per access switch)
-        hosts = []
-        for i in range(1, 37):  # 3 hosts per access switch
-            host = self.addHost(f'h{i}')
-            hosts.append(host)
-
-        # Connect core switches to each other (full mesh)
-        for i, switch1 in enumerate(core_switches):
-            for switch2 in core_switches[i+1:]:
-                self.addLink(switch1, switch2, cls=TCLink, bw=100)  # 100 Mbps links
-
-        # Connect distribution switches to core switches
-        for i, dist_switch in enumerate(dist_switches):
-            # Each distribution switch connects to two core switches for redundancy
-            core1 = core_switches[i % len(core_switches)]
-            core2 = core_switches[(i + 1) % len(core_switches)]
-            self.addLink(dist_switch, core1, cls=TCLink, bw=50)  # 50 Mbps links
-            self.addLink(dist_switch, core2, cls=TCLink, bw=50)
-
-        # Connect access switches to distribution switches
-        for i, acc_switch in enumerate(access_switches):
-            # Each access switch connects to two distribution switches
-            dist1 = dist_switches[i % len(dist_switches)]
-            dist2 = dist_switches[(i + 1) % len(dist_switches)]
-            self.addLink(acc_switch, dist1, cls=TCLink, bw=25)  # 25 Mbps links
-            self.addLink(acc_switch, dist2, cls=TCLink, bw=25)
-
-        # Connect hosts to access switches
-        for i, host in enumerate(hosts):
-            # Connect each host to its access switch
-            acc_switch = access_switches[i // 3]  # 3 hosts per access switch
-            self.addLink(host, acc_switch, cls=TCLink, bw=10)  # 10 Mbps links
+    def build(self, params: TopologyParams = TopologyParams()):
+        """Create the 3-tier network described by generate_topology(params)."""
+        graph = generate_topology(params)
+        for node in graph.nodes:
+            if node.tier == "host":
+                self.addHost(node.name, ip=node.ip)
+            else:
+                self.addSwitch(node.name, cls=OVSSwitch, protocols='OpenFlow13')
+
+        # Links are listed core mesh first, then uplinks, then hosts; bandwidths in Mbps
+        for link in graph.links:
+            self.addLink(link.source, link.target, cls=TCLink, bw=link.bandwidth)
 
 class NetworkSimulation:
-    def __init__(self):
+    def __init__(self, params: TopologyParams = TopologyParams(), parallelism: Optional[int] = None):
         self.net = None
         self.controller = None
-        self.total_hosts = 36  # Total number of hosts in the network
+        self.params = params
+        self.graph = generate_topology(params)
+        self.total_hosts = len(self.graph.hosts)  # Total number of hosts in the network
+        self.parallelism = parallelism or (os.cpu_count() or 1) * 8  # hosts running a command at once
+
+    def start_network(self, verify_all_pairs: bool = False):
+        """Initialize and start the network simulation.
 
-    def start_network(self):
-        """Initialize and start the network simulation."""
-        topo = EnhancedTopology()
+        verify_all_pairs checks reachability between every pair of hosts
+        instead of a sample of five.
+        """
+        topo = EnhancedTopology(params=self.params)
         self.controller = RemoteController('c0', ip='127.0.0.1', port=6633)
         self.net = Mininet(
             topo=topo,
@@ -81,26 +61,37 @@ class NetworkSimulation:
         
         print("Starting network...")
         self.net.start()
-        self._setup_network_conditions()
+        self._setup_network_conditions(verify_all_pairs)
         
         print("Network is ready for simulation!")
         return self.net
 
-    def _setup_network_conditions(self):
+    def _run_on_hosts(self, hosts: List, command_for: Callable) -> Dict[str, str]:
+        """Run one shell command per host, up to `parallelism` hosts at a time.
+
+        Each Mininet host has its own shell, so commands are dispatched with
+        sendCmd and collected with waitOutput rather than run one by one.
+        """
+        outputs = {}
+        for i in range(0, len(hosts), self.parallelism):
+            batch = hosts[i:i + self.parallelism]
+            for host in batch:
+                host.sendCmd(command_for(host))
+            for host in batch:
+                outputs[host.name] = host.waitOutput()
+        return outputs
+
+    def _setup_network_conditions(self, verify_all_pairs: bool = False):
         """Set up initial network conditions and verify connectivity."""
         print("\nSetting up network conditions...")
         
-        # Configure IP addresses for hosts
-        for i, host in enumerate(self.net.hosts, 1):
-            # Configure IP address
-            host.cmd(f'ifconfig {host.name}-eth0 10.0.0.{i}/24')
-            
-            # Add default route
-            host.cmd(f'route add default gw 10.0.0.254')
-            
-            # Set up host-specific configuration
-            host.cmd('sysctl -w net.ipv4.tcp_congestion_control=cubic')
-            host.cmd('sysctl -w net.ipv4.ip_forward=1')
+        # Configure IP address, default route and host settings in one command per host
+        addresses = {node.name: node.ip for node in self.graph.hosts}
+        self._run_on_hosts(self.net.hosts, lambda host: (
+            f'ifconfig {host.name}-eth0 {addresses[host.name]}; '
+            f'route add default gw {HOST_GATEWAY}; '
+            'sysctl -qw net.ipv4.tcp_congestion_control=cubic net.ipv4.ip_forward=1'
+        ))
         
         # Add random delay to links to simulate real network conditions
         for link in self.net.links:
@@ -109,33 +100,94 @@ class NetworkSimulation:
         
         # Wait for the network to initialize
         print("Waiting for network initialization...")
-        time.sleep(5)
+        if not self._wait_until_ready():
+            print("Network not fully ready, continuing anyway")
         
         # Verify basic connectivity
-        self._verify_connectivity()
+        self._verify_connectivity(all_pairs=verify_all_pairs)
+
+    def _wait_until_ready(self, timeout: float = 30, interval: float = 0.2) -> bool:
+        """Poll until every switch is connected to the controller and every host interface is up."""
+        started = time.time()
+        if not self.net.waitConnected(timeout=timeout, delay=interval):
+            return False
+
+        pending = list(self.net.hosts)
+        while pending:
+            outputs = self._run_on_hosts(pending, lambda host: f'cat /sys/class/net/{host.name}-eth0/operstate')
+            pending = [host for host in pending if outputs[host.name].strip() != 'up']
+            if not pending:
+                break
+            if time.time() - started > timeout:
+                return False
+            time.sleep(interval)
+
+        print(f"Network ready after {time.time() - started:.1f}s")
+        return True
+
+    def reachability_matrix(
+        self,
+        hosts: Optional[List] = None,
+        timeout: int = 1,
+        pings_per_host: int = 4
+    ) -> Dict[str, Dict[str, bool]]:
+        """Ping every other host from every host; returns source -> target -> reachable.
 
-    def _verify_connectivity(self):
-        """Verify network connectivity with detailed output."""
+        Each source runs at most pings_per_host pings at once and up to
+        `parallelism` sources are dispatched concurrently, so the number of
+        pings in flight follows the core count instead of the square of the
+        host count.
+        """
+        hosts = self.net.hosts if hosts is None else hosts
+        names = {host.IP(): host.name for host in hosts}
+
+        def command_for(source):
+            return ping_sweep_command([ip for ip in names if ip != source.IP()], timeout, pings_per_host)
+
+        matrix = {}
+        for source, output in self._run_on_hosts(hosts, command_for).items():
+            row = matrix.setdefault(source, {})
+            for line in output.splitlines():
+                parts = line.split()
+                if len(parts) == 2 and parts[1] in names:
+                    row[names[parts[1]]] = parts[0] == 'ok'
+        return matrix
+
+    @staticmethod
+    def print_reachability(matrix: Dict[str, Dict[str, bool]], max_grid: int = 40):
+        """Summarise a reachability matrix; small networks also get the full grid."""
+        pairs = [(source, target, ok) for source, row in matrix.items() for target, ok in row.items()]
+        failed = [(source, target) for source, target, ok in pairs if not ok]
+        print(f"Reachability: {len(pairs) - len(failed)}/{len(pairs)} host pairs reachable")
+
+        if len(matrix) <= max_grid:
+            names = sorted(matrix, key=lambda name: int(name[1:]))
+            width = max(len(name) for name in names)
+            print(' ' * width + ' ' + ' '.join(name[1:].rjust(3) for name in names))
+            for source in names:
+                cells = ['  -' if source == target else ('  .' if matrix[source].get(target) else '  X') for target in names]
+                print(source.rjust(width) + ' ' + ' '.join(cells))
+        else:
+            unreachable_from = {}
+            for source, _ in failed:
+                unreachable_from[source] = unreachable_from.get(source, 0) + 1
+            for source, count in sorted(unreachable_from.items(), key=lambda item: -item[1])[:20]:
+                print(f"{source}: {count} unreachable targets")
+
+    def _verify_connectivity(self, all_pairs: bool = False):
+        """Verify network connectivity between a sample of hosts, or all of them."""
         print("\nVerifying network connectivity...")
         
         # Test connectivity between a subset of hosts
-        test_hosts = random.sample(self.net.hosts, min(5, len(self.net.hosts)))
-        
-        for source in test_hosts:
-            print(f"\nTesting connectivity from {source.name}:")
-            for target in test_hosts:
-                if source != target:
-                    result = source.cmd(f'ping -c 1 -W 1 {target.IP()}')
-                    success = '1 received' in result
-                    print(f"{source.name} -> {target.name}: {'Success' if success else 'Failed'}")
-                    
-                    if not success:
-                        print(f"Debug info for failed connection:")
-                        print(f"Source ({source.name}) configuration:")
-                        print(source.cmd('ifconfig'))
-                        print(source.cmd('route -n'))
-                        print(f"Target ({target.name}) configuration:")
-                        print(target.cmd('ifconfig'))
+        test_hosts = self.net.hosts if all_pairs else random.sample(self.net.hosts, min(5, len(self.net.hosts)))
+        matrix = self.reachability_matrix(test_hosts)
+        self.print_reachability(matrix)
+
+        failing = [source for source, row in matrix.items() if not all(row.values())]
+        for host in [self.net.get(name) for name in failing[:3]]:
+            print(f"Debug info for {host.name}:")
+            print(host.cmd('ifconfig'))
+            print(host.cmd('route -n'))
 
     def verify_switch_flows(self):
         """Verify OpenFlow rules on all switches."""
@@ -146,30 +198,104 @@ class NetworkSimulation:
             print(f"Switch {switch.name} ports:")
             print(switch.cmd('ovs-ofctl show ' + switch.name))
 
-    def simulate_traffic(self):
-        """Generate sample traffic in the network."""
-        print("\nSimulating network traffic...")
-        
-        # Select random hosts for servers and clients
-        all_hosts = self.net.hosts
-        server_hosts = random.sample(all_hosts, min(5, len(all_hosts)))
-        client_hosts = [h for h in all_hosts if h not in server_hosts]
-        
-        # Start iperf servers
-        for server in server_hosts:
-            print(f"Starting iperf server on {server.name}")
-            server.cmd('iperf -s &')
-        
-        # Start iperf clients
-        for client in client_hosts[:5]:
-            server = random.choice(server_hosts)
-            print(f"Testing bandwidth from {client.name} to {server.name}")
-            result = client.cmd(f'iperf -c {server.IP()} -t 10')
-            print(f"Bandwidth test result: {result}")
+    def run_traffic_benchmark(
+        self,
+        pattern: str = "uniform",
+        seed: int = 0,
+        flows: int = 10,
+        duration: int = 10,
+        controller=None,
+        failover=None,
+        dashboard_url: Optional[str] = None,
+        output_dir: Optional[str] = "benchmarks"
+    ) -> Dict:
+        """Run a reproducible traffic benchmark and record the results as JSON.
+
+        The flows of the traffic matrix all run at once (one shell command
+        per source host). With a controller, a redundant route is installed
+        for every flow first and timed; with a running failover manager as
+        well, the first link of one route's primary is taken down and the
+        time until the route is on its backup recorded, after which the link
+        and the route are restored; with a dashboard URL, metrics polls are
+        timed while the traffic runs.
+        """
+        print(f"\nRunning {pattern} traffic benchmark (seed {seed})...")
+        hosts = {host.name: host for host in self.net.hosts}
+        matrix = traffic_matrix(pattern, sorted(hosts, key=lambda name: int(name[1:])), seed=seed, flows=flows)
+        access_switch = {link.source: link.target for link in self.graph.links if link.source in hosts}
+        results = {
+            "pattern": pattern,
+            "seed": seed,
+            "duration": duration,
+            "topology": self.params._asdict(),
+            "started": datetime.now().isoformat(),
+            "flows": [],
+            "summary": {}
+        }
+
+        if controller is not None:
+            install_latencies, install_failures = [], 0
+            for flow in matrix:
+                latencies, failed = measure_route_installs(lambda: controller.setup_redundant_path(
+                    hosts[flow.source].IP(), hosts[flow.destination].IP(),
+                    source_switch=access_switch[flow.source],
+                    destination_switch=access_switch[flow.destination]
+                ))
+                install_latencies += latencies
+                install_failures += failed
+            results["summary"]["route_install_ms"] = summarize(install_latencies)
+            results["route_install_failures"] = install_failures
+
+        # iperf servers on every destination, then all clients at once
+        destinations = {flow.destination for flow in matrix}
+        for name in destinations:
+            hosts[name].cmd('iperf -s > /dev/null 2>&1 &')
+        by_source: Dict[str, List[str]] = {}
+        for flow in matrix:
+            by_source.setdefault(flow.source, []).append(hosts[flow.destination].IP())
 
-        # Clean up iperf servers
-        for server in server_hosts:
-            server.cmd('kill %iperf')
+        poller = None
+        if dashboard_url is not None:
+            poller = ThreadPoolExecutor(max_workers=1)
+            polls = poller.submit(measure_dashboard_polls, dashboard_url, max(int(duration / 0.5), 1))
+        outputs = self._run_on_hosts(
+            [hosts[name] for name in by_source],
+            lambda host: flow_command(by_source[host.name], duration)
+        )
+        for name in destinations:
+            hosts[name].cmd('kill %iperf')
+
+        names = {host.IP(): name for name, host in hosts.items()}
+        for source, output in outputs.items():
+            for ip, measured in parse_flow_output(output).items():
+                results["flows"].append({"source": source, "destination": names.get(ip, ip), **measured})
+        for metric in ("throughput_mbps", "latency_ms", "loss_pct"):
+            results["summary"][metric] = summarize([flow.get(metric) for flow in results["flows"]])
+
+        if poller is not None:
+            latencies, errors = polls.result()
+            poller.shutdown()
+            results["summary"]["dashboard_poll_ms"] = summarize(latencies)
+            results["dashboard_poll_errors"] = errors
+
+        if failover is not None:
+            routes = failover.active_routes()
+            if routes:
+                route, state = next(iter(routes.items()))
+                source, target = state["primary_path"][:2]
+                failover_ms = measure_failover(
+                    failover, route,
+                    take_down=lambda: self.net.configLinkStatus(source, target, 'down'),
+                    restore=lambda: self.net.configLinkStatus(source, target, 'up')
+                )
+                results["summary"]["failover_ms"] = summarize([failover_ms]) if failover_ms is not None else None
+
+        for metric, summary in results["summary"].items():
+            if summary:
+                print(f"{metric}: mean {summary['mean']:.2f}, p95 {summary['p95']:.2f} ({summary['count']} samples)")
+        if output_dir is not None:
+            print(f"Results written to {save_results(results, output_dir)}")
+        return results
 
     def monitor_network(self):
         """Monitor network statistics."""
@@ -199,14 +325,52 @@ class NetworkSimulation:
 
 def main():
     """Main function to run the network simulation."""
+    parser = argparse.ArgumentParser(description="Run the 3-tier network simulation")
+    parser.add_argument('--pattern', choices=PATTERNS, default='uniform', help="traffic matrix")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--flows', type=int, default=10)
+    parser.add_argument('--duration', type=int, default=10, help="seconds per flow")
+    parser.add_argument('--dashboard', default=None, help="dashboard URL to time metrics polls against")
+    parser.add_argument('--output', default='benchmarks', help="directory for JSON results")
+    parser.add_argument('--odl-host', default='localhost', help="OpenDaylight RESTCONF host")
+    parser.add_argument('--odl-port', type=int, default=8181)
+    parser.add_argument('--failover-interval', type=float, default=0.5,
+                        help="seconds between the failover watcher's topology reads")
+    parser.add_argument('--all-pairs', action='store_true',
+                        help="check reachability between every pair of hosts, not a sample")
+    parser.add_argument('--parallelism', type=int, default=None,
+                        help="hosts running commands at once (default 8 per CPU)")
+    defaults = TopologyParams()
+    parser.add_argument('--core', type=int, default=defaults.core, help="core switches")
+    parser.add_argument('--distribution-per-core', type=int, default=defaults.distribution_per_core,
+                        help="distribution switches per core switch")
+    parser.add_argument('--access-per-distribution', type=int, default=defaults.access_per_distribution,
+                        help="access switches per distribution switch")
+    parser.add_argument('--hosts-per-access', type=int, default=defaults.hosts_per_access,
+                        help="hosts per access switch")
+    args = parser.parse_args()
+
     setLogLevel('info')
     
-    simulation = NetworkSimulation()
+    params = defaults._replace(
+        core=args.core,
+        distribution_per_core=args.distribution_per_core,
+        access_per_distribution=args.access_per_distribution,
+        hosts_per_access=args.hosts_per_access
+    )
+    simulation = NetworkSimulation(params, args.parallelism)
+    controller = EnhancedOpenDaylightController(host=args.odl_host, port=args.odl_port)
+    failover = FailoverManager(controller, poll_interval=args.failover_interval)
     
     try:
-        simulation.start_network()
+        simulation.start_network(verify_all_pairs=args.all_pairs)
+        failover.start()
         simulation.verify_switch_flows()
-        simulation.simulate_traffic()
+        simulation.run_traffic_benchmark(
+            args.pattern, args.seed, args.flows, args.duration,
+            controller=controller, failover=failover,
+            dashboard_url=args.dashboard, output_dir=args.output
+        )
         simulation.monitor_network()
         simulation.run_cli()
     except KeyboardInterrupt:
@@ -214,6 +378,8 @@ def main():
     except Exception as e:
         print(f"\nError occurred: {e}")
     finally:
+        failover.stop()
+        controller.close()
         simulation.stop_network()
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+from typing import Dict, List, NamedTuple, Optional
+
+class TopologyParams(NamedTuple):
+    """Shape of a 3-tier topology; the defaults give the original 3/6/12/36 network."""
+    core: int = 3
+    distribution_per_core: int = 2    # fan-out core -> distribution
+    access_per_distribution: int = 2  # fan-out distribution -> access
+    hosts_per_access: int = 3         # host density
+    distribution_uplinks: int = 2     # redundancy: core switches per distribution switch
+    access_uplinks: int = 2           # redundancy: distribution switches per access switch
+    core_full_mesh: bool = True       # otherwise a ring, for large cores
+    core_bandwidth: int = 100         # Mbps
+    distribution_bandwidth: int = 50
+    access_bandwidth: int = 25
+    host_bandwidth: int = 10
+
+class NodeSpec(NamedTuple):
+    name: str
+    tier: str                 # core, distribution, access or host
+    ip: Optional[str] = None  # hosts only, "address/prefix"
+
+class LinkSpec(NamedTuple):
+    source: str
+    target: str
+    bandwidth: int
+    source_port: int
+    target_port: int
+
+class TopologyGraph(NamedTuple):
+    nodes: List[NodeSpec]
+    links: List[LinkSpec]
+
+    @property
+    def switches(self) -> List[NodeSpec]:
+        return [node for node in self.nodes if node.tier != "host"]
+
+    @property
+    def hosts(self) -> List[NodeSpec]:
+        return [node for node in self.nodes if node.tier == "host"]
+
+# Host addresses are allocated in 10.0.0.0/8, skipping the gateway address
+HOST_GATEWAY = "10.0.0.254"
+
+def host_ip(index: int) -> str:
+    """Address of the index-th host (1-based), 10.0.0.1 onwards."""
+    n = index if index < 254 else index + 1
+    if n >= 2 ** 24 - 1:
+        raise ValueError(f"No address left for host {index}")
+    return f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}/8"
+
+def generate_topology(params: TopologyParams = TopologyParams()) -> TopologyGraph:
+    """Build the node and link lists of a 3-tier topology, without Mininet.
+
+    Names follow the controller's conventions (c*, d*, a*, h*). Links are
+    listed in the order EnhancedTopology adds them and ports are numbered
+    per node in that order, as Mininet does, so port numbers match a
+    running network.
+    """
+    if min(params.core, params.distribution_per_core, params.access_per_distribution) < 1:
+        raise ValueError("Every tier needs at least one switch")
+
+    cores = [f"c{i}" for i in range(1, params.core + 1)]
+    distributions = [f"d{i}" for i in range(1, params.core * params.distribution_per_core + 1)]
+    accesses = [f"a{i}" for i in range(1, len(distributions) * params.access_per_distribution + 1)]
+    host_count = len(accesses) * params.hosts_per_access
+
+    nodes = [NodeSpec(name, "core") for name in cores]
+    nodes += [NodeSpec(name, "distribution") for name in distributions]
+    nodes += [NodeSpec(name, "access") for name in accesses]
+    nodes += [NodeSpec(f"h{i}", "host", host_ip(i)) for i in range(1, host_count + 1)]
+
+    links: List[LinkSpec] = []
+    ports: Dict[str, int] = {}
+
+    def connect(source: str, target: str, bandwidth: int):
+        ports[source] = ports.get(source, 0) + 1
+        ports[target] = ports.get(target, 0) + 1
+        links.append(LinkSpec(source, target, bandwidth, ports[source], ports[target]))
+
+    # Core: full mesh, or a ring when a mesh would be too dense
+    if params.core_full_mesh:
+        for i, first in enumerate(cores):
+            for second in cores[i + 1:]:
+                connect(first, second, params.core_bandwidth)
+    elif len(cores) > 1:
+        for i, first in enumerate(cores):
+            second = cores[(i + 1) % len(cores)]
+            if len(cores) > 2 or i == 0:
+                connect(first, second, params.core_bandwidth)
+
+    # Each lower-tier switch connects to `uplinks` consecutive upper-tier switches
+    for lower, upper, uplinks, bandwidth in (
+        (distributions, cores, params.distribution_uplinks, params.distribution_bandwidth),
+        (accesses, distributions, params.access_uplinks, params.access_bandwidth)
+    ):
+        for i, switch in enumerate(lower):
+            for j in range(min(uplinks, len(upper))):
+                connect(switch, upper[(i + j) % len(upper)], bandwidth)
+
+    for i in range(host_count):
+        connect(f"h{i + 1}", accesses[i // params.hosts_per_access], params.host_bandwidth)
+
+    return TopologyGraph(nodes, links)
+
+def _node_id(name: str) -> str:
+    """Hosts appear as "host:<name>" nodes, like ODL's host tracker reports them."""
+    return f"host:{name}" if name.startswith("h") else name
+
+def to_odl_document(graph: TopologyGraph) -> Dict:
+    """The graph as an ODL network-topology document (both link directions).
+
+    Termination points are "<node>:<port>" and link ids are the source
+    termination point, as in ODL.
+    """
+    termination_points: Dict[str, List[Dict]] = {_node_id(node.name): [] for node in graph.nodes}
+    links = []
+    for link in graph.links:
+        for source, source_port, target, target_port in (
+            (link.source, link.source_port, link.target, link.target_port),
+            (link.target, link.target_port, link.source, link.source_port)
+        ):
+            source_tp = f"{_node_id(source)}:{source_port}"
+            termination_points[_node_id(source)].append({"tp-id": source_tp})
+            links.append({
+                "link-id": source_tp,
+                "source": {"source-node": _node_id(source), "source-tp": source_tp},
+                "destination": {"dest-node": _node_id(target), "dest-tp": f"{_node_id(target)}:{target_port}"}
+            })
+
+    return {"network-topology": {"topology": [{
+        "topology-id": "flow:1",
+        "node": [
+            {"node-id": name, "termination-point": tps}
+            for name, tps in termination_points.items()
+        ],
+        "link": links
+    }]}}
+
+def link_bandwidths(graph: TopologyGraph) -> Dict[str, int]:
+    """Bandwidth per link id of to_odl_document(graph), for TopologyModel link attributes."""
+    bandwidths = {}
+    for link in graph.links:
+        bandwidths[f"{_node_id(link.source)}:{link.source_port}"] = link.bandwidth
+        bandwidths[f"{_node_id(link.target)}:{link.target_port}"] = link.bandwidth
+    return bandwidths
@@ -0,0 +1,203 @@
+# tests/fake_chain.py
+"""In-process stand-ins for the web3 client and the EnhancedNetworkManager contract.
+
+Only the calls the dashboard makes are modelled: contract functions are
+looked up by name and return a FakeCall whose call() answers from
+FakeContract.switches and whose transact() goes through FakeEth, which
+checks nonces, hands out receipts and can fail sends or hold receipts back.
+FakeEth also keeps a chain of block hashes with contract logs in them, which
+tests extend (mine, emit), rewrite (reorg) or shorten (reset).
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import hashlib
+import re
+import threading
+from web3 import Web3
+from src.controller.chain_encoding import decode_id, encode_id
+from src.controller.contract_artifact import CONTRACT_SOURCE
+
+def source_event_abi() -> List[Dict]:
+    """ABI entries for the events declared in the contract source (enums are uint8)."""
+    source = re.sub(r"//[^\n]*", "", CONTRACT_SOURCE.read_text())
+    enums = set(re.findall(r"enum (\w+)", source))
+    abi = []
+    for name, params in re.findall(r"event (\w+)\s*\(([^)]*)\);", source):
+        inputs = []
+        for param in filter(None, (p.split() for p in params.split(","))):
+            inputs.append({"name": param[-1], "type": "uint8" if param[0] in enums else param[0],
+                           "indexed": "indexed" in param})
+        abi.append({"type": "event", "name": name, "inputs": inputs, "anonymous": False})
+    return abi
+
+class FakeCall:
+    def __init__(self, contract: "FakeContract", fn_name: str, args: tuple):
+        self.contract = contract
+        self.fn_name = fn_name
+        self.args = args
+
+    def call(self):
+        return getattr(self.contract, f"_call_{self.fn_name}")(*self.args)
+
+    def transact(self, transaction: Dict) -> bytes:
+        return self.contract.eth.send(self, transaction)
+
+class FakeFunctions:
+    def __init__(self, contract: "FakeContract"):
+        self._contract = contract
+
+    def __getattr__(self, name: str):
+        return lambda *args: FakeCall(self._contract, name, args)
+
+class FakeEvent:
+    def __init__(self, name: str):
+        self.name = name
+
+    def process_log(self, log: Dict) -> Dict:
+        return {"event": self.name, "args": log["args"],
+                "blockNumber": log["blockNumber"], "logIndex": log["logIndex"]}
+
+class FakeEvents:
+    def __getattr__(self, name: str):
+        return lambda: FakeEvent(name)
+
+class FakeEth:
+    """Accounts, nonces, receipts, blocks and logs of a single-node chain that mines instantly."""
+
+    def __init__(self):
+        self.transactions: List[FakeCall] = []
+        self.nonces: Dict[str, int] = {}
+        self.failed_sends = 0
+        self.held_receipts = 0
+        self.blocks: List[bytes] = []
+        self.logs: List[Dict] = []
+        self.log_queries: List[Tuple[int, int]] = []
+        self._forks = 0
+        self._lock = threading.Lock()
+        self.mine()
+
+    def _block_hash(self, number: int) -> bytes:
+        return hashlib.sha256(f"{self._forks}:{number}".encode()).digest()
+
+    @property
+    def block_number(self) -> int:
+        return len(self.blocks) - 1
+
+    def mine(self, count: int = 1) -> int:
+        for _ in range(count):
+            self.blocks.append(self._block_hash(len(self.blocks)))
+        return self.block_number
+
+    def emit(self, contract: "FakeContract", event: str, **args) -> int:
+        """Mine a block holding one contract event; returns its number."""
+        entry = next(e for e in contract.abi if e.get("type") == "event" and e["name"] == event)
+        signature = f"{event}({','.join(i['type'] for i in entry['inputs'])})"
+        number = self.mine()
+        self.logs.append({"address": contract.address, "blockNumber": number, "logIndex": 0,
+                          "topics": [bytes(Web3.keccak(text=signature))], "args": args})
+        return number
+
+    def reorg(self, depth: int):
+        """Replace the last `depth` blocks (and drop their logs) with a fork of the same height."""
+        self._forks += 1
+        first = len(self.blocks) - depth
+        self.blocks[first:] = [self._block_hash(n) for n in range(first, len(self.blocks))]
+        self.logs = [log for log in self.logs if log["blockNumber"] < first]
+
+    def reset(self, height: int):
+        """Start over from block `height`, like a restarted dev node."""
+        del self.blocks[height + 1:]
+        self.logs = [log for log in self.logs if log["blockNumber"] <= height]
+
+    def get_block(self, number: int) -> Dict:
+        return {"number": number, "hash": self.blocks[number]}
+
+    def get_logs(self, filter_params: Dict) -> List[Dict]:
+        start, end = filter_params["fromBlock"], filter_params["toBlock"]
+        self.log_queries.append((start, end))
+        return [log for log in self.logs
+                if log["address"] == filter_params["address"] and start <= log["blockNumber"] <= end]
+
+    def fail_next_send(self, count: int = 1):
+        self.failed_sends += count
+
+    def hold_next_receipt(self, count: int = 1):
+        """Make the next receipt waits time out (the transaction never mines)."""
+        self.held_receipts += count
+
+    def get_transaction_count(self, account: str, block_identifier: str = "latest") -> int:
+        with self._lock:
+            return self.nonces.get(account, 0)
+
+    def send(self, call: FakeCall, transaction: Dict) -> bytes:
+        with self._lock:
+            account = transaction["from"]
+            if self.failed_sends:
+                self.failed_sends -= 1
+                raise ConnectionError("injected send failure")
+            # Like web3, fill in the next nonce when the sender leaves it out
+            nonce = transaction.get("nonce", self.nonces.get(account, 0))
+            if nonce != self.nonces.get(account, 0):
+                raise ValueError(f"nonce {nonce} is not the next one for {account}")
+            self.nonces[account] = nonce + 1
+            self.transactions.append(call)
+            return len(self.transactions).to_bytes(32, "big")
+
+    def wait_for_transaction_receipt(self, tx_hash: bytes, timeout: float = 120):
+        with self._lock:
+            if self.held_receipts:
+                self.held_receipts -= 1
+                raise TimeoutError(f"transaction {tx_hash.hex()} not mined after {timeout} seconds")
+            call = self.transactions[int.from_bytes(tx_hash, "big") - 1]
+        getattr(call.contract, f"_transact_{call.fn_name}")(*call.args)
+        entries = len(call.args[0]) if isinstance(call.args[0], list) else 1
+        return {"status": 1, "gasUsed": 21000 + 5000 * entries}
+
+class FakeWeb3:
+    def __init__(self, eth: Optional[FakeEth] = None):
+        self.eth = eth or FakeEth()
+
+class FakeContract:
+    """switches maps a switch id to (load, latency, active, last updated).
+
+    Reads that include a switch in fail_switches raise, like an RPC error.
+    Updates land in switches and links once their receipt is fetched.
+    """
+
+    address = "0x0000000000000000000000000000000000000001"
+
+    def __init__(self, switches: Optional[Dict[str, tuple]] = None, fail_switches: Iterable[str] = (),
+                 eth: Optional[FakeEth] = None, abi: Optional[List[Dict]] = None):
+        self.switches = dict(switches or {})
+        self.abi = abi or source_event_abi()
+        self.events = FakeEvents()
+        self.links: Dict[tuple, tuple] = {}
+        self.eth = eth or FakeEth()
+        self.fail_switches: Set[str] = set(fail_switches)
+        self.functions = FakeFunctions(self)
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _call_getMetricsBatch(self, switch_ids):
+        self._count("getMetricsBatch")
+        ids = [decode_id(switch_id) for switch_id in switch_ids]
+        if self.fail_switches.intersection(ids):
+            raise ConnectionError("injected RPC failure")
+        return [(encode_id(i), *self.switches.get(i, (0, 0, False, 0))) for i in ids]
+
+    def _transact_registerSwitch(self, switch_id, switch_type, total_ports):
+        self.switches.setdefault(decode_id(switch_id), (0, 0, True, 0))
+
+    def _transact_updateMetrics(self, switch_id, load, latency):
+        self._transact_updateMetricsBatch([switch_id], [load], [latency])
+
+    def _transact_updateMetricsBatch(self, switch_ids, loads, latencies):
+        for switch_id, load, latency in zip(switch_ids, loads, latencies):
+            self.switches[decode_id(switch_id)] = (load, latency, True, 0)
+
+    def _transact_updateLinkBatch(self, source_ids, dest_ids, bandwidths, latencies, states):
+        for link in zip(source_ids, dest_ids, bandwidths, latencies, states):
+            self.links[(decode_id(link[0]), decode_id(link[1]))] = link[2:]
@@ -0,0 +1,197 @@
+# tests/fake_odl.py
+"""In-process stand-in for the OpenDaylight RESTCONF endpoints the controller uses.
+
+Serves the operational topology, the config flow datastore (PUT, DELETE and
+YANG-PATCH), operational table 0 (with the defaults ODL adds to every flow)
+and node-connector statistics, with a
+configurable per-request latency and failure injection.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+import json
+import random
+import re
+import threading
+import time
+
+FLOW_PATH = re.compile(r"^/restconf/config/opendaylight-inventory:nodes/node/([^/]+)/flow-node-inventory:table/0/flow/([^/]+)$")
+TABLE_PATH = re.compile(r"^/restconf/operational/opendaylight-inventory:nodes/node/([^/]+)/flow-node-inventory:table/0$")
+STATS_PATH = re.compile(r"^/restconf/operational/opendaylight-inventory:nodes/node/([^/]+)/node-connector-statistics$")
+PATCH_TARGET = re.compile(r"^/node/([^/]+)/flow-node-inventory:table/0/flow/([^/]+)$")
+TOPOLOGY_PATH = "/restconf/operational/network-topology:network-topology"
+NODES_PATH = "/restconf/config/opendaylight-inventory:nodes"
+
+# Fields ODL fills in on operational flows even when the config leaves them out
+OPERATIONAL_FLOW_DEFAULTS = {
+    "table_id": 0,
+    "hard-timeout": 0,
+    "cookie": 0,
+    "flags": "",
+    "opendaylight-flow-statistics:flow-statistics": {"packet-count": 0, "byte-count": 0}
+}
+
+class FakeODL:
+    """A RESTCONF server on 127.0.0.1 backed by plain dicts.
+
+    latency is added to every request. fail_rate makes that fraction of
+    requests (drawn from a seeded generator) answer fail_status, and
+    fail_next(n) fails the next n requests of one kind: "topology",
+    "flow", "patch", "table" or "stats" (after letting `after` of them
+    through). yang_patch=False answers PATCH
+    with 405, like controllers without YANG-PATCH support.
+    """
+
+    def __init__(self, topology: Optional[Dict] = None, latency: float = 0.0, fail_rate: float = 0.0,
+                 fail_status: int = 503, yang_patch: bool = True, seed: int = 0):
+        self.topology = topology or {"network-topology": {"topology": [{"node": [], "link": []}]}}
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.yang_patch = yang_patch
+        self.flows: Dict[Tuple[str, str], Dict] = {}
+        self.requests: Dict[str, int] = {}
+        self._pending_failures: Dict[str, List[int]] = {}  # kind -> [requests to let through, failures]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._server = None
+
+    def start(self) -> "FakeODL":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeODL":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def fail_next(self, kind: str, count: int = 1, after: int = 0):
+        with self._lock:
+            pending = self._pending_failures.get(kind)
+            if not pending or not pending[1]:
+                pending = self._pending_failures[kind] = [after, 0]
+            pending[1] += count
+
+    def flows_on(self, switch_id: str) -> Dict[str, Dict]:
+        with self._lock:
+            return {flow_id: flow for (node, flow_id), flow in self.flows.items() if node == switch_id}
+
+    def _should_fail(self, kind: str) -> bool:
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            pending = self._pending_failures.get(kind)
+            if pending and pending[1]:
+                if pending[0]:
+                    pending[0] -= 1
+                    return False
+                pending[1] -= 1
+                return True
+            return self.fail_rate > 0 and self._random.random() < self.fail_rate
+
+    def _statistics(self, port_id: str) -> Dict:
+        # Counters grow steadily from start-up, at a rate that differs per port
+        elapsed = time.time() - self._started
+        rate = 1000 + sum(port_id.encode()) % 9000
+        return {
+            "bytes-received": int(elapsed * rate * 100),
+            "bytes-transmitted": int(elapsed * rate * 120),
+            "packets-received": int(elapsed * rate),
+            "packets-transmitted": int(elapsed * rate * 1.2)
+        }
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self) -> Optional[Dict]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length)) if length else None
+
+            def _send(self, status: int, body: Optional[Dict] = None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _route(self, method: str):
+                body = self._body()
+                if fake.latency:
+                    time.sleep(fake.latency)
+                path = unquote(self.path.split("?")[0])
+
+                if method == "GET" and path == TOPOLOGY_PATH:
+                    kind, handle = "topology", lambda: (200, fake.topology)
+                elif FLOW_PATH.match(path) and method in ("PUT", "DELETE"):
+                    kind, handle = "flow", lambda: self._flow(method, *FLOW_PATH.match(path).groups(), body)
+                elif method == "PATCH" and path == NODES_PATH:
+                    kind, handle = "patch", lambda: self._patch(body)
+                elif method == "GET" and TABLE_PATH.match(path):
+                    kind, handle = "table", lambda: self._table(TABLE_PATH.match(path).group(1))
+                elif method == "GET" and STATS_PATH.match(path):
+                    kind, handle = "stats", lambda: (200, fake._statistics(STATS_PATH.match(path).group(1)))
+                else:
+                    return self._send(404, {"errors": {"error": [{"error-message": f"No handler for {method} {path}"}]}})
+
+                if fake._should_fail(kind):
+                    return self._send(fake.fail_status, {"errors": {"error": [{"error-message": "injected failure"}]}})
+                self._send(*handle())
+
+            def _flow(self, method: str, switch_id: str, flow_id: str, body: Optional[Dict]):
+                with fake._lock:
+                    if method == "DELETE":
+                        existed = fake.flows.pop((switch_id, flow_id), None) is not None
+                        return (200, None) if existed else (404, None)
+                    fake.flows[(switch_id, flow_id)] = body
+                    return 200, None
+
+            def _patch(self, body: Dict):
+                if not fake.yang_patch:
+                    return 405, None
+                patch = body["ietf-yang-patch:yang-patch"]
+                with fake._lock:
+                    for edit in patch["edit"]:
+                        switch_id, flow_id = PATCH_TARGET.match(edit["target"]).groups()
+                        fake.flows[(switch_id, flow_id)] = edit["value"]["flow-node-inventory:flow"][0]
+                return 200, {"ietf-yang-patch:yang-patch-status": {"patch-id": patch["patch-id"], "ok": [None]}}
+
+            def _table(self, switch_id: str):
+                flows = [{**OPERATIONAL_FLOW_DEFAULTS, **flow} for flow in fake.flows_on(switch_id).values()]
+                if not flows:
+                    return 404, None
+                return 200, {"flow-node-inventory:table": [{"id": 0, "flow": flows}]}
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_PUT(self):
+                self._route("PUT")
+
+            def do_DELETE(self):
+                self._route("DELETE")
+
+            def do_PATCH(self):
+                self._route("PATCH")
+
+        return Handler
@@ -0,0 +1,61 @@
+# tests/test_alerts.py
+from datetime import datetime, timedelta
+from src.controller.enhanced_sdn_controller import SwitchType
+from src.dashboard.alerts import AlertEngine, LoadThreshold
+from src.dashboard.metrics_store import MetricsStore
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1)
+
+    def __call__(self):
+        self.now += timedelta(seconds=5)
+        return self.now
+
+def make_store(**kwargs):
+    store = MetricsStore(('switches', 'links', 'alerts'))
+    engine = AlertEngine(clock=FakeClock(), **kwargs)
+    store.add_commit_hook(engine.evaluate)
+    return store, engine
+
+def set_switch(store, switch_id, load, status=True, switch_type='core'):
+    with store.transaction() as tx:
+        tx.set('switches', switch_id, {'type': switch_type, 'load': load, 'status': status})
+
+def test_load_alerts_use_layer_thresholds_and_hysteresis():
+    store, _ = make_store(thresholds={SwitchType.ACCESS: LoadThreshold(95, 90)})
+    set_switch(store, 'c1', 75)
+    set_switch(store, 'a1', 92, switch_type='access')
+    assert list(store.snapshot().data['alerts']) == ['switch:c1:load']
+
+    first_seen = store.snapshot().data['alerts']['switch:c1:load']['first_seen']
+    set_switch(store, 'c1', 65)  # below the raise level but above the clear level
+    alert = store.snapshot().data['alerts']['switch:c1:load']
+    assert alert['first_seen'] == first_seen
+    assert alert['last_seen'] > first_seen
+
+    set_switch(store, 'c1', 55)
+    assert store.snapshot().data['alerts'] == {}
+
+def test_down_switch_replaces_load_alert_and_removal_clears():
+    store, engine = make_store()
+    set_switch(store, 'c1', 99)
+    set_switch(store, 'c1', 99, status=False)
+    assert list(store.snapshot().data['alerts']) == ['switch:c1:down']
+
+    with store.transaction() as tx:
+        tx.set('links', 'c1_d1', {'status': 'degraded'})
+        tx.delete('switches', 'c1')
+    alerts = store.snapshot().data['alerts']
+    assert list(alerts) == ['link:c1_d1:status']
+    assert alerts['link:c1_d1:status']['level'] == 'warning'
+    assert engine.raised == 3 and engine.cleared == 2
+
+def test_unknown_switch_status_is_not_an_outage():
+    store, _ = make_store()
+    set_switch(store, 'a1', 10, status=None, switch_type='access')
+    assert store.snapshot().data['alerts'] == {}
+    set_switch(store, 'a1', 99, status=None)
+    assert list(store.snapshot().data['alerts']) == ['switch:a1:load']
+    set_switch(store, 'a1', 99, status=False)
+    assert list(store.snapshot().data['alerts']) == ['switch:a1:down']
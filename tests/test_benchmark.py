@@ -0,0 +1,114 @@
+# tests/test_benchmark.py
+import os
+import shutil
+import subprocess
+import pytest
+from src.network.benchmark import (
+    compare_results, flow_command, measure_failover, parse_flow_output, ping_sweep_command, summarize, traffic_matrix
+)
+from src.network.topology_spec import generate_topology, to_odl_document
+from tests.fake_odl import FakeODL
+from tests.test_failover import DESTINATION, SOURCE, make_failover, take_down
+
+HOSTS = [f"h{i}" for i in range(1, 13)]
+
+def test_matrices_are_reproducible_from_the_seed():
+    assert traffic_matrix("uniform", HOSTS, seed=7) == traffic_matrix("uniform", HOSTS, seed=7)
+    assert traffic_matrix("uniform", HOSTS, seed=7) != traffic_matrix("uniform", HOSTS, seed=8)
+
+def test_matrix_shapes():
+    uniform = traffic_matrix("uniform", HOSTS, flows=20)
+    assert len(uniform) == len(set(uniform)) == 20
+    assert all(flow.source != flow.destination for flow in uniform)
+
+    hotspot = traffic_matrix("hotspot", HOSTS, flows=10, hotspot_share=1.0)
+    assert len({flow.destination for flow in hotspot}) == 1
+
+    assert len(traffic_matrix("all-to-all", HOSTS)) == 12 * 11
+    with pytest.raises(ValueError):
+        traffic_matrix("random", HOSTS)
+
+def test_parse_flow_output():
+    output = "\n".join([
+        "ping 10.0.0.2 50 packets transmitted, 49 received, 2% packet loss, time 9800ms "
+        "rtt min/avg/max/mdev = 1.100/2.500/7.900/0.400 ms ",
+        "20261017120000,10.0.0.1,40000,10.0.0.2,5001,3,0.0-10.0,11796480,9437184",
+        "ping 10.0.0.3 50 packets transmitted, 0 received, 100% packet loss, time 9800ms "
+    ])
+    results = parse_flow_output(output)
+    assert results["10.0.0.2"] == {
+        "loss_pct": 2.0, "latency_ms": 2.5, "max_latency_ms": 7.9,
+        "throughput_mbps": 9.437184, "bytes": 11796480
+    }
+    assert results["10.0.0.3"]["loss_pct"] == 100.0
+    assert results["10.0.0.3"]["latency_ms"] is None
+
+def test_summaries_compare_between_runs():
+    baseline = {"summary": {"latency_ms": summarize([1, 2, 3, 4])}}
+    current = {"summary": {"latency_ms": summarize([2, 4, 6, 8, None]), "failover_ms": None}}
+    assert current["summary"]["latency_ms"]["count"] == 4
+    assert compare_results(baseline, current) == {"latency_ms": {"mean": 1.0, "p50": 1.0, "p95": 1.0}}
+
+def test_failover_is_timed_from_the_link_going_down():
+    with FakeODL(to_odl_document(generate_topology()), fail_status=500) as fake:
+        controller, failover, primary = make_failover(fake, poll_interval=0.1)
+        topology = fake.topology["network-topology"]["topology"][0]
+        down = []
+        controller.refresh_topology()
+        failover.start()
+        try:
+            failover_ms = measure_failover(
+                failover, (SOURCE, DESTINATION),
+                take_down=lambda: down.extend(take_down(fake, primary[0], primary[1])),
+                restore=lambda: topology["link"].extend(down)
+            )
+            assert failover_ms is not None and failover_ms < 2000
+            # The link and the route are back when it returns
+            stats = failover.stats()
+            assert stats["failovers"] == stats["restorations"] == 1
+            assert (SOURCE, DESTINATION) in failover.active_routes()
+
+            # A link no route uses never moves anything
+            assert measure_failover(failover, (SOURCE, DESTINATION), lambda: None, lambda: None, timeout=0.3) is None
+        finally:
+            failover.stop()
+            controller.close()
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_flow_command_does_not_wait_for_the_iperf_server(tmp_path):
+    """A source that is also a destination runs `iperf -s &` in the same shell."""
+    for tool, output in (("ping", "5 packets transmitted, 5 received, 0% packet loss, time 800ms\n"
+                                  "rtt min/avg/max/mdev = 0.1/0.2/0.3/0.05 ms"),
+                         ("iperf", "20240101000000,10.0.0.1,5001,10.0.0.2,5001,3,0.0-1.0,1250000,10000000")):
+        script = tmp_path / tool
+        script.write_text(f"#!/bin/sh\necho '{output}'\n")
+        script.chmod(0o755)
+    command = "sleep 60 > /dev/null 2>&1 & " + flow_command(["10.0.0.2", "10.0.0.3"], duration=1)
+    env = dict(os.environ, PATH=f"{tmp_path}:{os.environ['PATH']}")
+    result = subprocess.run(["bash", "-c", command], env=env, capture_output=True, text=True, timeout=20)
+    flows = parse_flow_output(result.stdout)
+    assert flows["10.0.0.2"]["throughput_mbps"] == 10.0
+    assert flows["10.0.0.3"]["loss_pct"] == 0.0
+
+@pytest.mark.skipif(shutil.which("bash") is None or shutil.which("xargs") is None, reason="needs bash and xargs")
+def test_ping_sweep_limits_concurrent_pings(tmp_path):
+    # Each fake ping notes how many pings are running alongside it; odd last octets answer
+    running = tmp_path / "running"
+    running.mkdir()
+    script = tmp_path / "ping"
+    script.write_text(
+        "#!/bin/sh\n"
+        "for ip; do :; done\n"
+        f"touch {running}/$ip; sleep 0.2; ls {running} | wc -l >> {tmp_path}/seen; rm {running}/$ip\n"
+        "case $ip in *[13579]) exit 0;; *) exit 1;; esac\n"
+    )
+    script.chmod(0o755)
+    targets = [f"10.0.0.{i}" for i in range(1, 13)]
+    env = dict(os.environ, PATH=f"{tmp_path}:{os.environ['PATH']}")
+    result = subprocess.run(["bash", "-c", ping_sweep_command(targets, parallel=3)],
+                            env=env, capture_output=True, text=True, timeout=20)
+    lines = sorted(result.stdout.split("\n"))[1:]
+    assert lines == sorted(f"{'ok' if int(ip[-1]) % 2 else 'fail'} {ip}" for ip in targets)
+    assert max(int(n) for n in (tmp_path / "seen").read_text().split()) <= 3
+
+    assert subprocess.run(["bash", "-c", ping_sweep_command([])], capture_output=True, text=True).stdout == ""
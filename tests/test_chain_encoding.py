@@ -0,0 +1,15 @@
+# tests/test_chain_encoding.py
+import pytest
+from src.controller.chain_encoding import decode_id, decode_path, encode_id, encode_path
+
+def test_ids_round_trip_as_bytes32():
+    encoded = encode_id("openflow:12")
+    assert len(encoded) == 32
+    assert encoded.startswith(b"openflow:12")
+    assert decode_id(encoded) == "openflow:12"
+    assert decode_path(encode_path(["a1", "d1", "c1"])) == ["a1", "d1", "c1"]
+
+@pytest.mark.parametrize("bad", ["", "x" * 33, "a\x00b"])
+def test_ids_that_do_not_fit_are_rejected(bad):
+    with pytest.raises(ValueError):
+        encode_id(bad)
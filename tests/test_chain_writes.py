@@ -0,0 +1,116 @@
+# tests/test_chain_writes.py
+import random
+import threading
+from scripts.bench_chain_writes import bench_per_update, bench_write_behind, register_switches
+from src.dashboard.chain import ChainWriteBehind
+from tests.fake_chain import FakeContract, FakeWeb3
+
+ACCOUNT = "0x00000000000000000000000000000000000000aa"
+
+def make_writer(**kwargs):
+    w3 = FakeWeb3()
+    contract = FakeContract(eth=w3.eth)
+    return w3.eth, contract, ChainWriteBehind(w3, contract, ACCOUNT, **kwargs)
+
+def test_updates_within_a_window_are_coalesced():
+    eth, contract, writer = make_writer(max_batch=2)
+    for load in range(5):
+        writer.update_metrics("c1", load, 10)
+        writer.update_metrics("c2", load * 2, 20)
+    writer.update_link("c1", "d1", 1000, 1, 0)
+
+    assert writer.flush(wait_for_receipts=True) == 3
+    assert [call.fn_name for call in eth.transactions] == ["updateMetricsBatch", "updateLinkBatch"]
+    assert contract.switches == {"c1": (4, 10, True, 0), "c2": (8, 20, True, 0)}
+    assert contract.links == {("c1", "d1"): (1000, 1, 0)}
+    report = writer.report()
+    assert (report["received"], report["coalesced"], report["confirmed"]) == (11, 8, 3)
+    assert report["pending"] == 0 and report["in_flight"] == 0
+
+def test_updates_are_requeued_when_the_receipt_times_out():
+    eth, contract, writer = make_writer()
+    writer.update_metrics("c1", 1, 10)
+    writer.update_metrics("c2", 2, 20)
+    eth.hold_next_receipt()
+    assert writer.flush() == 2
+
+    # A newer value for c1 goes out before the receipt wait gives up, so
+    # only c2 is queued again
+    writer.update_metrics("c1", 5, 10)
+    writer.flush(wait_for_receipts=True)
+    report = writer.report()
+    assert report["requeued"] == 1 and report["pending"] == 1
+
+    writer.flush(wait_for_receipts=True)
+    assert contract.switches["c1"] == (5, 10, True, 0)
+    assert contract.switches["c2"] == (2, 20, True, 0)
+    assert writer.report()["pending"] == 0
+
+def test_new_keys_wait_for_room_and_are_dropped_after_their_timeout():
+    _, _, writer = make_writer(max_pending=2)
+    assert writer.update_metrics("c1", 1, 1) and writer.update_metrics("c2", 1, 1)
+    assert not writer.update_metrics("c3", 1, 1, timeout=0.01)
+    # Keys already queued are still updated
+    assert writer.update_metrics("c1", 2, 1, timeout=0)
+    assert writer.report()["dropped"] == 1
+
+    accepted = []
+    producer = threading.Thread(target=lambda: accepted.append(writer.update_metrics("c3", 1, 1, timeout=5)))
+    producer.start()
+    writer.flush()
+    producer.join()
+    assert accepted == [True] and writer.report()["pending"] == 1
+
+def test_nonce_is_read_again_after_a_failed_send():
+    eth, contract, writer = make_writer()
+    writer.update_metrics("c1", 1, 1)
+    assert writer.flush(wait_for_receipts=True) == 1
+
+    # Another sender used the next nonce, so ours is stale
+    eth.nonces[ACCOUNT] += 1
+    writer.update_metrics("c1", 2, 1)
+    assert writer.flush() == 0
+    assert writer.report()["pending"] == 1
+
+    assert writer.flush(wait_for_receipts=True) == 1
+    assert contract.switches["c1"] == (2, 1, True, 0)
+    assert eth.nonces[ACCOUNT] == 3
+    assert writer.report()["failed_transactions"] == 1
+
+def test_stats_stay_exact_under_concurrent_producers():
+    _, contract, writer = make_writer(window=0.01, max_batch=50)
+    writer.start()
+    producers = [
+        threading.Thread(target=lambda p=p: [writer.update_metrics(f"a{p}_{i % 20}", i, 1) for i in range(500)])
+        for p in range(8)
+    ]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    writer.stop()
+
+    report = writer.report()
+    assert report["received"] == 4000 and report["dropped"] == 0
+    assert report["submitted"] == report["received"] - report["coalesced"] == report["confirmed"]
+    assert len(contract.switches) == 160
+
+def test_benchmark_runs_both_modes_against_the_fake_chain():
+    rng = random.Random(1)
+    switch_ids = [f"a{i}" for i in range(1, 22)]
+    updates = [(rng.choice(switch_ids), rng.randint(0, 100), rng.randint(1, 20)) for _ in range(500)]
+    results = {}
+    for name, bench in (("per_update", bench_per_update),
+                        ("write_behind", lambda *args: bench_write_behind(*args, window=0.05, max_batch=100))):
+        w3 = FakeWeb3()
+        contract = FakeContract(eth=w3.eth)
+        register_switches(w3, contract, ACCOUNT, switch_ids)
+        results[name] = bench(w3, contract, ACCOUNT, updates)
+        # Both modes leave the contract holding the last value per switch
+        assert all(contract.switches[s][:2] == next(u[1:] for u in reversed(updates) if u[0] == s)
+                   for s in switch_ids)
+
+    assert results["per_update"]["transactions"] == 500
+    write_behind = results["write_behind"]
+    assert write_behind["confirmed"] == write_behind["received"] - write_behind["coalesced"] <= 500
+    assert write_behind["transactions"] < 50 and write_behind["pending"] == 0
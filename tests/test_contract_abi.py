@@ -0,0 +1,46 @@
+# tests/test_contract_abi.py
+"""The Python code must only call what the contract declares, and only deploy what was compiled from it."""
+import json
+import re
+import pytest
+from pathlib import Path
+from src.controller.contract_artifact import CONTRACT_SOURCE, load_artifact
+from tests.fake_chain import source_event_abi
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def source_declarations():
+    """name -> parameter types as written, for public/external functions and events"""
+    source = re.sub(r"//[^\n]*", "", CONTRACT_SOURCE.read_text())
+    declarations = {}
+    for name, params, modifiers in re.findall(r"function (\w+)\s*\(([^)]*)\)([^{;]*)", source):
+        if {"public", "external"} & set(modifiers.split()):
+            declarations[name] = [p.split()[0] for p in params.split(",") if p.strip()]
+    for name, params in re.findall(r"event (\w+)\s*\(([^)]*)\);", source):
+        declarations[name] = [p.split()[0] for p in params.split(",") if p.strip()]
+    return declarations
+
+def test_functions_used_by_the_python_code_exist():
+    declared = source_declarations()
+    used = set()
+    for path in list((ROOT / "src").rglob("*.py")) + list((ROOT / "scripts").glob("*.py")):
+        used.update(re.findall(r"functions\.(\w+)\(", path.read_text()))
+    assert used and used <= set(declared), sorted(used - set(declared))
+
+def test_fake_event_abi_follows_the_source():
+    declared = source_declarations()
+    for entry in source_event_abi():
+        types = [i["type"] for i in entry["inputs"]]
+        assert types == [t if t in ("bytes32", "bool", "uint256") else "uint8" for t in declared[entry["name"]]]
+
+def test_artifacts_compiled_from_another_source_are_refused(tmp_path):
+    artifact = {"abi": [], "bytecode": "0x00", "source": CONTRACT_SOURCE.read_text().replace("\n", "\r\n")}
+    path = tmp_path / "EnhancedNetworkManager.json"
+    path.write_text(json.dumps(artifact))
+    assert load_artifact(str(path))["bytecode"] == "0x00"
+
+    path.write_text(json.dumps(dict(artifact, source="contract EnhancedNetworkManager {}")))
+    with pytest.raises(ValueError, match="truffle compile"):
+        load_artifact(str(path))
+    # An older contract kept for comparison skips the check
+    assert load_artifact(str(path), source_path=None)["source"] == "contract EnhancedNetworkManager {}"
@@ -0,0 +1,98 @@
+# tests/test_contract_events.py
+from src.controller.chain_encoding import encode_id
+from src.dashboard.events import ContractEventIndexer
+from tests.fake_chain import FakeContract, FakeWeb3
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+        self.resyncs = 0
+
+    def handle(self, event):
+        self.events.append((event["event"], event["blockNumber"]))
+
+    def resync(self):
+        self.resyncs += 1
+
+def make_indexer(tmp_path, w3=None, **kwargs):
+    w3 = w3 or FakeWeb3()
+    contract = FakeContract(eth=w3.eth)
+    recorder = Recorder()
+    indexer = ContractEventIndexer(
+        w3, contract, {"MetricsUpdated": recorder.handle, "SwitchStatusChanged": recorder.handle},
+        recorder.resync, checkpoint_path=str(tmp_path / "events.json"), **kwargs
+    )
+    return w3.eth, contract, recorder, indexer
+
+def metrics_updated(eth, contract, switch_id="c1", load=50):
+    return eth.emit(contract, "MetricsUpdated", switchId=encode_id(switch_id), load=load, timestamp=1700000000)
+
+def test_events_are_applied_once_confirmed(tmp_path):
+    eth, contract, recorder, indexer = make_indexer(tmp_path, confirmations=3)
+    eth.mine(10)
+    assert indexer.poll() == 0
+    assert recorder.resyncs == 1 and indexer.checkpoint["block"] == 7
+
+    block = metrics_updated(eth, contract)
+    eth.mine(2)
+    assert indexer.poll() == 0
+    eth.mine()
+    assert indexer.poll() == 1
+    assert recorder.events == [("MetricsUpdated", block)]
+    assert indexer.checkpoint["block"] == block
+
+    # Nothing new, nothing applied twice
+    assert indexer.poll() == 0 and len(recorder.events) == 1
+
+def test_indexing_resumes_from_the_checkpoint(tmp_path):
+    eth, contract, recorder, indexer = make_indexer(tmp_path, confirmations=0)
+    eth.mine(5)
+    indexer.poll()
+    block = metrics_updated(eth, contract)
+
+    # A restarted process picks up where the last one stopped, without a resync
+    _, _, restarted, resumed = make_indexer(tmp_path, w3=FakeWeb3(eth), confirmations=0)
+    assert resumed.checkpoint == indexer.checkpoint
+    assert resumed.poll() == 1
+    assert restarted.resyncs == 0 and restarted.events == [("MetricsUpdated", block)]
+    assert eth.log_queries[-1] == (6, block)
+
+def test_reorg_below_the_checkpoint_triggers_a_resync(tmp_path):
+    eth, contract, recorder, indexer = make_indexer(tmp_path, confirmations=2)
+    eth.mine(10)
+    indexer.poll()
+    metrics_updated(eth, contract)
+    eth.mine(2)
+    assert indexer.poll() == 1
+
+    # Shallower than the confirmation depth: the checkpointed block survives
+    eth.reorg(2)
+    assert indexer.poll() == 0 and recorder.resyncs == 1
+
+    # Deeper: the checkpointed block hash changed, so state is rebuilt
+    eth.reorg(4)
+    assert indexer.poll() == 0
+    assert recorder.resyncs == 2
+    assert indexer.checkpoint == {"block": eth.block_number - 2, "hash": eth.blocks[-3].hex()}
+
+def test_node_reset_below_the_checkpoint_triggers_a_resync(tmp_path):
+    eth, _, recorder, indexer = make_indexer(tmp_path, confirmations=1)
+    eth.mine(20)
+    indexer.poll()
+    eth.reset(5)
+    indexer.poll()
+    assert recorder.resyncs == 2 and indexer.checkpoint["block"] == 4
+
+def test_long_gaps_are_read_in_bounded_ranges(tmp_path):
+    eth, contract, recorder, indexer = make_indexer(tmp_path, confirmations=0, max_block_range=10)
+    indexer.poll()
+    blocks = []
+    for i in range(4):
+        eth.mine(7)
+        blocks.append(metrics_updated(eth, contract, f"c{i}"))
+    eth.mine(3)
+
+    assert indexer.poll() == 4
+    assert eth.log_queries == [(1, 10), (11, 20), (21, 30), (31, 35)]
+    assert [block for _, block in recorder.events] == blocks
+    assert indexer.checkpoint["block"] == 35
@@ -0,0 +1,106 @@
+# tests/test_dashboard_app.py
+from concurrent.futures import ThreadPoolExecutor
+import json
+import pytest
+from src.controller.chain_encoding import encode_id
+from src.dashboard import app as dashboard_app
+from src.dashboard.chain import ChainMetricsReader
+from src.dashboard.config import DashboardConfig
+from tests.fake_chain import FakeContract
+
+@pytest.fixture
+def dashboard(tmp_path):
+    dashboard_app.create_app(DashboardConfig(state_dir=str(tmp_path / "state"), start_background=False))
+    dashboard_app.new_switches.clear()
+    yield dashboard_app
+    dashboard_app.new_switches.clear()
+    dashboard_app.clients.configure(DashboardConfig())
+
+def test_switches_whose_chain_read_failed_stay_pending(dashboard):
+    contract = FakeContract({f"a{i}": (10 * i, 1, True, 1700000000) for i in range(1, 5)}, fail_switches={"a3"})
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        dashboard.clients.provide("chain_reader", ChainMetricsReader(contract, executor, chunk_size=1))
+        dashboard.new_switches.update(["a1", "a2", "a3", "a4"])
+        dashboard.read_new_switches()
+        assert dashboard.new_switches == {"a3"}
+        switches = dashboard.metrics_store.snapshot().data["switches"]
+        assert switches["a2"]["load"] == 20 and "a3" not in switches
+
+        # The next cycle reads it again
+        contract.fail_switches.clear()
+        dashboard.read_new_switches()
+        assert dashboard.new_switches == set()
+        assert dashboard.metrics_store.snapshot().data["switches"]["a3"]["load"] == 30
+
+def test_resync_keeps_switches_it_could_not_read_pending(dashboard):
+    contract = FakeContract({"a1": (10, 1, True, 1700000000), "a2": (20, 1, True, 1700000000)}, fail_switches={"a2"})
+    topology = dashboard.clients.controller.topology
+    for node_id in ("a1", "a2"):
+        topology.add_node({"node-id": node_id})
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dashboard.clients.provide("chain_reader", ChainMetricsReader(contract, executor, chunk_size=1))
+        dashboard.new_switches.update(["a1", "a2"])
+        dashboard.resync_switch_metrics()
+        assert dashboard.new_switches == {"a2"}
+        assert dashboard.metrics_store.snapshot().data["switches"]["a1"]["load"] == 10
+
+def test_unchanged_metrics_do_not_bump_the_version(dashboard):
+    store = dashboard.metrics_store
+    metrics = {f"a{i}": {"currentLoad": 10 * i, "isActive": True, "lastUpdated": 1700000000} for i in range(1, 4)}
+    dashboard.store_switch_metrics(metrics)
+    version = store.version
+    stamped = store.snapshot().data["switches"]["a1"]["last_updated"]
+
+    dashboard.store_switch_metrics(metrics)
+    assert store.version == version
+    assert store.snapshot().data["switches"]["a1"]["last_updated"] == stamped
+
+    dashboard.store_switch_metrics(dict(metrics, a2={"currentLoad": 25, "isActive": True, "lastUpdated": 1700000005}))
+    assert store.changes_since(version) == {"switches": {"a2"}}
+
+def test_switch_first_seen_through_an_event_has_unknown_status(dashboard):
+    dashboard.clients.controller.topology.add_node({"node-id": "a7"})
+    dashboard.on_metrics_updated({"args": {"switchId": encode_id("a7"), "load": 40, "timestamp": 1700000000}})
+    switch = dashboard.metrics_store.snapshot().data["switches"]["a7"]
+    assert switch["load"] == 40 and switch["status"] is None
+
+    dashboard.on_switch_status_changed({"args": {"switchId": encode_id("a7"), "isActive": False}})
+    assert dashboard.metrics_store.snapshot().data["switches"]["a7"]["status"] is False
+
+def read_event(chunks) -> dict:
+    """Next data event of an SSE response, skipping keepalives."""
+    for chunk in chunks:
+        fields = dict(line.split(": ", 1) for line in chunk.decode().splitlines() if ": " in line)
+        if "data" in fields:
+            return {**fields, "data": json.loads(fields["data"])}
+
+def test_stream_pushes_metric_deltas(tmp_path):
+    app = dashboard_app.create_app(DashboardConfig(state_dir=str(tmp_path / "state"), start_background=False,
+                                                   max_streams=1))
+    client = app.test_client()
+    try:
+        response = client.get("/api/stream", buffered=False, multithread=True)
+        assert response.status_code == 200 and response.mimetype == "text/event-stream"
+        chunks = iter(response.response)
+        first = read_event(chunks)
+        assert first["event"] == "metrics" and first["data"]["full"]
+
+        with dashboard_app.metrics_store.transaction() as tx:
+            tx.set("switches", "s9", {"type": "access", "load": 12, "status": True})
+        second = read_event(chunks)
+        assert second["data"]["since"] == first["data"]["version"]
+        assert second["data"]["changes"]["switches"] == {"s9": {"type": "access", "load": 12, "status": True}}
+
+        # One stream per worker here; the next client is told to poll
+        assert client.get("/api/stream", buffered=False, multithread=True).status_code == 503
+        response.close()
+        again = client.get("/api/stream", buffered=False, multithread=True)
+        assert again.status_code == 200
+        again.close()
+
+        # A sync worker would be held by the stream for good
+        assert client.get("/api/stream", buffered=False).status_code == 503
+    finally:
+        with dashboard_app.metrics_store.transaction() as tx:
+            tx.delete("switches", "s9")
+        dashboard_app.clients.configure(DashboardConfig())
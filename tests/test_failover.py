@@ -0,0 +1,98 @@
+# tests/test_failover.py
+import time
+from src.controller.enhanced_sdn_controller import EnhancedOpenDaylightController, InstallMode
+from src.controller.failover import FailoverManager
+from src.network.topology_spec import generate_topology, to_odl_document
+from tests.fake_odl import FakeODL
+
+SOURCE, DESTINATION = "10.0.0.1", "10.0.0.19"
+
+def make_failover(fake: FakeODL, **kwargs):
+    """A controller with one redundant a1 -> a7 route under failover."""
+    controller = EnhancedOpenDaylightController(host="127.0.0.1", port=fake.port,
+                                                install_mode=InstallMode.CONCURRENT)
+    failover = FailoverManager(controller, **kwargs)
+    paths = controller.compute_redundant_path("a1", "a7")
+    assert controller.setup_redundant_path(SOURCE, DESTINATION, paths.primary.nodes, paths.backup.nodes) == (True, True)
+    return controller, failover, paths.primary.nodes
+
+def take_down(fake: FakeODL, source: str, target: str) -> list:
+    """Remove the source -> target links from the served topology and return them."""
+    topology = fake.topology["network-topology"]["topology"][0]
+    down = [link for link in topology["link"]
+            if (link["source"]["source-node"], link["destination"]["dest-node"]) == (source, target)]
+    topology["link"] = [link for link in topology["link"] if link not in down]
+    return down
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def test_watcher_detects_link_failure_and_recovery_between_polls():
+    with FakeODL(to_odl_document(generate_topology()), fail_status=500) as fake:
+        controller, failover, primary = make_failover(fake, poll_interval=0.3)
+        primary_flows = set(controller.route_flow_ids(SOURCE, DESTINATION, primary, True))
+        backup_flows = set(fake.flows) - primary_flows
+        assert primary_flows <= set(fake.flows)
+        controller.refresh_topology()
+        failover.start()
+        try:
+            # Nobody else refreshes: the watcher notices within poll_interval
+            down = take_down(fake, primary[1], primary[2])
+            assert wait_for(lambda: failover.stats()["failovers"] == 1)
+            assert not failover.active_routes()
+            assert set(fake.flows) == backup_flows
+            stats = failover.stats()
+            assert stats["failovers"] == 1 and stats["failed_over"] == 1
+            # Counted from the last read that saw the link up, so the
+            # detection delay is part of the failover time
+            assert 250 < stats["last_failover_ms"] == stats["max_failover_ms"] < 2000
+
+            # Once the link is back the route returns to its primary
+            fake.topology["network-topology"]["topology"][0]["link"].extend(down)
+            assert wait_for(lambda: failover.stats()["restorations"] == 1)
+            assert (SOURCE, DESTINATION) in failover.active_routes()
+            assert set(fake.flows) == primary_flows | backup_flows
+        finally:
+            failover.stop()
+            controller.close()
+
+def test_recovery_waits_for_the_whole_primary():
+    with FakeODL(to_odl_document(generate_topology())) as fake:
+        controller, failover, primary = make_failover(fake)
+        first = take_down(fake, primary[0], primary[1])
+        second = take_down(fake, primary[1], primary[2])
+        controller.refresh_topology()
+        assert failover.handle_link_failure(primary[0], primary[1]) == [(SOURCE, DESTINATION)]
+
+        fake.topology["network-topology"]["topology"][0]["link"].extend(first)
+        controller.refresh_topology()
+        assert failover.handle_link_recovery(primary[0], primary[1]) == []
+
+        fake.topology["network-topology"]["topology"][0]["link"].extend(second)
+        controller.refresh_topology()
+        assert failover.handle_link_recovery(primary[1], primary[2]) == [(SOURCE, DESTINATION)]
+        controller.close()
+
+def test_partial_delete_keeps_the_route_on_its_primary():
+    with FakeODL(to_odl_document(generate_topology()), fail_status=500) as fake:
+        controller, failover, primary = make_failover(fake)
+        installed = dict(fake.flows)
+
+        # One primary flow survives the failover, so the route has not moved
+        fake.fail_next("flow", after=1)
+        assert failover.handle_link_failure(primary[1], primary[2]) == []
+        assert (SOURCE, DESTINATION) in failover.active_routes()
+        assert failover.stats()["failovers"] == 1
+
+        # The primary is still wanted, so a reconcile puts back what was deleted
+        assert controller.reconcile_flows()["success"]
+        assert fake.flows == installed
+
+        assert failover.handle_link_failure(primary[1], primary[2]) == [(SOURCE, DESTINATION)]
+        assert not failover.active_routes()
+        controller.close()
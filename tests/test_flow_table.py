@@ -0,0 +1,45 @@
+# tests/test_flow_table.py
+from src.controller.flow_table import FlowTable, flow_digest
+
+def flow(flow_id, out_port, priority=1200):
+    return {"id": flow_id, "priority": priority, "instructions": {"output": out_port}}
+
+def ops(changes):
+    return sorted((change.op.value, change.switch_id, change.flow_id) for change in changes)
+
+def test_only_differences_become_changes():
+    table = FlowTable()
+    route = {"a1": flow("flow_h1_h2_0_primary", "d1"), "d1": flow("flow_h1_h2_1_primary", "c1")}
+    changes = table.set_route(("h1", "h2", True), route)
+    assert ops(changes) == [("add", "a1", "flow_h1_h2_0_primary"), ("add", "d1", "flow_h1_h2_1_primary")]
+    for change in changes:
+        table.mark_installed(change.switch_id, change.config)
+
+    assert table.set_route(("h1", "h2", True), route) == []
+
+    # New next hop on d1, and the route no longer uses a1
+    changes = table.set_route(("h1", "h2", True), {"d1": flow("flow_h1_h2_1_primary", "a2")})
+    assert ops(changes) == [("delete", "a1", "flow_h1_h2_0_primary"), ("modify", "d1", "flow_h1_h2_1_primary")]
+
+def test_sync_switch_finds_stale_and_drifted_flows():
+    table = FlowTable()
+    table.set_route(("h1", "h2", True), {"a1": flow("flow_h1_h2_0_primary", "d1")})
+    operational = [
+        # Extra operational fields do not count as a difference
+        {**flow("flow_h1_h2_0_primary", "d1"), "flow-statistics": {"packet-count": 12}},
+        flow("flow_h9_h2_0_backup", "d2"),
+        {"id": "LLDP", "priority": 100}
+    ]
+    table.sync_switch("a1", operational)
+    assert ops(table.diff("a1")) == [("delete", "a1", "flow_h9_h2_0_backup")]
+    assert flow_digest(operational[0]) == flow_digest(flow("flow_h1_h2_0_primary", "d1"))
+
+def test_fields_left_at_odl_defaults_are_not_drift():
+    table = FlowTable()
+    table.set_route(("h1", "h2", True), {"a1": flow("flow_h1_h2_0_primary", "d1")})
+    table.sync_switch("a1", [{**flow("flow_h1_h2_0_primary", "d1"), "table_id": 0, "hard-timeout": 0}])
+    assert table.diff("a1") == []
+
+    # A programmed field that differs still is
+    table.sync_switch("a1", [{**flow("flow_h1_h2_0_primary", "d1", priority=1), "table_id": 0}])
+    assert ops(table.diff("a1")) == [("modify", "a1", "flow_h1_h2_0_primary")]
@@ -0,0 +1,62 @@
+# tests/test_instrumentation.py
+import pytest
+from src.controller.enhanced_sdn_controller import EnhancedOpenDaylightController
+from src.controller.instrumentation import Instrumentation, MetricKind, instruments
+from src.network.topology_spec import generate_topology, to_odl_document
+from tests.fake_odl import FakeODL
+
+def test_counters_and_gauges_render_per_label_set():
+    metrics = Instrumentation()
+    metrics.describe("calls_total", MetricKind.COUNTER, "Calls made")
+    metrics.inc("calls_total", endpoint="flow")
+    metrics.inc("calls_total", 2, endpoint="flow")
+    metrics.inc("calls_total", endpoint="topology")
+    metrics.set("ratio", 0.5)
+    assert metrics.value("calls_total", endpoint="flow") == 3
+    assert metrics.total("calls_total") == 4
+
+    text = metrics.render()
+    assert "# HELP calls_total Calls made\n# TYPE calls_total counter\n" in text
+    assert 'calls_total{endpoint="flow"} 3\n' in text
+    assert "ratio 0.5\n" in text
+    with pytest.raises(ValueError):
+        metrics.observe("calls_total", 1.0)
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Instrumentation()
+    metrics.describe("latency_seconds", MetricKind.HISTOGRAM, "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        metrics.observe("latency_seconds", value, call="get")
+    text = metrics.render()
+    assert 'latency_seconds_bucket{call="get",le="0.1"} 1\n' in text
+    assert 'latency_seconds_bucket{call="get",le="1"} 3\n' in text
+    assert 'latency_seconds_bucket{call="get",le="+Inf"} 4\n' in text
+    assert 'latency_seconds_sum{call="get"} 4.25\n' in text
+    assert 'latency_seconds_count{call="get"} 4\n' in text
+
+def test_timer_feeds_observers():
+    metrics = Instrumentation()
+    seen = []
+    metrics.add_observer(lambda name, labels, value: seen.append((name, labels)))
+    with metrics.timer("step_seconds", stage="read") as labels:
+        labels["result"] = "ok"
+    assert seen == [("step_seconds", {"stage": "read", "result": "ok"})]
+    assert metrics.value("step_seconds", stage="read", result="ok") == 1
+
+def test_controller_calls_are_instrumented():
+    with FakeODL(to_odl_document(generate_topology())) as fake:
+        controller = EnhancedOpenDaylightController(host="127.0.0.1", port=fake.port)
+        before = instruments.value("restconf_request_seconds", method="GET", endpoint="topology") or 0
+        hits = instruments.total("topology_cache_total", result="hit")
+        controller.get_topology()
+        controller.get_topology()
+        assert instruments.value("restconf_request_seconds", method="GET", endpoint="topology") == before + 1
+        assert instruments.total("topology_cache_total", result="hit") == hits + 1
+
+        installs = instruments.total("flow_changes_total", op="add", tier="core", result="ok")
+        path = controller.compute_redundant_path("a1", "a4").primary.nodes
+        assert controller.update_route("10.0.0.1", "10.0.0.10", path)
+        core_hops = sum(1 for node in path[:-1] if node.startswith("c"))
+        assert core_hops == 1
+        assert instruments.total("flow_changes_total", op="add", tier="core", result="ok") == installs + core_hops
+        controller.close()
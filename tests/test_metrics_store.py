@@ -0,0 +1,71 @@
+# tests/test_metrics_store.py
+import json
+import threading
+from src.dashboard.metrics_store import MetricsStore
+
+def test_snapshots_are_immutable_and_versioned():
+    store = MetricsStore(('switches', 'links'))
+    before = store.snapshot()
+
+    with store.transaction() as tx:
+        tx.set('switches', 'c1', {'load': 10, 'status': True})
+        # Nested transactions join the outer one
+        with store.transaction() as inner:
+            inner.merge('switches', 'c1', load=20)
+        assert tx.get('switches', 'c1')['load'] == 20
+        assert store.version == 0
+
+    after = store.snapshot()
+    assert after.version == 1
+    assert before.data['switches'] == {}
+    assert json.loads(after.json) == {'switches': {'c1': {'load': 20, 'status': True}}, 'links': {}}
+
+def test_unchanged_writes_do_not_bump_the_version():
+    store = MetricsStore(('switches',))
+    with store.transaction() as tx:
+        tx.set('switches', 'c1', {'load': 10})
+    first = store.snapshot()
+    with store.transaction() as tx:
+        tx.set('switches', 'c1', {'load': 10})
+        tx.merge('switches', 'missing', load=1)
+    assert store.snapshot() is first
+
+    with store.transaction() as tx:
+        tx.delete('switches', 'c1')
+        assert tx.keys('switches') == []
+    assert store.snapshot().data['switches'] == {}
+    assert first.data['switches'] == {'c1': {'load': 10}}
+
+def test_delta_since_version():
+    store = MetricsStore(('switches', 'links'), history=3)
+    with store.transaction() as tx:
+        tx.set('switches', 'c1', {'load': 10})
+        tx.set('switches', 'c2', {'load': 20})
+    with store.transaction() as tx:
+        tx.merge('switches', 'c1', load=30)
+        tx.delete('switches', 'c2')
+        tx.set('links', 'c1_c2', {'status': 'active'})
+
+    delta = store.delta(store.snapshot(), 1)
+    assert delta['full'] is False
+    assert delta['changes'] == {'switches': {'c1': {'load': 30}}, 'links': {'c1_c2': {'status': 'active'}}}
+    assert delta['removed'] == {'switches': ['c2']}
+    assert store.delta(store.snapshot(), 2)['changes'] == {}
+
+    # Versions that fell out of the history, or that this store never had, get everything
+    for _ in range(3):
+        with store.transaction() as tx:
+            tx.merge('switches', 'c1', load=tx.get('switches', 'c1')['load'] + 1)
+    assert store.delta(store.snapshot(), 1)['full'] is True
+    assert store.delta(store.snapshot(), 99)['full'] is True
+    assert store.changes_since(2) == {'switches': {'c1'}}
+
+def test_wait_for_change_wakes_on_commit():
+    store = MetricsStore(('switches',))
+    assert store.wait_for_change(0, timeout=0.01).version == 0
+
+    def writer():
+        with store.transaction() as tx:
+            tx.set('switches', 'c1', {'status': False})
+    threading.Timer(0.05, writer).start()
+    assert store.wait_for_change(0, timeout=5).version == 1
@@ -0,0 +1,129 @@
+# tests/test_path_computation.py
+import threading
+from src.controller.topology_model import TopologyModel
+from src.controller.path_computation import PathComputer
+
+def three_tier_document():
+    """2 core, 2 distribution, 2 access switches with dual uplinks."""
+    edges = [
+        ("c1", "c2"),
+        ("d1", "c1"), ("d1", "c2"), ("d2", "c1"), ("d2", "c2"),
+        ("a1", "d1"), ("a1", "d2"), ("a2", "d1"), ("a2", "d2")
+    ]
+    links = []
+    for s, d in edges:
+        for src, dst in ((s, d), (d, s)):
+            links.append({
+                "link-id": f"{src}-{dst}",
+                "source": {"source-node": src},
+                "destination": {"dest-node": dst}
+            })
+    nodes = sorted({n for edge in edges for n in edge})
+    return {"network-topology": {"topology": [{
+        "node": [{"node-id": n} for n in nodes],
+        "link": links
+    }]}}
+
+def make_computer():
+    model = TopologyModel()
+    model.apply_snapshot(three_tier_document())
+    return model, PathComputer(model)
+
+def test_primary_and_backup_are_link_disjoint():
+    _, computer = make_computer()
+    result = computer.redundant_path("a1", "a2")
+    assert result.primary.nodes[0] == "a1" and result.primary.nodes[-1] == "a2"
+    assert len(result.primary.nodes) == 3
+    primary_pairs = {frozenset(p) for p in zip(result.primary.nodes, result.primary.nodes[1:])}
+    backup_pairs = {frozenset(p) for p in zip(result.backup.nodes, result.backup.nodes[1:])}
+    assert not primary_pairs & backup_pairs
+
+def test_bandwidth_weights_steer_the_primary():
+    model, computer = make_computer()
+    model.set_link_attributes("a1-d1", bandwidth=1)
+    assert computer.redundant_path("a1", "a2").primary.nodes[1] == "d2"
+
+def test_k_shortest_paths_are_ordered_and_unique():
+    _, computer = make_computer()
+    paths = computer.k_shortest_paths("a1", "a2", 4)
+    assert len(paths) == 4
+    assert [p.cost for p in paths] == sorted(p.cost for p in paths)
+    assert len({tuple(p.nodes) for p in paths}) == 4
+
+def test_link_removal_invalidates_only_affected_pairs():
+    model, computer = make_computer()
+    assert computer.precompute(["a1", "a2", "c1"]) == 6
+    primary = computer.redundant_path("a1", "a2").primary
+    hits = computer.cache_hits
+
+    model.remove_link(primary.links[0])
+    recomputed = computer.redundant_path("a1", "a2")
+    assert computer.cache_hits == hits
+    assert primary.links[0] not in recomputed.primary.links
+
+def cached_costs(computer):
+    return {key: (r.primary.cost, r.backup and r.backup.cost) for key, r in computer._cache.items()}
+
+def test_link_recovery_keeps_pairs_it_cannot_improve():
+    model, computer = make_computer()
+    endpoints = ["a1", "a2", "d1", "d2", "c1", "c2"]
+    computer.precompute(endpoints)
+    link = dict(model.links["c1-c2"])
+    model.remove_link("c1-c2")
+    computer.precompute(endpoints)
+    before = cached_costs(computer)
+
+    # Only pairs whose primary or backup can use c1-c2 are dropped
+    model.add_link({"link-id": "c1-c2", "source": {"source-node": link["source"]},
+                    "destination": {"dest-node": link["target"]}})
+    fresh = PathComputer(model)
+    fresh.precompute(endpoints)
+    improved = {key for key, costs in cached_costs(fresh).items() if before[key] != costs}
+    assert set(before) - set(computer._cache) == improved
+    assert ("c1", "c2") in improved and len(improved) < len(before) // 4
+
+    # A cheaper link drops the pairs it shortens, and what is left is still right
+    model.set_link_attributes("d1-c1", latency=0.0, bandwidth=100000)
+    assert ("a1", "c1") not in computer._cache and ("a1", "a2") in computer._cache
+    fresh = PathComputer(model)
+    fresh.precompute(endpoints)
+    assert {k: v for k, v in cached_costs(fresh).items() if k in computer._cache} == cached_costs(computer)
+
+def test_node_removal_prunes_the_link_index():
+    model, computer = make_computer()
+    computer.precompute(["a1", "a2", "c1"])
+    model.remove_node("c1")
+    indexed = set().union(*computer._link_index.values())
+    assert indexed == set(computer._cache) - {key for key, value in computer._cache.items() if value is None}
+    assert not any("c1" in key for key in indexed)
+
+def test_paths_stay_consistent_while_the_topology_changes():
+    model, computer = make_computer()
+    document = three_tier_document()
+    without_uplink = three_tier_document()
+    without_uplink["network-topology"]["topology"][0]["link"] = [
+        link for link in document["network-topology"]["topology"][0]["link"]
+        if link["link-id"] not in ("a1-d1", "d1-a1")
+    ]
+    errors = []
+
+    def flap():
+        for i in range(300):
+            model.apply_snapshot(without_uplink if i % 2 else document)
+
+    def compute():
+        try:
+            for _ in range(300):
+                computer.clear()
+                with model.lock:
+                    for path in computer.k_shortest_paths("a1", "a2", 4):
+                        assert all(link in model.links for link in path.links)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=flap), threading.Thread(target=compute)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
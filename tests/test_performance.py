@@ -0,0 +1,189 @@
+# tests/test_performance.py
+"""Throughput checks against the in-process RESTCONF stand-in (tests/fake_odl.py).
+
+Budgets are deliberately loose so they only trip on real regressions;
+PERF_BUDGET_SCALE multiplies them on slow machines.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+import pytest
+from src.controller.enhanced_sdn_controller import EnhancedOpenDaylightController, InstallMode
+from src.network.topology_spec import TopologyParams, generate_topology, to_odl_document
+from tests.fake_odl import FakeODL
+
+BUDGET_SCALE = float(os.environ.get("PERF_BUDGET_SCALE", "1"))
+
+# 8 core, 64 distribution and 1024 access switches
+LARGE = TopologyParams(core=8, distribution_per_core=8, access_per_distribution=16,
+                       hosts_per_access=1, core_full_mesh=False)
+
+def make_controller(fake: FakeODL, **kwargs) -> EnhancedOpenDaylightController:
+    return EnhancedOpenDaylightController(host="127.0.0.1", port=fake.port, **kwargs)
+
+def access_pairs(count: int):
+    return [(f"a{i}", f"a{i + 512}") for i in range(1, count + 1)]
+
+def test_get_topology_of_a_large_network():
+    with FakeODL(to_odl_document(generate_topology(LARGE))) as fake:
+        controller = make_controller(fake)
+        started = time.perf_counter()
+        controller.get_topology()
+        elapsed = time.perf_counter() - started
+        assert len(controller.topology.switch_ids()) == 8 + 64 + 1024
+
+        # Within cache_timeout the document is served without a request
+        controller.get_topology()
+        assert fake.requests["topology"] == 1
+
+        # A refresh of an unchanged topology produces no changes
+        assert controller.refresh_topology() == []
+        controller.close()
+    print(f"get_topology: {elapsed * 1000:.0f} ms for 1096 switches")
+    assert elapsed < 5 * BUDGET_SCALE
+
+@pytest.mark.parametrize("mode", list(InstallMode))
+def test_update_route_throughput(mode):
+    with FakeODL(to_odl_document(generate_topology(LARGE)), latency=0.001) as fake:
+        controller = make_controller(fake, install_mode=mode)
+        routes = [(s, d, controller.compute_redundant_path(s, d).primary.nodes) for s, d in access_pairs(50)]
+
+        started = time.perf_counter()
+        assert all(controller.update_route(f"10.0.{i}.1", f"10.0.{i}.2", path)
+                   for i, (_, _, path) in enumerate(routes))
+        elapsed = time.perf_counter() - started
+        assert len(fake.flows) == controller.flow_table.stats()["installed_flows"]
+
+        # Programming the same routes again sends nothing
+        sent = dict(fake.requests)
+        assert all(controller.update_route(f"10.0.{i}.1", f"10.0.{i}.2", path)
+                   for i, (_, _, path) in enumerate(routes))
+        assert fake.requests == sent
+        controller.close()
+    print(f"update_route ({mode.value}): {len(routes) / elapsed:.0f} routes/s")
+    assert len(routes) / elapsed > 10 / BUDGET_SCALE
+
+def test_transient_errors_are_retried():
+    with FakeODL(to_odl_document(generate_topology()), fail_status=503) as fake:
+        controller = make_controller(fake, backoff_factor=0)
+        path = controller.compute_redundant_path("a1", "a7").primary.nodes
+        fake.fail_next("flow")
+        assert controller.update_route("10.0.0.1", "10.0.0.19", path)
+        assert fake.requests["flow"] == len(path) - 1 + 1
+        controller.close()
+
+def test_failed_install_is_repaired_by_the_next_update():
+    with FakeODL(to_odl_document(generate_topology()), fail_status=500) as fake:
+        controller = make_controller(fake)
+        path = controller.compute_redundant_path("a1", "a7").primary.nodes
+        fake.fail_next("flow")
+        assert not controller.update_route("10.0.0.1", "10.0.0.19", path)
+        assert controller.update_route("10.0.0.1", "10.0.0.19", path)
+        assert len(fake.flows) == len(path) - 1
+        controller.close()
+
+def test_batch_install_falls_back_without_yang_patch():
+    with FakeODL(to_odl_document(generate_topology()), yang_patch=False) as fake:
+        controller = make_controller(fake, install_mode=InstallMode.BATCH)
+        path = controller.compute_redundant_path("a1", "a7").primary.nodes
+        assert controller.update_route("10.0.0.1", "10.0.0.19", path)
+        assert fake.requests["patch"] == 1
+        assert fake.requests["flow"] == len(fake.flows) == len(path) - 1
+        controller.close()
+
+@pytest.mark.parametrize("mode, yang_patch", [(InstallMode.CONCURRENT, True), (InstallMode.BATCH, False)])
+def test_failed_route_update_restores_the_old_route(mode, yang_patch):
+    """A partial failure puts back the flows the update replaced instead of deleting them."""
+    with FakeODL(to_odl_document(generate_topology()), yang_patch=yang_patch) as fake:
+        controller = make_controller(fake, install_mode=mode, max_retries=0)
+        paths = controller.compute_redundant_path("a1", "a7")
+        assert controller.update_route("10.0.0.1", "10.0.0.19", paths.primary.nodes)
+        old_route = dict(fake.flows)
+
+        # Moving the route to the backup path modifies the flow on a1 (same
+        # flow id, new next hop) and adds one on every other hop
+        writes = len(paths.backup.nodes) - 1
+        for after in range(writes):
+            fake.fail_next("flow", after=after)
+            assert not controller.update_route("10.0.0.1", "10.0.0.19", paths.backup.nodes)
+            assert fake.flows == old_route, f"failure after {after} writes"
+            # The restored a1 flow is still known to be installed, so going
+            # back only deletes the (rolled back) additions
+            sent = fake.requests.get("flow", 0)
+            assert controller.update_route("10.0.0.1", "10.0.0.19", paths.primary.nodes)
+            assert fake.flows == old_route
+            assert fake.requests.get("flow", 0) == sent + writes - 1
+
+        assert controller.update_route("10.0.0.1", "10.0.0.19", paths.backup.nodes)
+        assert len(fake.flows) == writes
+        controller.close()
+
+def test_reconcile_reinstalls_lost_flows():
+    with FakeODL(to_odl_document(generate_topology())) as fake:
+        controller = make_controller(fake, install_mode=InstallMode.CONCURRENT)
+        path = controller.compute_redundant_path("a1", "a7").primary.nodes
+        assert controller.update_route("10.0.0.1", "10.0.0.19", path)
+        lost = next(iter(fake.flows))
+        del fake.flows[lost]
+
+        result = controller.reconcile_flows()
+        assert result["added"] == 1 and result["modified"] == 0 and result["success"]
+        assert lost in fake.flows
+        controller.close()
+
+def test_reconcile_of_installed_flows_sends_nothing():
+    """Operational flows carry fields the desired configs leave out; those are not drift."""
+    with FakeODL(to_odl_document(generate_topology())) as fake:
+        controller = make_controller(fake, install_mode=InstallMode.CONCURRENT)
+        for i, (source, destination) in enumerate([("a1", "a7"), ("a2", "a9"), ("a4", "a12")]):
+            path = controller.compute_redundant_path(source, destination).primary.nodes
+            assert controller.update_route(f"10.0.{i}.1", f"10.0.{i}.2", path)
+        sent = fake.requests.get("flow", 0)
+
+        for _ in range(2):
+            result = controller.reconcile_flows()
+            assert (result["added"], result["modified"], result["deleted"]) == (0, 0, 0)
+        assert fake.requests.get("flow", 0) == sent
+
+        # A flow changed on the switch is still found
+        switch_id, flow_id = next(iter(fake.flows))
+        fake.flows[(switch_id, flow_id)] = {**fake.flows[(switch_id, flow_id)], "priority": 1}
+        assert controller.reconcile_flows()["modified"] == 1
+        controller.close()
+
+def test_link_statistics_poll_throughput():
+    """The RESTCONF side of a dashboard poll cycle: every link's counters, read concurrently."""
+    with FakeODL(to_odl_document(generate_topology(LARGE)), latency=0.002) as fake:
+        controller = make_controller(fake, pool_size=16)
+        controller.get_topology()
+        link_ids = [f"{link['source']}_{link['target']}" for link in controller.topology.links.values()]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(controller.monitor_link_metrics, link_ids))
+        elapsed = time.perf_counter() - started
+        assert all(result.get("bytes_transmitted", 0) > 0 for result in results)
+        controller.close()
+    print(f"link statistics: {len(link_ids) / elapsed:.0f} links/s")
+    assert len(link_ids) / elapsed > 200 / BUDGET_SCALE
+
+def test_dashboard_poll_cycle(tmp_path):
+    """One dashboard metrics poll cycle: topology, link counters and layer statistics."""
+    from src.dashboard import app as dashboard
+    from src.dashboard.config import DashboardConfig
+    params = TopologyParams(core=4, distribution_per_core=4, access_per_distribution=8, hosts_per_access=1)
+    with FakeODL(to_odl_document(generate_topology(params)), latency=0.001) as fake:
+        # No chain here: the new switches' chain reads fail and stay pending
+        dashboard.create_app(DashboardConfig(odl_host="127.0.0.1", odl_port=fake.port, web3_url="http://127.0.0.1:1",
+                                             link_read_timeout=60, start_background=False, state_dir=str(tmp_path / "state")))
+        dashboard.refresh_metrics()
+        started = time.perf_counter()
+        dashboard.refresh_metrics()
+        elapsed = time.perf_counter() - started
+        links = dashboard.metrics_store.snapshot().data["links"]
+        assert len(links) == len(dashboard.clients.controller.topology.links)
+        assert all("rx_pps" in link for link in links.values())
+        assert not dashboard.clients.built("event_indexer")
+        dashboard.clients.configure(DashboardConfig())
+    print(f"dashboard poll cycle: {elapsed * 1000:.0f} ms for {len(links)} links")
+    assert len(links) / elapsed > 200 / BUDGET_SCALE
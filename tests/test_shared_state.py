@@ -0,0 +1,105 @@
+# tests/test_shared_state.py
+import json
+import os
+import pytest
+from src.dashboard.config import DashboardConfig
+from src.dashboard.metrics_store import MetricsStore
+from src.dashboard.shared_state import CommandChannel, LeaderLock, SharedSnapshot, apply_sections, private_directory
+
+def test_only_one_leader_lock_holder(tmp_path):
+    path = str(tmp_path / 'leader.lock')
+    first, second = LeaderLock(path), LeaderLock(path)
+    assert first.try_acquire() and first.held
+    assert not second.try_acquire() and not second.held
+
+    # Releasing (or exiting) hands the role to whoever tries next
+    first.release()
+    assert second.try_acquire()
+    assert open(path).read().strip() == str(os.getpid())
+    second.release()
+
+def test_snapshot_is_only_parsed_when_it_changes(tmp_path):
+    writer = SharedSnapshot(str(tmp_path / 'metrics.json'))
+    reader = SharedSnapshot(writer.path)
+    assert reader.read_if_changed() is None
+
+    writer.publish({'version': 1}, json.dumps({'switches': {'c1': {'load': 5}}}).encode())
+    state = reader.read_if_changed()
+    assert state == {'version': 1, 'data': {'switches': {'c1': {'load': 5}}}}
+    assert reader.read_if_changed() is None
+
+    writer.publish({'version': 2}, b'{"switches": {}}')
+    assert reader.read_if_changed()['version'] == 2
+    assert reader.loaded == 2 and writer.published == 2
+
+def test_apply_sections_mirrors_the_published_data():
+    store = MetricsStore(('switches', 'links'))
+    with store.transaction() as tx:
+        tx.set('switches', 'c1', {'load': 1})
+        tx.set('switches', 'c2', {'load': 2})
+        tx.set('links', 'c1_c2', {'utilization': 10})
+
+    published = {'switches': {'c1': {'load': 1}, 'c3': {'load': 3}}, 'links': {'c1_c2': {'utilization': 20}}}
+    with store.transaction() as tx:
+        changed = apply_sections(tx, published)
+    assert changed == {'switches': {'c2', 'c3'}, 'links': {'c1_c2'}}
+    assert store.snapshot().data == published
+
+    # Nothing changed, nothing committed
+    version = store.version
+    with store.transaction() as tx:
+        assert apply_sections(tx, published) == {}
+    assert store.version == version
+
+def test_command_channel_round_trip(tmp_path):
+    state = private_directory(str(tmp_path / 'state'))
+    leader = CommandChannel(os.path.join(state, 'leader.sock'), os.path.join(state, 'leader.key'))
+    follower = CommandChannel(leader.socket_path, leader.key_path)
+    leader.serve({'add': lambda a, b: a + b, 'fail': lambda: 1 / 0})
+    try:
+        assert follower.call('add', 2, 3) == 5
+        with pytest.raises(RuntimeError, match='ZeroDivisionError'):
+            follower.call('fail')
+        assert os.stat(leader.key_path).st_mode & 0o777 == 0o600
+
+        # A client without the key is turned away
+        os.replace(leader.key_path, str(tmp_path / 'stolen.key'))
+        fd = os.open(leader.key_path, os.O_WRONLY | os.O_CREAT, 0o600)
+        os.write(fd, b'wrong')
+        os.close(fd)
+        with pytest.raises(Exception):
+            follower.call('add', 1, 1)
+    finally:
+        leader.close()
+
+def test_state_directory_must_be_private(tmp_path):
+    state = str(tmp_path / 'state')
+    assert private_directory(state) == state
+    assert os.stat(state).st_mode & 0o777 == 0o700
+
+    # A directory others can reach into (say, created first by another user) is refused
+    os.chmod(state, 0o777)
+    with pytest.raises(PermissionError):
+        private_directory(state)
+    channel = CommandChannel(os.path.join(state, 'leader.sock'), os.path.join(state, 'leader.key'))
+    with pytest.raises(PermissionError):
+        channel.serve({})
+    os.chmod(state, 0o700)
+
+    # So is a key file anyone but us could have written or read
+    with open(channel.key_path, 'wb') as f:
+        f.write(b'planted')
+    os.chmod(channel.key_path, 0o644)
+    with pytest.raises(PermissionError):
+        channel.call('add', 1, 1)
+    with pytest.raises(PermissionError):
+        channel.serve({})
+
+def test_config_from_environment():
+    config = DashboardConfig.from_env({'SDN_ODL_PORT': '8282', 'SDN_ROLE': 'follower',
+                                       'SDN_START_BACKGROUND': 'no', 'SDN_POLL_INTERVAL': '2.5'})
+    assert config.odl_port == 8282 and config.poll_interval == 2.5
+    assert config.role == 'follower' and config.start_background is False
+    assert config.odl_host == DashboardConfig().odl_host
+    with pytest.raises(ValueError):
+        DashboardConfig.from_env({'SDN_ROLE': 'primary'})
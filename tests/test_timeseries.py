@@ -0,0 +1,62 @@
+# tests/test_timeseries.py
+from src.dashboard.timeseries import LinkRates, Tier, TimeSeriesStore
+
+def test_tiers_downsample_and_stay_bounded():
+    store = TimeSeriesStore(('load',), tiers=(Tier(1, 4), Tier(10, 3)), max_series=2)
+    for t in range(0, 25):
+        store.record('c1', 1000 + t, (t,))
+
+    fine = store.history('c1')
+    assert fine['resolution'] == 1
+    assert [p[0] for p in fine['points']] == [1021, 1022, 1023, 1024]
+    coarse = store.history('c1', resolution=5)
+    assert coarse['points'] == [[1000, 4.5], [1010, 14.5], [1020, 22.0]]
+
+    # Skipped buckets read as missing rather than as stale values
+    store.record('c1', 1027, (1.0,))
+    assert [p[0] for p in store.history('c1')['points']] == [1024, 1027]
+
+    size = store.memory_bytes()
+    assert store.record('c2', 1000, (1,))
+    assert not store.record('c3', 1000, (1,))
+    store.remove('c2')
+    assert store.record('c3', 1000, (1,))
+    assert store.memory_bytes() == size + (4 * 1 + 3 * 1) * 4 + 2 * (8 + 8 + 4)
+
+def test_link_rates_handle_wraps_and_resets():
+    rates = LinkRates(TimeSeriesStore(('rx_bps', 'tx_bps', 'rx_pps', 'tx_pps')), counter_bits=32)
+    assert rates.update('c1_d1', 100, {'bytes_transmitted': 1000, 'packets_transmitted': 10}) is None
+
+    sample = rates.update('c1_d1', 102, {'bytes_transmitted': 3000, 'packets_transmitted': 30})
+    assert sample['tx_bps'] == 8000 and sample['tx_pps'] == 10
+
+    # Wrap: previous value near the top of the 32-bit range
+    rates.update('c1_d1', 103, {'bytes_transmitted': 2 ** 32 - 100, 'packets_transmitted': 30})
+    sample = rates.update('c1_d1', 104, {'bytes_transmitted': 100, 'packets_transmitted': 31})
+    assert sample['tx_bps'] == 1600
+    assert rates.wraps == 1
+
+    # Reset: counters restarted from zero, only a new baseline
+    assert rates.update('c1_d1', 105, {'bytes_transmitted': 0}) is None
+    assert rates.resets == 1
+    assert len(rates.series.history('c1_d1')['points']) == 3
+
+def test_link_rates_batch_matches_single_updates():
+    fields = ('rx_bps', 'tx_bps', 'rx_pps', 'tx_pps')
+    single = LinkRates(TimeSeriesStore(fields), counter_bits=32)
+    batch = LinkRates(TimeSeriesStore(fields), counter_bits=32)
+    cycles = [
+        {'l1': (10, {'bytes_received': 100}), 'l2': (10, {'bytes_transmitted': 2 ** 32 - 50}), 'l3': (10, {'packets_received': 500})},
+        # l1 steady, l2 wraps, l3 resets, l4 is new
+        {'l1': (15, {'bytes_received': 600}), 'l2': (12, {'bytes_transmitted': 150}), 'l3': (12, {'packets_received': 3}),
+         'l4': (12, {'packets_transmitted': 1})},
+        # No time passed for l1
+        {'l1': (15, {'bytes_received': 700}), 'l4': (14, {'packets_transmitted': 21})}
+    ]
+    for samples in cycles:
+        expected = {link_id: single.update(link_id, *sample) for link_id, sample in samples.items()}
+        assert batch.update_many(samples) == expected
+    assert expected['l4'] == {'rx_bps': 0, 'tx_bps': 0, 'rx_pps': 0, 'tx_pps': 10}
+    assert (batch.wraps, batch.resets) == (single.wraps, single.resets) == (1, 1)
+    for link_id in ('l1', 'l2', 'l3', 'l4'):
+        assert batch.series.history(link_id) == single.series.history(link_id)
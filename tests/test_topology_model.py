@@ -0,0 +1,62 @@
+# tests/test_topology_model.py
+from src.controller.topology_model import ChangeType, TopologyModel
+
+def make_document(nodes, links):
+    return {
+        "network-topology": {
+            "topology": [{
+                "topology-id": "flow:1",
+                "node": [
+                    {"node-id": n, "termination-point": [{"tp-id": f"{n}:1"}]}
+                    for n in nodes
+                ],
+                "link": [
+                    {
+                        "link-id": f"{s}-{d}",
+                        "source": {"source-node": s, "source-tp": f"{s}:1"},
+                        "destination": {"dest-node": d, "dest-tp": f"{d}:1"}
+                    }
+                    for s, d in links
+                ]
+            }]
+        }
+    }
+
+def test_snapshot_diff_reports_only_changes():
+    model = TopologyModel()
+    events = []
+    model.subscribe(events.append)
+
+    first = model.apply_snapshot(make_document(["c1", "d1", "a1"], [("c1", "d1"), ("d1", "a1")]))
+    assert len(first) == 5
+    assert model.version == 1
+    assert set(model.neighbors("c1")) == {"d1"}
+
+    # Same document again: nothing changes and no event is delivered
+    assert model.apply_snapshot(make_document(["c1", "d1", "a1"], [("c1", "d1"), ("d1", "a1")])) == []
+    assert model.version == 1
+    assert len(events) == 1
+
+    changes = model.apply_snapshot(make_document(["c1", "d1"], [("c1", "d1")]))
+    assert {(c.change_type, c.item_id) for c in changes} == {
+        (ChangeType.LINK_REMOVED, "d1-a1"),
+        (ChangeType.NODE_REMOVED, "a1")
+    }
+    assert "a1" not in model.adjacency.get("d1", {})
+    assert model.links_of("d1") == ["c1-d1"]
+
+def test_incremental_link_removal():
+    model = TopologyModel()
+    model.apply_snapshot(make_document(["c1", "c2"], [("c1", "c2"), ("c2", "c1")]))
+    changes = model.remove_node("c2")
+    assert [c.change_type for c in changes].count(ChangeType.LINK_REMOVED) == 2
+    assert model.links == {}
+    assert model.switch_ids() == ["c1"]
+
+def test_changes_are_dated_from_the_previous_observation():
+    model = TopologyModel()
+    model.apply_snapshot(make_document(["s1", "s2"], []), observed_at=10.0)
+    assert (model.observed_at, model.changed_after) == (10.0, 10.0)
+    # s2 left at some point after the first snapshot
+    model.apply_snapshot(make_document(["s1"], []), observed_at=12.5)
+    assert (model.observed_at, model.changed_after) == (12.5, 10.0)
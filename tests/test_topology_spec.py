@@ -0,0 +1,50 @@
+# tests/test_topology_spec.py
+import time
+from src.controller.topology_model import TopologyModel
+from src.controller.path_computation import PathComputer
+from src.network.topology_spec import (
+    TopologyParams, generate_topology, host_ip, link_bandwidths, to_odl_document
+)
+
+def test_defaults_match_the_original_network():
+    graph = generate_topology()
+    tiers = [node.tier for node in graph.nodes]
+    assert (tiers.count("core"), tiers.count("distribution"), tiers.count("access")) == (3, 6, 12)
+    assert len(graph.hosts) == 36
+    # Core mesh, two uplinks per distribution and access switch, one per host
+    assert len(graph.links) == 3 + 12 + 24 + 36
+    assert graph.links[3][:3] == ("d1", "c1", 50)
+    assert graph.links[4][:3] == ("d1", "c2", 50)
+    assert graph.hosts[0].ip == "10.0.0.1/8"
+
+def test_host_addresses_skip_the_gateway():
+    assert host_ip(253) == "10.0.0.253/8"
+    assert host_ip(254) == "10.0.0.255/8"
+    assert host_ip(300) == "10.0.1.45/8"
+
+def test_ports_are_numbered_per_node():
+    graph = generate_topology(TopologyParams(core=2, distribution_per_core=1, access_per_distribution=1, hosts_per_access=1))
+    ports = {}
+    for link in graph.links:
+        ports.setdefault(link.source, []).append(link.source_port)
+        ports.setdefault(link.target, []).append(link.target_port)
+    assert all(numbers == list(range(1, len(numbers) + 1)) for numbers in ports.values())
+
+def test_large_topology_loads_into_the_controller_model():
+    params = TopologyParams(core=8, distribution_per_core=16, access_per_distribution=8,
+                            hosts_per_access=2, core_full_mesh=False, access_bandwidth=40)
+    graph = generate_topology(params)
+    assert len(graph.switches) == 8 + 128 + 1024
+
+    started = time.perf_counter()
+    model = TopologyModel()
+    for link_id, bandwidth in link_bandwidths(graph).items():
+        model.set_link_attributes(link_id, bandwidth=bandwidth)
+    model.apply_snapshot(to_odl_document(graph))
+    assert len(model.switch_ids()) == len(graph.switches)
+
+    computer = PathComputer(model)
+    result = computer.redundant_path("a1", "a1024")
+    assert result is not None
+    assert result.primary.nodes[0] == "a1" and result.primary.nodes[-1] == "a1024"
+    assert time.perf_counter() - started < 10
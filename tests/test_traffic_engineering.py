@@ -0,0 +1,54 @@
+# tests/test_traffic_engineering.py
+from src.controller.topology_model import TopologyModel
+from src.controller.path_computation import PathComputer
+from src.controller.failover import FailoverManager
+from src.controller.traffic_engineering import TrafficEngineer
+from tests.test_path_computation import three_tier_document
+
+class FakeController:
+    """Just enough controller for FailoverManager and TrafficEngineer."""
+
+    def __init__(self):
+        self.topology = TopologyModel()
+        self.topology.apply_snapshot(three_tier_document())
+        self.paths = PathComputer(self.topology)
+        self.failover = None
+        self.programmed = []
+
+    def setup_redundant_path(self, source, destination, primary_path, backup_path):
+        self.programmed.append((source, destination, primary_path, backup_path))
+        self.failover.register_route(source, destination, primary_path, backup_path)
+        return True, True
+
+def make_engineer(**kwargs):
+    controller = FakeController()
+    failover = FailoverManager(controller)
+    for i in range(4):
+        failover.register_route(f"h{i}", "h9", ["a1", "d1", "a2"], ["a1", "d2", "a2"])
+    return controller, TrafficEngineer(controller, failover, **kwargs)
+
+def test_hot_uplink_moves_only_enough_routes():
+    controller, engineer = make_engineer()
+    engineer.observe({("a1", "d1"): 100.0, ("a1", "d2"): 0.0})
+    moves = engineer.run_cycle()
+
+    # Each route carries ~25%; two moves bring the uplink down to low water
+    assert len(moves) == 2
+    for move in moves:
+        assert move.primary_path[1] == "d2"
+        assert move.backup_path == ["a1", "d1", "a2"]
+    assert engineer.failover.routes_for_hop("a1", "d2") == {move.route for move in moves}
+
+def test_damping_holds_moved_routes_and_needs_headroom():
+    controller, engineer = make_engineer(hold_time=60)
+    engineer.observe({("a1", "d1"): 100.0})
+    engineer.run_cycle()
+
+    # The other uplink is now hot too: nothing has room below low water
+    engineer.observe({("a1", "d1"): 100.0, ("a1", "d2"): 100.0})
+    engineer.observe({("a1", "d1"): 100.0, ("a1", "d2"): 100.0})
+    assert engineer.plan() == []
+
+    # With room again, routes moved in the last hold_time stay put
+    engineer.utilization = {("a1", "d2"): 100.0, ("a1", "d1"): 0.0}
+    assert engineer.plan() == []